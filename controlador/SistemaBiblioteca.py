@@ -1,23 +1,337 @@
-from modelo import Libro, Historial, Prestamo, Administrador
+from datetime import datetime, timedelta
+from itertools import groupby
+
 from estructuras.ListaEnlazada import ListaEnlazada
-from estructuras.Pila import Pila
+from estructuras.PilaAcotada import PilaAcotada
+from estructuras.Operacion import Operacion, PRESTAMO, DEVOLUCION, ANULAR_PRESTAMO, ANULAR_DEVOLUCION, NOMBRES
+
+# Disponibilidad del ejemplar después de escribir cada tipo de operación
+DISPONIBLE_TRAS = {PRESTAMO: False, DEVOLUCION: True, ANULAR_PRESTAMO: True, ANULAR_DEVOLUCION: False}
+# Acción con la que cada tipo de operación queda en el historial
+ACCIONES_AUDITORIA = {
+    PRESTAMO: "PRESTAR",
+    DEVOLUCION: "DEVOLVER",
+    ANULAR_PRESTAMO: "ANULAR_PRESTAMO",
+    ANULAR_DEVOLUCION: "ANULAR_DEVOLUCION",
+}
+# Intentos de escritura de una operación antes de apartarla en `fallidas`
+MAX_INTENTOS = 3
+
+
+class ItemCatalogo:
+    """Ejemplar del catálogo en memoria, con los datos de su libro."""
+    __slots__ = ("codigo", "titulo", "autor", "isbn", "disponible")
+
+    def __init__(self, codigo, titulo, autor, isbn=None, disponible=True):
+        self.codigo = codigo
+        self.titulo = titulo
+        self.autor = autor
+        self.isbn = isbn
+        self.disponible = disponible
+
+
+class SocioRegistrado:
+    """Socio en memoria (solo lo necesario para validar préstamos)."""
+    __slots__ = ("dni", "nombre", "apellido", "activo")
+
+    def __init__(self, dni, nombre, apellido, activo=True):
+        self.dni = dni
+        self.nombre = nombre
+        self.apellido = apellido
+        self.activo = activo
+
 
 class SistemaBiblioteca:
 
-    def __init__(self):
+    def __init__(self, profundidad_deshacer=100, *, session_factory=None, administrador_dni=None,
+                 tamanio_lote=50, dias_prestamo=7):
         self.catalogo_libros=ListaEnlazada()
         self.lista_socios=ListaEnlazada()
         self.lista_administradores=ListaEnlazada()
-        self.Historial_Prestamos=Pila()
+        # Registros de deshacer/rehacer acotados: la memoria no crece con el turno
+        self.Historial_Prestamos=PilaAcotada(profundidad_deshacer)
+        self.Operaciones_Deshechas=PilaAcotada(profundidad_deshacer)
+
+        # Modo write-through: con session_factory las operaciones se escriben en la base por lotes
+        self._session_factory = session_factory
+        self.administrador_dni = administrador_dni
+        self.tamanio_lote = tamanio_lote
+        self.dias_prestamo = dias_prestamo
+        self._pendientes = []
+        self._prestamos_activos = {}  # código de ejemplar -> DNI del socio
+        self.conflictos = []  # operaciones que la base rechazó (ver sincronizar)
+        self.fallidas = []    # operaciones apartadas después de MAX_INTENTOS escrituras fallidas
+
+    @classmethod
+    def desde_db(cls, administrador_dni, session_factory=None, **kwargs):
+        """Crea el sistema en modo write-through y carga catálogo y socios desde la base."""
+        if session_factory is None:
+            from db.Conector import SessionLocal
+            session_factory = SessionLocal
+        sistema = cls(session_factory=session_factory, administrador_dni=administrador_dni, **kwargs)
+        sistema.cargar_desde_db()
+        return sistema
+
+    # ---------------------------------------------------------------------
+    # Sincronización con la base de datos
+    # ---------------------------------------------------------------------
+    def cargar_desde_db(self, tamanio_bloque=5000):
+        """
+        Carga de una vez los ejemplares activos (con título y autor), los socios y
+        los préstamos abiertos. A partir de aquí las lecturas no consultan la base.
+        """
+        from sqlalchemy import select
+        from modelo import Libro, Ejemplar, Socio, Prestamo
+
+        self.catalogo_libros = ListaEnlazada()
+        self.lista_socios = ListaEnlazada()
+        self._prestamos_activos = {}
+
+        session = self._session_factory()
+        try:
+            ejemplares = (
+                select(Ejemplar.codigo, Libro.titulo, Libro.autor, Libro.isbn, Ejemplar.disponible)
+                .join(Libro, Libro.isbn == Ejemplar.libro_isbn)
+                .where(Ejemplar.baja_ejemplar.is_(None))
+                .execution_options(yield_per=tamanio_bloque)
+            )
+            for fila in session.execute(ejemplares):
+                self.catalogo_libros.agregar(ItemCatalogo(*fila))
+
+            socios = select(Socio.dni, Socio.nombre, Socio.apellido, Socio.activo).execution_options(yield_per=tamanio_bloque)
+            for fila in session.execute(socios):
+                self.lista_socios.agregar(SocioRegistrado(*fila))
+
+            abiertos = select(Prestamo.ejemplar_id, Prestamo.socio_id).where(Prestamo.fecha_devolucion.is_(None))
+            for codigo, dni in session.execute(abiertos):
+                self._prestamos_activos[codigo] = dni
+        finally:
+            session.close()
+
+        print(f"Catálogo cargado: {len(self.catalogo_libros)} ejemplares, {len(self.lista_socios)} socios.")
+
+    def _encolar(self, operacion):
+        """Encola una operación para escribirla en la base; vacía la cola al llenar un lote."""
+        if self._session_factory is None:
+            return
+        self._pendientes.append(operacion)
+        if len(self._pendientes) >= self.tamanio_lote:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """
+        Escribe las operaciones pendientes en un único commit. Las operaciones
+        consecutivas del mismo tipo se envían juntas (executemany).
+        Deshacer un préstamo ya escrito borra su fila y deshacer una devolución
+        reabre el préstamo: la base no guarda préstamos que nunca existieron.
+
+        La base tiene la última palabra: un préstamo cuyo ejemplar ya no está
+        disponible (p. ej. lo prestó otra terminal) se rechaza y queda en
+        `conflictos`. Si el lote falla, se reintenta de a una operación: las que
+        fallan vuelven a la cola sin frenar a las demás y, después de
+        MAX_INTENTOS, quedan apartadas en `fallidas`.
+        Devuelve la cantidad de operaciones escritas.
+        """
+        if self._session_factory is None or not self._pendientes:
+            return 0
+
+        pendientes, self._pendientes = self._pendientes, []
+        try:
+            return self._escribir(pendientes)
+        except Exception as e:
+            print(f"[WARN] No se pudo sincronizar el lote de {len(pendientes)} operaciones: {e}")
+        return self._escribir_de_a_una(pendientes)
+
+    def _escribir_de_a_una(self, operaciones):
+        escritas = 0
+        reintentar = []
+        bloqueados = set()  # códigos con una operación fallida: las siguientes esperan detrás
+        for op in operaciones:
+            if op.codigo_libro in bloqueados:
+                reintentar.append(op)
+                continue
+            try:
+                escritas += self._escribir([op])
+            except Exception as e:
+                op.intentos += 1
+                bloqueados.add(op.codigo_libro)
+                if op.intentos >= MAX_INTENTOS:
+                    op.error = str(e)
+                    self.fallidas.append(op)
+                    print(f"[ERROR] {op!r} apartada después de {op.intentos} intentos: {e}")
+                else:
+                    print(f"[WARN] {op!r} no se pudo escribir (intento {op.intentos}): {e}")
+                    reintentar.append(op)
+        self._pendientes[:0] = reintentar
+        return escritas
+
+    def reintentar_fallidas(self):
+        """Vuelve a encolar las operaciones apartadas (p. ej. cuando vuelve la conexión) y sincroniza."""
+        for op in self.fallidas:
+            op.intentos, op.error = 0, None
+        self._pendientes[:0] = self.fallidas
+        self.fallidas = []
+        return self.sincronizar()
+
+    def _escribir(self, operaciones):
+        """Escribe las operaciones en una transacción; devuelve cuántas se escribieron."""
+        from sqlalchemy import bindparam, select, func
+        from modelo import Ejemplar, Prestamo
+        from db.eventos import registrar_evento, registrar_cambios_prestamos
+
+        prestamos = Prestamo.__table__
+        ejemplares = Ejemplar.__table__
+        rechazadas = []
+        descartados = set()  # códigos con una operación rechazada: el resto del lote no los toca
+        escritas = 0
+
+        session = self._session_factory()
+        try:
+            for tipo, grupo in groupby(operaciones, key=lambda op: op.tipo):
+                grupo = [op for op in grupo if op.codigo_libro not in descartados]
+                codigos = {op.codigo_libro for op in grupo}
+                if not grupo:
+                    continue
+
+                # Ejemplares que la operación toma: tienen que seguir libres (se bloquean hasta el commit)
+                libres = set()
+                if tipo in (PRESTAMO, ANULAR_DEVOLUCION):
+                    libres = set(session.execute(
+                        select(ejemplares.c.codigo)
+                        .where(ejemplares.c.codigo.in_(codigos), ejemplares.c.disponible.is_(True),
+                               ejemplares.c.baja_ejemplar.is_(None))
+                        .with_for_update()
+                    ).scalars())
+
+                # Préstamo afectado por código: el abierto o, al anular una devolución, el último cerrado
+                afectados = {}
+                if tipo != PRESTAMO:
+                    if tipo == ANULAR_DEVOLUCION:
+                        ultimos = (
+                            select(func.max(prestamos.c.id))
+                            .where(prestamos.c.ejemplar_id.in_(codigos), prestamos.c.fecha_devolucion.isnot(None))
+                            .group_by(prestamos.c.ejemplar_id)
+                        )
+                        condicion = prestamos.c.id.in_(ultimos)
+                    else:
+                        condicion = prestamos.c.ejemplar_id.in_(codigos) & prestamos.c.fecha_devolucion.is_(None)
+                    afectados = {
+                        fila.ejemplar_id: fila
+                        for fila in session.execute(
+                            select(prestamos.c.id, prestamos.c.ejemplar_id, prestamos.c.socio_id,
+                                   prestamos.c.fecha_devolucion_pactada)
+                            .where(condicion).with_for_update()
+                        )
+                    }
+
+                aceptadas = []
+                for op in grupo:
+                    if tipo in (PRESTAMO, ANULAR_DEVOLUCION) and op.codigo_libro not in libres:
+                        motivo = "el ejemplar ya no está disponible (¿otra terminal?)"
+                    elif tipo != PRESTAMO and op.codigo_libro not in afectados:
+                        motivo = "no hay un préstamo que coincida en la base"
+                    else:
+                        libres.discard(op.codigo_libro)
+                        aceptadas.append((op, afectados.pop(op.codigo_libro, None)))
+                        continue
+                    rechazadas.append((op, motivo))
+                    descartados.add(op.codigo_libro)
+                if not aceptadas:
+                    continue
+                codigos = [op.codigo_libro for op, _ in aceptadas]
 
+                if tipo == PRESTAMO:
+                    filas = []
+                    for op, _ in aceptadas:
+                        fecha = datetime.fromtimestamp(op.timestamp)
+                        filas.append({
+                            "ejemplar_id": op.codigo_libro,
+                            "socio_id": op.dni_socio,
+                            "administrador_id": self.administrador_dni,
+                            "fecha_prestamo": fecha,
+                            "fecha_devolucion_pactada": fecha + timedelta(days=self.dias_prestamo),
+                        })
+                    session.execute(prestamos.insert(), filas)
+                    ids = dict(session.execute(
+                        select(prestamos.c.ejemplar_id, prestamos.c.id)
+                        .where(prestamos.c.ejemplar_id.in_(codigos), prestamos.c.fecha_devolucion.is_(None))
+                    ).all())
+                elif tipo == DEVOLUCION:
+                    session.execute(
+                        prestamos.update().where(prestamos.c.id == bindparam("b_id"))
+                        .values(fecha_devolucion=bindparam("b_fecha")),
+                        [{"b_id": fila.id, "b_fecha": datetime.fromtimestamp(op.timestamp)} for op, fila in aceptadas],
+                    )
+                elif tipo == ANULAR_PRESTAMO:
+                    session.execute(prestamos.delete().where(prestamos.c.id.in_([fila.id for _, fila in aceptadas])))
+                else:
+                    session.execute(
+                        prestamos.update().where(prestamos.c.id.in_([fila.id for _, fila in aceptadas]))
+                        .values(fecha_devolucion=None)
+                    )
+
+                # Condicional: si otra terminal cambió el ejemplar entre medio, el lote no se confirma
+                disponible = DISPONIBLE_TRAS[tipo]
+                resultado = session.execute(
+                    ejemplares.update()
+                    .where(ejemplares.c.codigo.in_(codigos), ejemplares.c.disponible.is_(not disponible))
+                    .values(disponible=disponible)
+                )
+                if tipo in (PRESTAMO, ANULAR_DEVOLUCION) and resultado.rowcount != len(codigos):
+                    raise RuntimeError("Otra terminal modificó los ejemplares durante la sincronización")
+
+                # Los INSERT/UPDATE directos no pasan por el flush: se auditan y se informan explícitamente
+                if tipo == PRESTAMO:
+                    cambios = [(ids.get(f["ejemplar_id"]), f["fecha_devolucion_pactada"]) for f in filas]
+                elif tipo == ANULAR_DEVOLUCION:
+                    cambios = [(fila.id, fila.fecha_devolucion_pactada) for _, fila in aceptadas]
+                else:
+                    cambios = [(fila.id, None) for _, fila in aceptadas]
+                registrar_cambios_prestamos(session, cambios)
+                for op, fila in aceptadas:
+                    prestamo_id = ids.get(op.codigo_libro) if tipo == PRESTAMO else fila.id
+                    socio = op.dni_socio if fila is None else fila.socio_id
+                    registrar_evento(
+                        session, ACCIONES_AUDITORIA[tipo],
+                        None if tipo == ANULAR_PRESTAMO else prestamo_id,  # la fila ya no existe
+                        op.codigo_libro, socio, f"Prestamo {prestamo_id}: {NOMBRES[tipo].lower()} (mostrador)",
+                    )
+                escritas += len(aceptadas)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        for op, motivo in rechazadas:
+            self._rechazar(op, motivo)
+        return escritas
+
+    def _rechazar(self, op, motivo):
+        """La base rechazó la operación: se aparta en `conflictos` y se ajusta el catálogo en memoria."""
+        op.error = motivo
+        self.conflictos.append(op)
+        if op.tipo == PRESTAMO and self._prestamos_activos.get(op.codigo_libro) == op.dni_socio:
+            # El ejemplar está prestado, pero no por este mostrador
+            self._prestamos_activos.pop(op.codigo_libro, None)
+        print(f"[WARN] {op!r} rechazada por la base: {motivo}")
+
+    def cerrar(self):
+        """Escribe lo pendiente antes de terminar la sesión del mostrador."""
+        self.sincronizar()
+
+    # ---------------------------------------------------------------------
+    # Altas y búsquedas
+    # ---------------------------------------------------------------------
     def agregar_libro(self, codigo, titulo, autor):
-        nuevo_libro=Libro(codigo, titulo, autor)
+        nuevo_libro=ItemCatalogo(codigo, titulo, autor)
         self.catalogo_libros.agregar(nuevo_libro)
         print(f"El libro '{titulo}' fue agregado con éxito.")
 
     def agregar_usuario(self, dni, nombre, apellido):
-        nuevo_usuario=Usuario(dni, nombre, apellido)
-        self.lista_usuarios.agregar(nuevo_usuario)
+        nuevo_usuario=SocioRegistrado(dni, nombre, apellido)
+        self.lista_socios.agregar(nuevo_usuario)
         print(f"El usuario '{nombre}{apellido}' fue agregado con exito")
         
     def buscar_libro_por_titulo(self, titulo):
@@ -26,21 +340,45 @@ class SistemaBiblioteca:
     def buscar_libro_por_autor(self, autor):
         return self.catalogo_libros.buscar_por_autor(autor)
         
+    def buscar_libros_por_titulo(self, titulo):
+        """Genera todos los libros con ese título (sin distinguir mayúsculas)."""
+        return self.catalogo_libros.buscar_todos_por_titulo(titulo)
+
+    def buscar_libros_por_autor(self, autor):
+        """Genera todos los libros de ese autor (sin distinguir mayúsculas)."""
+        return self.catalogo_libros.buscar_todos_por_autor(autor)
+
+    def sugerir_libros_por_titulo(self, prefijo):
+        """Genera, en orden alfabético, los libros cuyo título empieza con el prefijo."""
+        return self.catalogo_libros.buscar_por_prefijo("titulo", prefijo)
+
+    def buscar_libros_por_palabra_del_autor(self, palabra):
+        """Genera los libros cuyo autor tiene esa palabra ("borges" -> "Jorge Luis Borges")."""
+        return self.catalogo_libros.buscar_por_palabra("autor", palabra)
+
+    def sugerir_libros_por_autor(self, prefijo):
+        """Genera los libros con alguna palabra del autor que empieza con el prefijo."""
+        return self.catalogo_libros.buscar_por_prefijo_de_palabra("autor", prefijo)
+
     def buscar_libro_por_codigo(self, codigo):
         return self.catalogo_libros.buscar_por_codigo(codigo)
     
     def buscar_usuario_por_dni(self, dni):
-        return self.lista_usuarios.buscar_por_dni(dni)
+        return self.lista_socios.buscar_por_dni(dni)
     
     def buscar_usuario_por_nombre(self, nombre):
-        return self.lista_usuarios.buscar_por_nombre(nombre)
+        return self.lista_socios.buscar_por_nombre(nombre)
     
     def buscar_usuario_por_apellido(self, apellido):
-        return self.lista_usuarios.buscar_por_apellido(apellido)
+        return self.lista_socios.buscar_por_apellido(apellido)
+
+    def sugerir_usuarios_por_apellido(self, prefijo):
+        """Genera los socios con alguna palabra del apellido que empieza con el prefijo."""
+        return self.lista_socios.buscar_por_prefijo_de_palabra("apellido", prefijo)
             
     def prestar_libro(self, codigo_libro, dni_usuario):
         libro = self.catalogo_libros.buscar_por_codigo(codigo_libro)
-        usuario = self.lista_usuarios.buscar_por_dni(dni_usuario)
+        usuario = self.lista_socios.buscar_por_dni(dni_usuario)
         
         # Validaciones
         if not libro:
@@ -49,16 +387,22 @@ class SistemaBiblioteca:
         if not usuario:
             print("El usuario no se encuentra registrado.")
             return False
+        if not usuario.activo:
+            print(f"El usuario '{usuario.nombre}' no está activo.")
+            return False
         if not libro.disponible:
             print(f"El libro '{libro.titulo}' no se encuentra disponible.")
             return False
         
         # Se realiza el préstamo y se actualiza el estado
         libro.disponible = False
-        nuevo_prestamo = Prestamo(libro, usuario)
         
-        # Se apila la operación en el historial
-        self.Historial_Prestamos.apilar(nuevo_prestamo)
+        self._prestamos_activos[codigo_libro] = dni_usuario
+        
+        # Se apila la operación en el historial y se encola para la base
+        operacion = Operacion(PRESTAMO, codigo_libro, dni_usuario)
+        self._registrar(operacion)
+        self._encolar(operacion)
         
         print(f"El libro '{libro.titulo}' fue prestado con éxito a '{usuario.nombre}'.")
         return True
@@ -78,12 +422,50 @@ class SistemaBiblioteca:
         # Se realiza la devolución y se actualiza el estado
         libro.disponible = True
         
-        # Se apila la devolución
-        self.Historial_Prestamos.apilar(("DEVOLUCION", libro))
+        dni_socio = self._prestamos_activos.pop(codigo_libro, None)
+        
+        # Se apila la devolución y se encola para la base
+        operacion = Operacion(DEVOLUCION, codigo_libro, dni_socio)
+        self._registrar(operacion)
+        self._encolar(operacion)
         
         print(f"El libro '{libro.titulo}' fue devuelto con éxito.")
         return True
         
+    def _registrar(self, operacion):
+        """Apila una operación nueva; cualquier rehacer pendiente deja de ser válido."""
+        self.Historial_Prestamos.apilar(operacion)
+        self.Operaciones_Deshechas.vaciar()
+
+    def _aplicar(self, operacion, revertir):
+        """Aplica (o revierte) el efecto de una operación sobre el catálogo."""
+        libro = self.catalogo_libros.buscar_por_codigo(operacion.codigo_libro)
+        if not libro:
+            return None
+        prestado = operacion.tipo == PRESTAMO
+        libro.disponible = prestado if revertir else not prestado
+
+        if libro.disponible:
+            self._prestamos_activos.pop(operacion.codigo_libro, None)
+        else:
+            self._prestamos_activos[operacion.codigo_libro] = operacion.dni_socio
+
+        if self._session_factory is not None:
+            if not revertir:
+                operacion.intentos, operacion.error = 0, None
+                self._encolar(operacion)
+            elif operacion.error is not None:
+                # Rechazada o apartada: nunca llegó a la base
+                if operacion in self.fallidas:
+                    self.fallidas.remove(operacion)
+            elif operacion in self._pendientes:
+                # Todavía no llegó a la base: basta con descartarla
+                self._pendientes.remove(operacion)
+            else:
+                inversa = ANULAR_PRESTAMO if prestado else ANULAR_DEVOLUCION
+                self._encolar(Operacion(inversa, operacion.codigo_libro, operacion.dni_socio))
+        return libro
+
     def deshacer_ultima_accion(self):
         """
         Revierte la última acción (préstamo o devolución) usando la pila LIFO.
@@ -91,17 +473,43 @@ class SistemaBiblioteca:
         if self.Historial_Prestamos.esta_vacia():
             print("No hay operaciones para deshacer.")
             return False
-        
+
         ultima_operacion = self.Historial_Prestamos.desapilar()
-        
-        # Si la operación es una instancia de la clase Prestamo, revierte el préstamo.
-        if isinstance(ultima_operacion, Prestamo):
-            libro_afectado = ultima_operacion.libro
-            libro_afectado.disponible = True
+        self.Operaciones_Deshechas.apilar(ultima_operacion)
+        libro_afectado = self._aplicar(ultima_operacion, revertir=True)
+        if not libro_afectado:
+            print(f"El libro '{ultima_operacion.codigo_libro}' ya no está en el catálogo.")
+            return True
+
+        if ultima_operacion.tipo == PRESTAMO:
             print(f"La última operación (préstamo de '{libro_afectado.titulo}') ha sido deshecha. El libro ahora está disponible.")
-        
-        # Si la operación es una tupla ("DEVOLUCION", libro), revierte la devolución.
-        elif isinstance(ultima_operacion, tuple) and ultima_operacion[0] == "DEVOLUCION":
-            libro_afectado = ultima_operacion[1]
-            libro_afectado.disponible = False
+        else:
             print(f"La última operación (devolución de '{libro_afectado.titulo}') ha sido deshecha. El libro ahora está prestado.")
+        return True
+
+    def rehacer_ultima_accion(self):
+        """Vuelve a aplicar la última operación deshecha."""
+        if self.Operaciones_Deshechas.esta_vacia():
+            print("No hay operaciones para rehacer.")
+            return False
+
+        operacion = self.Operaciones_Deshechas.desapilar()
+        self.Historial_Prestamos.apilar(operacion)
+        libro_afectado = self._aplicar(operacion, revertir=False)
+        if libro_afectado:
+            print(f"La operación sobre '{libro_afectado.titulo}' ha sido rehecha.")
+        return True
+
+    def deshacer(self, pasos=1):
+        """Deshace hasta 'pasos' operaciones. Devuelve cuántas se deshicieron."""
+        hechos = 0
+        while hechos < pasos and self.deshacer_ultima_accion():
+            hechos += 1
+        return hechos
+
+    def rehacer(self, pasos=1):
+        """Rehace hasta 'pasos' operaciones. Devuelve cuántas se rehicieron."""
+        hechos = 0
+        while hechos < pasos and self.rehacer_ultima_accion():
+            hechos += 1
+        return hechos
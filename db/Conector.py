@@ -1,6 +1,7 @@
 import os
+import threading
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Cargar variables de entorno
@@ -12,15 +13,69 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 DB_PORT = os.getenv("DB_PORT")
 
+
+def _env_int(nombre, default):
+    valor = os.getenv(nombre)
+    return int(valor) if valor not in (None, "") else default
+
+
+def _env_bool(nombre, default):
+    valor = os.getenv(nombre)
+    if valor in (None, ""):
+        return default
+    return valor.strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+
+
+# Pool de conexiones (ajustable desde .env según la cantidad de terminales)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)  # segundos; menor que wait_timeout de MySQL
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+# Con recycle configurado el ping previo suele ser innecesario; se deja activable
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)
+
 # URL de conexión
 DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 engine = create_engine(
     DATABASE_URL,
     echo=False,          # pon True si querés ver todas las queries en consola
-    pool_pre_ping=True,  # evita conexiones muertas
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=DB_POOL_PRE_PING,
 )
 
+# Contadores acumulados del pool (los eventos pueden llegar desde varios hilos)
+_contadores_pool = {"conexiones": 0, "checkouts": 0, "checkins": 0, "invalidadas": 0}
+_contadores_lock = threading.Lock()
+
+
+def _contar(clave):
+    with _contadores_lock:
+        _contadores_pool[clave] += 1
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_conn, conn_record):
+    _contar("conexiones")
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+    _contar("checkouts")
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_conn, conn_record):
+    _contar("checkins")
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_conn, conn_record, exception):
+    _contar("invalidadas")
+
 # Base global compartida por todos los modelos
 Base = declarative_base()
 Base.metadata.bind = engine   # 🔥 ENLAZADO DIRECTO
@@ -35,4 +90,20 @@ class Conector:
     @staticmethod
     def get_session():
         """Devuelve una nueva sesión SQLAlchemy correctamente enlazada."""
-        return SessionLocal()
\ No newline at end of file
+        return SessionLocal()
+
+    @staticmethod
+    def estadisticas_pool() -> dict:
+        """Estado actual del pool y contadores acumulados, para dimensionarlo."""
+        pool = engine.pool
+        with _contadores_lock:
+            stats = dict(_contadores_pool)
+        stats.update({
+            "pool_size": pool.size(),
+            "en_uso": pool.checkedout(),
+            "libres": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": DB_POOL_TIMEOUT,
+        })
+        return stats
@@ -0,0 +1,156 @@
+# db/auditoria.py
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import insert, select, bindparam
+
+# "rapido": el commit no espera al historial. "durable": el commit no termina
+# hasta que sus eventos están escritos en la tabla historial.
+MODO_AUDITORIA = os.getenv("AUDITORIA_MODO", "rapido").strip().lower()
+
+
+class EventoAuditoria:
+    """Un préstamo o una devolución a registrar en el historial."""
+    __slots__ = ("accion", "prestamo_id", "ejemplar_codigo", "socio_dni", "detalle")
+
+    def __init__(self, accion, prestamo_id, ejemplar_codigo, socio_dni, detalle=None):
+        self.accion = accion
+        self.prestamo_id = prestamo_id
+        self.ejemplar_codigo = ejemplar_codigo
+        self.socio_dni = socio_dni
+        self.detalle = detalle
+
+
+class _Aviso:
+    """Lo que espera quien encoló en modo durable: cuándo terminó el lote y si falló."""
+    __slots__ = ("listo", "error")
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.error = None
+
+    def esperar(self, timeout=None):
+        if not self.listo.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+
+class EscritorAuditoria:
+    """
+    Escribe el historial en un hilo de fondo.
+
+    Los eventos se encolan después de cada commit y el hilo los inserta en lotes
+    (hasta `tamanio_lote` filas o cada `intervalo` segundos) con un único
+    executemany por lote. En modo durable, `encolar` espera a que el lote que
+    contiene sus eventos quede confirmado y, si no se pudo escribir, relanza el
+    error (lo mismo `vaciar`): durable garantiza escrito o excepción.
+    """
+
+    def __init__(self, *, modo=None, tamanio_lote=200, intervalo=0.5, engine=None):
+        self.modo = modo or MODO_AUDITORIA
+        self.tamanio_lote = tamanio_lote
+        self.intervalo = intervalo
+        self._engine = engine
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._lock = threading.Lock()
+        self._stmt = None
+
+    # ----------------------------------------------------------
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name="auditoria", daemon=True)
+                self._hilo.start()
+
+    def encolar(self, eventos, *, esperar=None):
+        """Encola eventos; en modo durable (o con esperar=True) bloquea hasta escribirlos."""
+        if not eventos:
+            return
+        esperar = (self.modo == "durable") if esperar is None else esperar
+        aviso = _Aviso() if esperar else None
+        self.iniciar()
+        self._cola.put((list(eventos), aviso))
+        if aviso is not None:
+            aviso.esperar()
+
+    def vaciar(self, timeout=None):
+        """
+        Espera a que todo lo encolado hasta ahora quede escrito. Devuelve False si
+        venció el timeout; relanza el error si el último lote no se pudo escribir.
+        """
+        aviso = _Aviso()
+        self.iniciar()
+        self._cola.put(([], aviso))
+        return aviso.esperar(timeout)
+
+    # ----------------------------------------------------------
+    def _sentencia(self):
+        if self._stmt is None:
+            from modelo import Historial, Ejemplar, Socio
+            # Historial guarda ids; el préstamo trae código de ejemplar y DNI del socio
+            self._stmt = insert(Historial.__table__).values(
+                accion=bindparam("b_accion"),
+                detalle=bindparam("b_detalle"),
+                prestamo_id=bindparam("b_prestamo"),
+                ejemplar_id=select(Ejemplar.id).where(Ejemplar.codigo == bindparam("b_codigo")).scalar_subquery(),
+                socio_id=select(Socio.id).where(Socio.dni == bindparam("b_dni")).scalar_subquery(),
+            )
+        return self._stmt
+
+    def _bucle(self):
+        while True:
+            eventos, avisos = [], []
+            item = self._cola.get()
+            limite = time.monotonic() + self.intervalo
+            while True:
+                lote, aviso = item
+                eventos.extend(lote)
+                if aviso is not None:
+                    avisos.append(aviso)
+                    break  # alguien espera: se escribe ya
+                if len(eventos) >= self.tamanio_lote:
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+            try:
+                self._escribir(eventos)
+            except Exception as e:
+                print(f"[ERROR] Auditoría: no se pudieron escribir {len(eventos)} eventos: {e}")
+                for aviso in avisos:
+                    aviso.error = e  # quien espera recibe el error en vez de un falso "escrito"
+            finally:
+                for aviso in avisos:
+                    aviso.listo.set()
+
+    def _escribir(self, eventos):
+        if not eventos:
+            return
+        if self._engine is None:
+            from db.Conector import engine
+            self._engine = engine
+        parametros = [
+            {
+                "b_accion": e.accion,
+                "b_detalle": e.detalle,
+                "b_prestamo": e.prestamo_id,
+                "b_codigo": e.ejemplar_codigo,
+                "b_dni": e.socio_dni,
+            }
+            for e in eventos
+        ]
+        with self._engine.begin() as conn:
+            for i in range(0, len(parametros), self.tamanio_lote):
+                conn.execute(self._sentencia(), parametros[i:i + self.tamanio_lote])
+
+
+escritor = EscritorAuditoria()
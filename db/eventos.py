@@ -1,27 +1,196 @@
+import atexit
+import threading
+
 from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
-from modelo import Prestamo, Historial
+from modelo import Prestamo
+
+
+# ==========================================================
+# Invalidación de cachés al confirmar cambios
+# ==========================================================
+# Funciones que reciben el conjunto de tablas modificadas en cada commit
+_invalidadores = []
+_invalidadores_lock = threading.Lock()
+
+_TABLAS_SUCIAS = "_tablas_modificadas"
+
+
+def al_confirmar_cambios(funcion):
+    """Registra funcion(tablas) para que se llame después de cada commit con cambios."""
+    with _invalidadores_lock:
+        if funcion not in _invalidadores:
+            _invalidadores.append(funcion)
+    return funcion
+
+
+def _marcar_tablas(session, tablas):
+    if tablas:
+        session.info.setdefault(_TABLAS_SUCIAS, set()).update(tablas)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_flush(session: Session, flush_context):
+    tablas = {
+        obj.__tablename__
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__tablename__")
+    }
+    _marcar_tablas(session, tablas)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_dml(orm_execute_state):
+    # insert()/update()/delete() ejecutados con session.execute no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabla = getattr(orm_execute_state.statement, "table", None)
+        if tabla is not None:
+            _marcar_tablas(orm_execute_state.session, {tabla.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_commit(session: Session):
+    tablas = session.info.pop(_TABLAS_SUCIAS, None)
+    cambios = session.info.pop(_CAMBIOS_PRESTAMOS, None)
+    if not tablas:
+        return
+    if "prestamos" in tablas:
+        # None: se tocaron préstamos sin informar cuáles (los oyentes recargan)
+        with _invalidadores_lock:
+            oyentes = list(_oyentes_prestamos)
+        for funcion in oyentes:
+            funcion(cambios)
+    with _invalidadores_lock:
+        funciones = list(_invalidadores)
+    for funcion in funciones:
+        funcion(frozenset(tablas))
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(session: Session):
+    session.info.pop(_TABLAS_SUCIAS, None)
+    session.info.pop(_CAMBIOS_PRESTAMOS, None)
+
+
+# ==========================================================
+# Cambios en préstamos abiertos
+# ==========================================================
+# Cada commit que toca préstamos avisa [(prestamo_id, fecha_pactada)], con
+# fecha_pactada None si el préstamo se cerró o se borró. Así el calendario de
+# vencimientos se actualiza en memoria en lugar de recargarse.
+_oyentes_prestamos = []
+
+_CAMBIOS_PRESTAMOS = "_cambios_prestamos"
+
+
+def al_cambiar_prestamos(funcion):
+    """Registra funcion(cambios) para que se llame después de cada commit que toque préstamos."""
+    with _invalidadores_lock:
+        if funcion not in _oyentes_prestamos:
+            _oyentes_prestamos.append(funcion)
+    return funcion
+
+
+def registrar_cambios_prestamos(session: Session, cambios):
+    """
+    Informa (prestamo_id, fecha_pactada o None) de escrituras que no pasan por el
+    flush (insert/update/delete directos). Una lista vacía indica que la escritura
+    no afectó préstamos abiertos.
+    """
+    session.info.setdefault(_CAMBIOS_PRESTAMOS, []).extend(cambios)
+
 
 @event.listens_for(Session, "after_flush")
+def _registrar_cambios_prestamos(session: Session, flush_context):
+    cambios = []
+    toco = False
+    for obj in session.new:
+        if isinstance(obj, Prestamo):
+            toco = True
+            abierto = obj.fecha_devolucion is None
+            cambios.append((obj.id, obj.fecha_devolucion_pactada if abierto else None))
+
+    for obj in session.dirty:
+        if isinstance(obj, Prestamo):
+            toco = True
+            attrs = inspect(obj).attrs
+            if attrs.fecha_devolucion.history.has_changes() or attrs.fecha_devolucion_pactada.history.has_changes():
+                abierto = obj.fecha_devolucion is None
+                cambios.append((obj.id, obj.fecha_devolucion_pactada if abierto else None))
+
+    for obj in session.deleted:
+        if isinstance(obj, Prestamo):
+            toco = True
+            cambios.append((obj.id, None))
+
+    if toco:
+        registrar_cambios_prestamos(session, cambios)
+
+
+# ==========================================================
+# Auditoría de préstamos
+# ==========================================================
+# Los eventos se juntan en session.info durante los flush y recién se envían
+# al escritor de fondo después del commit (un rollback los descarta).
+_EVENTOS_AUDITORIA = "_eventos_auditoria"
+_auditoria_activa = False
+
+
+def activar_auditoria():
+    """Registra los listeners que alimentan el historial de préstamos."""
+    global _auditoria_activa
+    from db.auditoria import escritor
+    _auditoria_activa = True
+    if not event.contains(Session, "after_flush", audit_prestamos):
+        event.listen(Session, "after_flush", audit_prestamos)
+        event.listen(Session, "after_commit", _enviar_auditoria)
+        event.listen(Session, "after_rollback", _descartar_auditoria)
+        atexit.register(_vaciar_al_salir)
+    escritor.iniciar()
+
+
+def _vaciar_al_salir():
+    from db.auditoria import escritor
+    try:
+        escritor.vaciar(5)
+    except Exception:
+        pass  # el escritor ya informó el error; al salir no queda a quién avisar
+
+
+def registrar_evento(session: Session, accion: str, prestamo_id, ejemplar_codigo, socio_dni, detalle=None):
+    """Agrega un evento a auditar en el próximo commit (para escrituras que no pasan por el flush)."""
+    if not _auditoria_activa:
+        return
+    from db.auditoria import EventoAuditoria
+    session.info.setdefault(_EVENTOS_AUDITORIA, []).append(
+        EventoAuditoria(accion, prestamo_id, ejemplar_codigo, socio_dni, detalle)
+    )
+
+
 def audit_prestamos(session: Session, flush_context):
     for obj in session.new:
         if isinstance(obj, Prestamo):
-            session.add(Historial(
-                accion="PRESTAR",
-                prestamo_id=obj.id,
-                ejemplar_id=obj.ejemplar_id,
-                usuario_id=obj.usuario_id,
-                detalle=f"Prestamo {obj.id} creado"
-            ))
-            
+            registrar_evento(
+                session, "PRESTAR", obj.id, obj.ejemplar_id, obj.socio_id,
+                f"Prestamo {obj.id} creado"
+            )
+
     for obj in session.dirty:
         if isinstance(obj, Prestamo):
             hist = inspect(obj).attrs.fecha_devolucion.history
             if hist.has_changes() and obj.fecha_devolucion is not None:
-                session.add(Historial(
-                    accion="DEVOLVER",
-                    prestamo_id=obj.id,
-                    ejemplar_id=obj.ejemplar_id,
-                    usuario_id=obj.usuario_id,
-                    detalle=f"Prestamo {obj.id} devuelto"
-                ))
+                registrar_evento(
+                    session, "DEVOLVER", obj.id, obj.ejemplar_id, obj.socio_id,
+                    f"Prestamo {obj.id} devuelto"
+                )
+
+
+def _enviar_auditoria(session: Session):
+    eventos = session.info.pop(_EVENTOS_AUDITORIA, None)
+    if eventos:
+        from db.auditoria import escritor
+        escritor.encolar(eventos)
+
+
+def _descartar_auditoria(session: Session):
+    session.info.pop(_EVENTOS_AUDITORIA, None)
@@ -0,0 +1,112 @@
+# db/referencias.py
+import os
+import threading
+import time
+
+from sqlalchemy import select
+from db.eventos import al_confirmar_cambios
+
+# Segundos que se reutilizan los datos de referencia (cubre cambios hechos desde otras terminales)
+TTL_REFERENCIAS = float(os.getenv("REFERENCIAS_TTL", "300") or 300)
+
+
+class CategoriaRegistrada:
+    __slots__ = ("code", "nombre")
+
+    def __init__(self, code, nombre):
+        self.code = code
+        self.nombre = nombre
+
+
+class AdministradorRegistrado:
+    """Datos públicos del administrador (sin el hash de la contraseña)."""
+    __slots__ = ("dni", "nombre", "apellido")
+
+    def __init__(self, dni, nombre, apellido):
+        self.dni = dni
+        self.nombre = nombre
+        self.apellido = apellido
+
+
+class CacheReferencias:
+    """
+    Caché de proceso para tablas que casi no cambian (categorías y administradores).
+    Cada tabla se lee completa una vez y se sirve desde memoria hasta que vence
+    el TTL, un commit la modifica o se llama a invalidar().
+
+    invalidar() incrementa una generación: una carga que estaba en curso
+    (leyó antes del commit) devuelve sus datos pero no los guarda.
+    """
+
+    _datos = {}     # tabla -> (vence, datos)
+    _generacion = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _obtener(cls, tabla, session, cargar):
+        with cls._lock:
+            entrada = cls._datos.get(tabla)
+            if entrada is not None and time.monotonic() < entrada[0]:
+                return entrada[1]
+            generacion = cls._generacion
+        if session is None:
+            from db.session_manager import SessionManager
+            session = SessionManager.get_session()
+        datos = cargar(session)
+        with cls._lock:
+            if cls._generacion == generacion:
+                cls._datos[tabla] = (time.monotonic() + TTL_REFERENCIAS, datos)
+        return datos
+
+    @classmethod
+    def invalidar(cls, *tablas):
+        """Descarta las tablas indicadas (o todas si no se indica ninguna)."""
+        with cls._lock:
+            cls._generacion += 1
+            if not tablas:
+                cls._datos.clear()
+            for tabla in tablas:
+                cls._datos.pop(tabla, None)
+
+    # ==========================================================
+    # Categorías
+    # ==========================================================
+    @staticmethod
+    def _cargar_categorias(session):
+        from modelo.Categoria import Categoria
+        filas = session.execute(select(Categoria.code, Categoria.nombre).order_by(Categoria.nombre))
+        return {code: CategoriaRegistrada(code, nombre) for code, nombre in filas}
+
+    @classmethod
+    def categorias(cls, session=None) -> list:
+        """Categorías ordenadas por nombre."""
+        return list(cls._obtener("categorias", session, cls._cargar_categorias).values())
+
+    @classmethod
+    def categoria(cls, code, session=None):
+        return cls._obtener("categorias", session, cls._cargar_categorias).get(code)
+
+    # ==========================================================
+    # Administradores
+    # ==========================================================
+    @staticmethod
+    def _cargar_administradores(session):
+        from modelo.Administrador import Administrador
+        filas = session.execute(select(Administrador.dni, Administrador.nombre, Administrador.apellido))
+        return {dni: AdministradorRegistrado(dni, nombre, apellido) for dni, nombre, apellido in filas}
+
+    @classmethod
+    def administrador(cls, dni, session=None):
+        """Devuelve el administrador con ese DNI o None."""
+        try:
+            dni = int(dni)
+        except (TypeError, ValueError):
+            return None
+        return cls._obtener("administradores", session, cls._cargar_administradores).get(dni)
+
+
+@al_confirmar_cambios
+def _invalidar_por_commit(tablas):
+    cambiadas = tablas & {"categorias", "administradores"}
+    if cambiadas:
+        CacheReferencias.invalidar(*cambiadas)
@@ -1,35 +1,61 @@
 # db/session_manager.py
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy.orm import scoped_session
+
 
 class SessionManager:
-    """Manejador global de sesión SQLAlchemy."""
-    _session = None
+    """
+    Registro de sesiones SQLAlchemy.
+    - get_session(): una sesión por hilo (scoped_session); en el hilo de Tk es la de la UI.
+    - unidad_de_trabajo(): sesión propia y de vida corta, con cierre garantizado,
+      pensada para hilos de fondo y operaciones puntuales.
+    """
+    _registry = None
+    _lock = threading.Lock()
 
     @classmethod
-    def get_session(cls):
-        """Devuelve la sesión activa o crea una nueva si fue cerrada o inválida."""
-        try:
-            if cls._session and cls._session.is_active:
-                return cls._session
-        except Exception:
-            pass
+    def _get_registry(cls):
+        if cls._registry is None:
+            with cls._lock:
+                if cls._registry is None:
+                    # 🔹 Import diferido aquí, evita el bucle de importaciones
+                    from db.Conector import SessionLocal
+                    cls._registry = scoped_session(SessionLocal)
+        return cls._registry
 
-        # 🔹 Import diferido aquí, evita el bucle de importaciones
-        from db.Conector import SessionLocal
-        cls._session = SessionLocal()
-        return cls._session
+    @classmethod
+    def get_session(cls):
+        """Devuelve la sesión del hilo actual, creándola si hace falta."""
+        return cls._get_registry()()
 
     @classmethod
     def close_session(cls):
-        if cls._session:
-            try:
-                cls._session.close()
-            except Exception:
-                pass
-            cls._session = None
+        """Cierra y descarta la sesión del hilo actual."""
+        if cls._registry is not None:
+            cls._registry.remove()
 
     @classmethod
     def reset_session(cls):
         cls.close_session()
+        return cls.get_session()
+
+    @classmethod
+    @contextmanager
+    def unidad_de_trabajo(cls, *, commit: bool = True):
+        """
+        Abre una sesión independiente de la del hilo actual. Hace commit al salir
+        (si commit=True), rollback ante una excepción y siempre la cierra.
+        """
         from db.Conector import SessionLocal
-        cls._session = SessionLocal()
-        return cls._session
\ No newline at end of file
+        session = SessionLocal()
+        try:
+            yield session
+            if commit:
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
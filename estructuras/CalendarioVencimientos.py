@@ -0,0 +1,105 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+
+
+def _como_fecha(valor):
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+class CalendarioVencimientos:
+    """
+    Préstamos abiertos agrupados por día de vencimiento.
+
+    Cada día es un bucket (dict fecha -> {prestamo_id: dato}) y los días con
+    préstamos se mantienen ordenados, así "vencidos", "vencen hoy" y "vencen en
+    los próximos N días" cuestan O(log d + k): ubicar el rango de días y recorrer
+    solo los k préstamos que caen en él.
+    Es seguro compartirlo entre hilos: las altas y bajas llegan desde los
+    commits mientras las vistas lo consultan en segundo plano.
+    """
+
+    def __init__(self):
+        self._buckets = {}   # fecha -> {prestamo_id: dato}
+        self._dias = []      # fechas con al menos un préstamo, ordenadas
+        self._fecha_de = {}  # prestamo_id -> fecha
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._fecha_de)
+
+    def __contains__(self, prestamo_id):
+        return prestamo_id in self._fecha_de
+
+    # ---------------------------------------------------------------------
+    # Altas y bajas
+    # ---------------------------------------------------------------------
+    def agregar(self, prestamo_id, fecha_pactada, dato=None):
+        """Registra (o mueve) un préstamo en el día de su fecha pactada."""
+        dia = _como_fecha(fecha_pactada)
+        with self._lock:
+            self._quitar(prestamo_id)
+            bucket = self._buckets.get(dia)
+            if bucket is None:
+                bucket = self._buckets[dia] = {}
+                insort(self._dias, dia)
+            bucket[prestamo_id] = dato
+            self._fecha_de[prestamo_id] = dia
+
+    def quitar(self, prestamo_id):
+        """Quita un préstamo (por ejemplo, al devolverlo). Devuelve False si no estaba."""
+        with self._lock:
+            return self._quitar(prestamo_id)
+
+    def _quitar(self, prestamo_id):
+        dia = self._fecha_de.pop(prestamo_id, None)
+        if dia is None:
+            return False
+        bucket = self._buckets[dia]
+        del bucket[prestamo_id]
+        if not bucket:
+            del self._buckets[dia]
+            del self._dias[bisect_left(self._dias, dia)]
+        return True
+
+    # ---------------------------------------------------------------------
+    # Consultas
+    # ---------------------------------------------------------------------
+    def entre(self, desde=None, hasta=None):
+        """Lista de (prestamo_id, fecha, dato) con desde <= fecha <= hasta, por fecha."""
+        with self._lock:
+            i = 0 if desde is None else bisect_left(self._dias, desde)
+            fin = len(self._dias) if hasta is None else bisect_right(self._dias, hasta)
+            return [
+                (prestamo_id, dia, dato)
+                for dia in self._dias[i:fin]
+                for prestamo_id, dato in self._buckets[dia].items()
+            ]
+
+    def contar_entre(self, desde=None, hasta=None):
+        with self._lock:
+            i = 0 if desde is None else bisect_left(self._dias, desde)
+            fin = len(self._dias) if hasta is None else bisect_right(self._dias, hasta)
+            return sum(len(self._buckets[dia]) for dia in self._dias[i:fin])
+
+    def vencidos(self, hoy=None):
+        """Préstamos cuya fecha pactada ya pasó."""
+        hoy = hoy or date.today()
+        return self.entre(None, hoy - timedelta(days=1))
+
+    def vencen_hoy(self, hoy=None):
+        hoy = hoy or date.today()
+        return self.entre(hoy, hoy)
+
+    def vencen_en(self, dias, hoy=None):
+        """Préstamos que vencen desde hoy hasta dentro de `dias` días (inclusive)."""
+        hoy = hoy or date.today()
+        return self.entre(hoy, hoy + timedelta(days=dias))
+
+    def contar_vencidos(self, hoy=None):
+        hoy = hoy or date.today()
+        return self.contar_entre(None, hoy - timedelta(days=1))
+
+    def contar_vencen_en(self, dias, hoy=None):
+        hoy = hoy or date.today()
+        return self.contar_entre(hoy, hoy + timedelta(days=dias))
@@ -0,0 +1,144 @@
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+
+# Palabras demasiado frecuentes para aportar a la búsqueda
+STOPWORDS = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los", "por",
+    "para", "un", "una", "y", "o", "the", "of", "and",
+})
+
+
+def tokenizar(texto):
+    """Minúsculas, sin acentos, solo letras y números; descarta stopwords."""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return [t for t in _PALABRA.findall(texto) if t not in STOPWORDS]
+
+
+class IndiceInvertido:
+    """
+    Índice invertido en memoria para búsqueda de texto completo.
+
+    Cada término apunta a {doc_id: frecuencia}; los términos se guardan además
+    ordenados para resolver el último término de la consulta como prefijo
+    (búsqueda mientras se escribe). Las consultas exigen todos los términos y
+    se ordenan por BM25. El costo depende de los documentos que contienen los
+    términos buscados, no del tamaño del catálogo.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings = {}    # término -> {doc_id: tf}
+        self._terminos = []    # términos ordenados (para prefijos)
+        self._largos = {}      # doc_id -> cantidad de términos
+        self._terminos_doc = {}  # doc_id -> términos distintos (para quitarlo sin recorrer todo)
+        self._total_largos = 0
+        self._ordenado = True
+
+    def __len__(self):
+        return len(self._largos)
+
+    # ---------------------------------------------------------------------
+    # Altas y bajas
+    # ---------------------------------------------------------------------
+    def agregar(self, doc_id, *textos):
+        """Indexa (o reindexa) un documento con los textos dados."""
+        self.quitar(doc_id)
+        terminos = [t for texto in textos for t in tokenizar(texto)]
+        frecuencias = {}
+        for t in terminos:
+            frecuencias[t] = frecuencias.get(t, 0) + 1
+        for t, tf in frecuencias.items():
+            posting = self._postings.get(t)
+            if posting is None:
+                posting = self._postings[t] = {}
+                self._ordenado = False
+            posting[doc_id] = tf
+        self._largos[doc_id] = len(terminos)
+        self._terminos_doc[doc_id] = tuple(frecuencias)
+        self._total_largos += len(terminos)
+
+    def quitar(self, doc_id):
+        largo = self._largos.pop(doc_id, None)
+        if largo is None:
+            return False
+        self._total_largos -= largo
+        for t in self._terminos_doc.pop(doc_id, ()):
+            posting = self._postings.get(t)
+            if posting is not None and posting.pop(doc_id, None) is not None and not posting:
+                del self._postings[t]
+                self._ordenado = False
+        return True
+
+    def _terminos_ordenados(self):
+        if not self._ordenado:
+            self._terminos = sorted(self._postings)
+            self._ordenado = True
+        return self._terminos
+
+    # ---------------------------------------------------------------------
+    # Consultas
+    # ---------------------------------------------------------------------
+    def _expandir_prefijo(self, prefijo):
+        terminos = self._terminos_ordenados()
+        i = bisect_left(terminos, prefijo)
+        while i < len(terminos) and terminos[i].startswith(prefijo):
+            yield terminos[i]
+            i += 1
+
+    def buscar(self, consulta, limite=50, *, prefijo=True):
+        """
+        Devuelve [(doc_id, puntaje)] de los documentos que contienen todos los
+        términos de la consulta, de mayor a menor puntaje. Con prefijo=True el
+        último término también encuentra palabras que empiezan con él.
+        """
+        terminos = tokenizar(consulta)
+        if not terminos or not self._largos:
+            return []
+
+        # Cada grupo es la lista de términos que satisfacen una palabra de la consulta
+        grupos = [[t] for t in terminos[:-1]]
+        ultimo = terminos[-1]
+        grupos.append(list(self._expandir_prefijo(ultimo)) if prefijo else [ultimo])
+
+        # Documentos por grupo; se intersecta empezando por el más chico
+        docs_por_grupo = []
+        for grupo in grupos:
+            docs = set()
+            for t in grupo:
+                docs.update(self._postings.get(t, ()))
+            if not docs:
+                return []
+            docs_por_grupo.append(docs)
+        docs_por_grupo.sort(key=len)
+        candidatos = docs_por_grupo[0]
+        for docs in docs_por_grupo[1:]:
+            candidatos = candidatos & docs
+            if not candidatos:
+                return []
+
+        n = len(self._largos)
+        promedio = self._total_largos / n if n else 1
+        puntajes = dict.fromkeys(candidatos, 0.0)
+        for grupo in grupos:
+            for t in grupo:
+                posting = self._postings.get(t)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for doc_id in candidatos if len(candidatos) < df else posting:
+                    tf = posting.get(doc_id)
+                    if tf is None or doc_id not in puntajes:
+                        continue
+                    norma = 1 - self.B + self.B * self._largos[doc_id] / promedio
+                    puntajes[doc_id] += idf * tf * (self.K1 + 1) / (tf + self.K1 * norma)
+
+        return heapq.nlargest(limite, puntajes.items(), key=lambda item: item[1])
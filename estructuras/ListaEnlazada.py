@@ -1,68 +1,239 @@
+import re
+from bisect import bisect_left, bisect_right
+
+
 class Nodo:
+    __slots__ = ("dato", "siguiente", "anterior", "claves", "palabras")
+
     def __init__(self, dato):
-        self.dato=dato
-        self.siguiente=None
+        self.dato = dato
+        self.siguiente = None
+        self.anterior = None
+        self.claves = {}
+        self.palabras = {}
+
+
+# Campos indexados: los exactos se comparan tal cual, los de texto en minúsculas
+CAMPOS_EXACTOS = ("codigo", "dni")
+CAMPOS_TEXTO = ("titulo", "autor", "nombre", "apellido")
+# Campos de texto con un índice aparte por palabra ("márquez" encuentra "Gabriel García Márquez")
+CAMPOS_PALABRAS = ("autor", "nombre", "apellido")
+
+_PALABRA = re.compile(r"\w+")
+
 
 class ListaEnlazada:
+    """
+    Lista doblemente enlazada con puntero a la cola e índices hash secundarios.
+    Agregar y eliminar son O(1) y las búsquedas por campo también: cada bucket
+    es un dict id(nodo) -> nodo (en orden de inserción), así quitar un nodo de
+    una clave muy repetida no recorre el bucket.
+
+    Las búsquedas por prefijo usan las claves ordenadas, que se ordenan recién
+    en la primera consulta después de un cambio (como IndiceInvertido): la
+    carga masiva no paga un insort por clave.
+    """
+
     def __init__(self):
-        self.cabeza=None
+        self.cabeza = None
+        self.cola = None
+        self._tamanio = 0
+        self._nodos = {}  # id(dato) -> Nodo
+        self._indices = {campo: {} for campo in CAMPOS_EXACTOS + CAMPOS_TEXTO}
+        self._palabras = {campo: {} for campo in CAMPOS_PALABRAS}  # palabra -> bucket
+        # id(índice) -> sus claves ordenadas, para prefijos; None = cambió, se reordena al consultar
+        self._ordenados = {}
+
+    def __len__(self):
+        return self._tamanio
+
+    def __iter__(self):
+        actual = self.cabeza
+        while actual:
+            yield actual.dato
+            actual = actual.siguiente
 
-    def agregar (self, dato):
-        nuevo_nodo= Nodo(dato)
+    def __contains__(self, dato):
+        return id(dato) in self._nodos
+
+    # ---------------------------------------------------------------------
+    # Índices
+    # ---------------------------------------------------------------------
+    @staticmethod
+    def _claves_de(dato):
+        """
+        Calcula las claves de índice de un dato según los atributos que tenga:
+        (campo -> valor completo, campo -> palabras del valor en CAMPOS_PALABRAS).
+        """
+        claves, palabras = {}, {}
+        for campo in CAMPOS_EXACTOS:
+            valor = getattr(dato, campo, None)
+            if valor is not None:
+                claves[campo] = valor
+        for campo in CAMPOS_TEXTO:
+            valor = getattr(dato, campo, None)
+            if valor is None:
+                continue
+            claves[campo] = texto = str(valor).lower()
+            if campo in CAMPOS_PALABRAS:
+                palabras[campo] = tuple(dict.fromkeys(_PALABRA.findall(texto)))
+        return claves, palabras
+
+    def _agregar_clave(self, indice, clave, nodo):
+        bucket = indice.get(clave)
+        if bucket is None:
+            bucket = indice[clave] = {}
+            self._ordenados[id(indice)] = None
+        bucket[id(nodo)] = nodo
+
+    def _quitar_clave(self, indice, clave, nodo):
+        bucket = indice.get(clave)
+        if not bucket:
+            return
+        bucket.pop(id(nodo), None)
+        if not bucket:
+            del indice[clave]
+            self._ordenados[id(indice)] = None
+
+    def _indexar(self, nodo):
+        nodo.claves, nodo.palabras = self._claves_de(nodo.dato)
+        for campo, clave in nodo.claves.items():
+            self._agregar_clave(self._indices[campo], clave, nodo)
+        for campo, palabras in nodo.palabras.items():
+            for palabra in palabras:
+                self._agregar_clave(self._palabras[campo], palabra, nodo)
+
+    def _desindexar(self, nodo):
+        for campo, clave in nodo.claves.items():
+            self._quitar_clave(self._indices[campo], clave, nodo)
+        for campo, palabras in nodo.palabras.items():
+            for palabra in palabras:
+                self._quitar_clave(self._palabras[campo], palabra, nodo)
+        nodo.claves, nodo.palabras = {}, {}
+
+    def _claves_ordenadas(self, indice):
+        claves = self._ordenados.get(id(indice))
+        if claves is None:
+            claves = self._ordenados[id(indice)] = sorted(indice)
+        return claves
+
+    def _primero(self, campo, clave):
+        bucket = self._indices[campo].get(clave)
+        return next(iter(bucket.values())).dato if bucket else None
+
+    # ---------------------------------------------------------------------
+    # Altas y bajas
+    # ---------------------------------------------------------------------
+    def agregar(self, dato):
+        nuevo_nodo = Nodo(dato)
         if not self.cabeza:
-            self.cabeza=nuevo_nodo
+            self.cabeza = nuevo_nodo
+        else:
+            nuevo_nodo.anterior = self.cola
+            self.cola.siguiente = nuevo_nodo
+        self.cola = nuevo_nodo
+        self._tamanio += 1
+        self._nodos[id(dato)] = nuevo_nodo
+        self._indexar(nuevo_nodo)
+
+    def eliminar(self, dato):
+        """Quita el dato de la lista y de los índices. Devuelve False si no estaba."""
+        nodo = self._nodos.pop(id(dato), None)
+        if nodo is None:
+            return False
+
+        if nodo.anterior:
+            nodo.anterior.siguiente = nodo.siguiente
         else:
-            actual=self.cabeza
-            while actual.siguiente:
-                actual=actual.siguiente
-            actual.siguiente=nuevo_nodo
+            self.cabeza = nodo.siguiente
+        if nodo.siguiente:
+            nodo.siguiente.anterior = nodo.anterior
+        else:
+            self.cola = nodo.anterior
+
+        self._desindexar(nodo)
+        nodo.siguiente = nodo.anterior = None
+        self._tamanio -= 1
+        return True
+
+    def reindexar(self, dato):
+        """Actualiza los índices de un dato cuyos campos cambiaron."""
+        nodo = self._nodos.get(id(dato))
+        if nodo is None:
+            return False
+        self._desindexar(nodo)
+        self._indexar(nodo)
+        return True
 
-# búsqueda de libros
+    @staticmethod
+    def _datos(indice, clave):
+        # Copia del bucket: el consumidor puede modificar la lista mientras itera
+        for nodo in tuple(indice.get(clave, {}).values()):
+            yield nodo.dato
+
+    def _por_prefijo(self, indice, prefijo):
+        prefijo = (prefijo or "").lower()
+        if not prefijo:
+            return
+        vistos = set()
+        claves = self._claves_ordenadas(indice)
+        i = bisect_left(claves, prefijo)
+        while i < len(claves) and claves[i].startswith(prefijo):
+            clave = claves[i]
+            for dato in self._datos(indice, clave):
+                if id(dato) not in vistos:
+                    vistos.add(id(dato))
+                    yield dato
+            # Se reubica por clave por si la lista cambió durante el yield
+            claves = self._claves_ordenadas(indice)
+            i = bisect_right(claves, clave)
+
+    def buscar_todos(self, campo, valor):
+        """Genera todos los datos cuyo campo coincide exactamente con el valor."""
+        if campo in CAMPOS_TEXTO:
+            valor = valor.lower()
+        return self._datos(self._indices[campo], valor)
+
+    def buscar_por_prefijo(self, campo, prefijo):
+        """
+        Genera, en orden alfabético de la clave, los datos cuyo campo de texto
+        empieza con el prefijo. Cuesta O(log n) ubicar el primero y O(1) cada siguiente.
+        """
+        return self._por_prefijo(self._indices[campo], prefijo)
+
+    def buscar_por_palabra(self, campo, palabra):
+        """Genera los datos que tienen esa palabra en el campo (autor, nombre o apellido)."""
+        return self._datos(self._palabras[campo], palabra.lower())
+
+    def buscar_por_prefijo_de_palabra(self, campo, prefijo):
+        """
+        Como buscar_por_prefijo, pero sobre cada palabra del campo: "márq" encuentra
+        "Gabriel García Márquez". Cada dato sale una sola vez.
+        """
+        return self._por_prefijo(self._palabras[campo], prefijo)
+
+    # Búsqueda de libros
     def buscar_por_titulo(self, titulo):
-        actual=self.cabeza
-        while actual:
-            if actual.dato.titulo.lower()== titulo.lower():
-                return actual.dato
-            actual=actual.siguiente
-        return None
-        
+        return self._primero("titulo", titulo.lower())
+
     def buscar_por_autor(self, autor):
-        actual = self.cabeza
-        while actual:
-            if actual.dato.autor.lower() == autor.lower():
-                return actual.dato
-            actual = actual.siguiente
-        return None
-    
+        return self._primero("autor", autor.lower())
+
+    def buscar_todos_por_titulo(self, titulo):
+        return self.buscar_todos("titulo", titulo)
+
+    def buscar_todos_por_autor(self, autor):
+        return self.buscar_todos("autor", autor)
+
     def buscar_por_codigo(self, codigo):
-        actual = self.cabeza
-        while actual:
-            if actual.dato.codigo == codigo:
-                return actual.dato
-            actual = actual.siguiente
-        return None
+        return self._primero("codigo", codigo)
 
     # Búsqueda de usuarios
     def buscar_por_dni(self, dni):
-        actual = self.cabeza
-        while actual:
-            if actual.dato.dni == dni:
-                return actual.dato
-            actual = actual.siguiente
-        return None
+        return self._primero("dni", dni)
 
     def buscar_por_nombre(self, nombre):
-        actual = self.cabeza
-        while actual:
-            if actual.dato.nombre.lower() == nombre.lower():
-                return actual.dato
-            actual = actual.siguiente
-        return None
-        
+        return self._primero("nombre", nombre.lower())
+
     def buscar_por_apellido(self, apellido):
-        actual = self.cabeza
-        while actual:
-            if actual.dato.apellido.lower() == apellido.lower():
-                return actual.dato
-            actual = actual.siguiente
-        return None
+        return self._primero("apellido", apellido.lower())
@@ -0,0 +1,31 @@
+import time
+
+# Códigos de operación del registro de deshacer
+PRESTAMO = 1
+DEVOLUCION = 2
+# Compensaciones que se escriben en la base al deshacer una operación ya sincronizada
+ANULAR_PRESTAMO = 3     # borra el préstamo abierto del ejemplar
+ANULAR_DEVOLUCION = 4   # reabre el último préstamo cerrado del ejemplar
+
+NOMBRES = {
+    PRESTAMO: "PRESTAMO",
+    DEVOLUCION: "DEVOLUCION",
+    ANULAR_PRESTAMO: "ANULAR_PRESTAMO",
+    ANULAR_DEVOLUCION: "ANULAR_DEVOLUCION",
+}
+
+
+class Operacion:
+    """Registro compacto de una operación del mostrador (sin referencias a objetos)."""
+    __slots__ = ("tipo", "codigo_libro", "dni_socio", "timestamp", "intentos", "error")
+
+    def __init__(self, tipo, codigo_libro, dni_socio=None, timestamp=None):
+        self.tipo = tipo
+        self.codigo_libro = codigo_libro
+        self.dni_socio = dni_socio
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.intentos = 0   # escrituras fallidas en la base
+        self.error = None   # motivo si la base la rechazó o se apartó tras fallar
+
+    def __repr__(self):
+        return f"<Operacion {NOMBRES.get(self.tipo, self.tipo)} libro={self.codigo_libro} socio={self.dni_socio}>"
@@ -0,0 +1,39 @@
+class PilaAcotada:
+    """
+    Pila LIFO de capacidad fija sobre un buffer circular.
+    Al llenarse, apilar descarta el elemento más antiguo, así la memoria no crece.
+    """
+
+    def __init__(self, capacidad):
+        if capacidad < 1:
+            raise ValueError("La capacidad debe ser mayor a 0")
+        self.capacidad = capacidad
+        self._items = [None] * capacidad
+        self._tope = 0      # posición donde se apila el próximo elemento
+        self._cantidad = 0
+
+    def __len__(self):
+        return self._cantidad
+
+    def esta_vacia(self):
+        return self._cantidad == 0
+
+    def apilar(self, item):
+        self._items[self._tope] = item
+        self._tope = (self._tope + 1) % self.capacidad
+        if self._cantidad < self.capacidad:
+            self._cantidad += 1
+
+    def desapilar(self):
+        if self.esta_vacia():
+            return None
+        self._tope = (self._tope - 1) % self.capacidad
+        item = self._items[self._tope]
+        self._items[self._tope] = None  # no retener referencias
+        self._cantidad -= 1
+        return item
+
+    def vaciar(self):
+        self._items = [None] * self.capacidad
+        self._tope = 0
+        self._cantidad = 0
@@ -0,0 +1,198 @@
+# helpers/arranque.py
+"""
+Arranque de la aplicación: la ventana de login se pinta primero y la capa de
+datos (SQLAlchemy, modelos, mappers, engine, auditoría) se carga después en un
+hilo de fondo.
+
+Mientras el login espera también se precalienta lo que pagaría el primer
+ingreso: conexiones del pool (TCP, autenticación) y las consultas frecuentes
+(caché de sentencias compiladas de SQLAlchemy y métricas del escritorio).
+
+Con ARRANQUE_REPORTE=1 se imprime el detalle de tiempos por etapa e import.
+Para el desglose completo módulo por módulo: python -X importtime run_app.py
+"""
+import importlib
+import importlib.util
+import os
+import threading
+import time
+
+# Paquetes que tienen que estar instalados (se verifica sin importarlos)
+DEPENDENCIAS = ("sqlalchemy", "customtkinter", "PIL", "dotenv", "mysql.connector")
+
+# Conexiones que se abren de antemano mientras se muestra el login (0 lo desactiva)
+CONEXIONES_PRECALENTADAS = int(os.getenv("DB_POOL_PRECALENTAR", "2") or 0)
+
+REPORTE_DETALLADO = os.getenv("ARRANQUE_REPORTE", "").strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+
+
+def dependencias_faltantes():
+    faltantes = []
+    for nombre in DEPENDENCIAS:
+        try:
+            if importlib.util.find_spec(nombre) is None:
+                faltantes.append(nombre)
+        except ModuleNotFoundError:  # el paquete padre no existe (mysql.connector)
+            faltantes.append(nombre)
+    return faltantes
+
+
+class MedidorArranque:
+    """Marcas de tiempo del arranque, relativas a `inicio`, y duración de cada import medido."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.marcas = []    # (etapa, ms desde el inicio)
+        self.imports = []   # (módulo, ms, hilo)
+        self._lock = threading.Lock()
+
+    def _ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def marcar(self, etapa):
+        with self._lock:
+            self.marcas.append((etapa, self._ms()))
+
+    def importar(self, modulo):
+        """Importa el módulo registrando cuánto tardó (0 si ya estaba cargado)."""
+        t = time.perf_counter()
+        mod = importlib.import_module(modulo)
+        with self._lock:
+            self.imports.append((modulo, (time.perf_counter() - t) * 1000, threading.current_thread().name))
+        return mod
+
+    def tiempo(self, etapa):
+        with self._lock:
+            return next((ms for nombre, ms in self.marcas if nombre == etapa), None)
+
+    def reporte(self) -> str:
+        with self._lock:
+            imports = list(self.imports)
+            marcas = list(self.marcas)
+        lineas = ["⏱️  Tiempos de arranque"]
+        for modulo, ms, hilo in imports:
+            lineas.append(f"   import {modulo:<28} {ms:8.1f} ms  [{hilo}]")
+        for etapa, ms in marcas:
+            lineas.append(f"   {etapa:<35} @ {ms:8.1f} ms")
+        return "\n".join(lineas)
+
+    def resumen(self) -> str:
+        pintado = self.tiempo("primer pintado")
+        datos = self.tiempo("capa de datos lista")
+        partes = []
+        if pintado is not None:
+            partes.append(f"primer pintado en {pintado:.0f} ms")
+        if datos is not None:
+            partes.append(f"capa de datos lista en {datos:.0f} ms")
+        return "⏱️  Arranque: " + ", ".join(partes)
+
+
+medidor = MedidorArranque()
+
+
+# ==========================================================
+# Precalentamiento
+# ==========================================================
+def precalentar_pool(engine, cantidad=CONEXIONES_PRECALENTADAS):
+    """Abre `cantidad` conexiones (sin pasar el tamaño del pool) y las deja libres en el pool."""
+    cantidad = min(cantidad, engine.pool.size())
+    conexiones = []
+    try:
+        for _ in range(cantidad):
+            conexion = engine.connect()
+            conexiones.append(conexion)
+            conexion.exec_driver_sql("SELECT 1")
+    finally:
+        for conexion in conexiones:
+            conexion.close()  # vuelve al pool, abierta
+    return len(conexiones)
+
+
+def precalentar_consultas():
+    """
+    Ejecuta una vez las consultas del login y del primer escritorio: quedan
+    compiladas en la caché del engine y las métricas y categorías en memoria.
+    """
+    from db.session_manager import SessionManager
+    from db.referencias import CacheReferencias
+    from modelo.Administrador import Administrador
+    from vista.componentes.dashboard_stats import DashboardStats
+
+    with SessionManager.unidad_de_trabajo(commit=False) as session:
+        # Misma forma que la consulta de validar_login (el valor no importa)
+        session.query(Administrador).filter_by(dni="0").first()
+        CacheReferencias.categorias(session)
+        DashboardStats.snapshot(session)
+
+
+def _precalentar(etapa, funcion, *args):
+    # Si la base no responde no se corta el arranque: el login mostrará el error
+    try:
+        resultado = funcion(*args)
+        medidor.marcar(etapa)
+        return resultado
+    except Exception as e:
+        print(f"[WARN] Precalentamiento ({etapa}): {e}")
+        return None
+
+
+# ==========================================================
+# Capa de datos en segundo plano
+# ==========================================================
+_capa_lista = threading.Event()
+_capa_error = None
+_capa_hilo = None
+_capa_lock = threading.Lock()
+
+
+def _cargar_capa_datos(auditoria):
+    global _capa_error
+    try:
+        medidor.importar("sqlalchemy")
+        medidor.importar("db.Conector")       # engine (todavía sin conexiones)
+        medidor.importar("modelo")
+        from sqlalchemy.orm import configure_mappers
+        configure_mappers()
+        medidor.marcar("mappers configurados")
+
+        # Lo más lento es la red: las conexiones se abren primero
+        if CONEXIONES_PRECALENTADAS > 0:
+            from db.Conector import engine
+            _precalentar("pool precalentado", precalentar_pool, engine)
+
+        eventos = medidor.importar("db.eventos")
+        if auditoria:
+            eventos.activar_auditoria()
+
+        # Vistas e íconos del escritorio: el primer cambio de pantalla no importa ni lee disco
+        medidor.importar("vista.main_dashboard")
+        from vista.componentes.assets import RegistroAssets, ICONOS_LAYOUT
+        RegistroAssets.precargar(ICONOS_LAYOUT)
+        _precalentar("consultas precalentadas", precalentar_consultas)
+        medidor.marcar("capa de datos lista")
+    except Exception as e:
+        _capa_error = e
+        print(f"[ERROR] No se pudo cargar la capa de datos: {e}")
+    finally:
+        _capa_lista.set()
+        print(medidor.reporte() if REPORTE_DETALLADO else medidor.resumen())
+
+
+def cargar_capa_datos(auditoria=False):
+    """Lanza (una sola vez) la carga de la capa de datos en un hilo de fondo."""
+    global _capa_hilo
+    with _capa_lock:
+        if _capa_hilo is None:
+            _capa_hilo = threading.Thread(
+                target=_cargar_capa_datos, args=(auditoria,), name="arranque", daemon=True
+            )
+            _capa_hilo.start()
+
+
+def esperar_capa_datos(timeout=None):
+    """Bloquea hasta que la capa de datos esté cargada; relanza el error si falló."""
+    cargar_capa_datos()
+    if not _capa_lista.wait(timeout):
+        raise TimeoutError("La capa de datos todavía se está cargando")
+    if _capa_error is not None:
+        raise _capa_error
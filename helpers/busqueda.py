@@ -0,0 +1,83 @@
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from db.eventos import al_confirmar_cambios
+from estructuras.IndiceInvertido import IndiceInvertido
+from modelo import Libro
+
+# ==========================================================
+# Búsqueda de texto completo en el catálogo
+# ==========================================================
+# En MySQL se usa el índice FULLTEXT (Libro.buscar_texto). En otros motores, o si
+# el índice todavía no se creó, se arma un índice invertido local con una sola
+# lectura de (id, titulo, autor) y se responde desde memoria.
+
+# Error de MySQL "Can't find FULLTEXT index matching the column list"
+ER_FT_MATCHING_KEY_NOT_FOUND = 1191
+
+_fulltext_disponible = True
+_indice = None
+_indice_vigente = False
+_indice_lock = threading.Lock()
+
+
+def _indice_local(session: Session) -> IndiceInvertido:
+    """Índice invertido del catálogo; se reconstruye si un commit modificó libros."""
+    global _indice, _indice_vigente
+    with _indice_lock:
+        if _indice is not None and _indice_vigente:
+            return _indice
+        indice = IndiceInvertido()
+        filas = session.execute(
+            select(Libro.id, Libro.titulo, Libro.autor).execution_options(yield_per=5000)
+        )
+        for libro_id, titulo, autor in filas:
+            indice.agregar(libro_id, titulo, autor)
+        _indice, _indice_vigente = indice, True
+        return indice
+
+
+@al_confirmar_cambios
+def _invalidar_indice(tablas):
+    global _indice_vigente
+    if "libros" in tablas:
+        _indice_vigente = False
+
+
+def _falta_indice_fulltext(error: DBAPIError) -> bool:
+    return getattr(error.orig, "errno", None) == ER_FT_MATCHING_KEY_NOT_FOUND
+
+
+def buscar_libros(session: Session, texto: str, limite: int = 50) -> list:
+    """
+    Busca libros por palabras del título o del autor (sin importar acentos ni
+    mayúsculas; la última palabra puede estar incompleta).
+    Devuelve [(Libro, relevancia)] de mayor a menor relevancia.
+    """
+    global _fulltext_disponible
+    texto = (texto or "").strip()
+    if not texto:
+        return []
+
+    if _fulltext_disponible and session.get_bind().dialect.name == "mysql":
+        try:
+            return Libro.buscar_texto(session, texto, limite)
+        except DBAPIError as e:
+            session.rollback()
+            if not _falta_indice_fulltext(e):
+                raise  # caída de conexión, timeout, etc.: no es motivo para dejar el índice
+            # Sin índice FULLTEXT (p. ej. base sin migrar): se pasa al índice local
+            _fulltext_disponible = False
+
+    resultados = _indice_local(session).buscar(texto, limite)
+    if not resultados:
+        return []
+    libros = {
+        libro.id: libro
+        for libro in session.execute(
+            select(Libro).where(Libro.id.in_([libro_id for libro_id, _ in resultados]))
+        ).scalars()
+    }
+    return [(libros[libro_id], puntaje) for libro_id, puntaje in resultados if libro_id in libros]
@@ -0,0 +1,255 @@
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import select, insert, or_
+from sqlalchemy.exc import IntegrityError
+from db.Conector import SessionLocal
+from modelo import Libro, Ejemplar
+from db.referencias import CacheReferencias
+from modelo.LibroCategoria import LibroCategoria
+
+# Columnas esperadas: titulo, autor, isbn, codigo, cantidad (opcional, 1 por defecto)
+# y categorias (opcional, códigos separados por ";" o "|").
+CAMPOS_OBLIGATORIOS = ("titulo", "autor", "isbn", "codigo")
+
+
+# ==========================================================
+# Lectura (generadores: nunca se carga el archivo completo)
+# ==========================================================
+def leer_filas(ruta: str):
+    """Genera (nro_linea, dict) desde un CSV o un JSON Lines (.jsonl / .ndjson)."""
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        if extension in (".jsonl", ".ndjson"):
+            for nro, linea in enumerate(archivo, start=1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    fila = {"_error": f"JSON inválido: {e.msg}"}
+                yield nro, fila if isinstance(fila, dict) else {"_error": "Se esperaba un objeto JSON"}
+        else:
+            lector = csv.DictReader(archivo)
+            for nro, fila in enumerate(lector, start=2):  # la línea 1 es el encabezado
+                yield nro, {(k or "").strip().lower(): v for k, v in fila.items()}
+
+
+def _en_lotes(iterable, tamanio):
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamanio))
+        if not lote:
+            return
+        yield lote
+
+
+# ==========================================================
+# Validación
+# ==========================================================
+def _sin_separadores(valor) -> str:
+    return "".join(c for c in str(valor or "") if c not in "- ").upper()
+
+
+def normalizar_isbn(valor) -> str:
+    """Quita guiones/espacios y valida el dígito verificador (ISBN-10 o ISBN-13)."""
+    isbn = _sin_separadores(valor)
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        suma = sum((10 - i) * int(c) for i, c in enumerate(isbn[:9]))
+        suma += 10 if isbn[9] == "X" else int(isbn[9])
+        if suma % 11 == 0:
+            return isbn
+    elif len(isbn) == 13 and isbn.isdigit():
+        suma = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(isbn[:12]))
+        if (10 - suma % 10) % 10 == int(isbn[12]):
+            return isbn
+    raise ValueError(f"ISBN inválido: '{valor}'")
+
+
+def _validar_fila(fila: dict, categorias_validas: set) -> dict:
+    """Devuelve la fila normalizada o lanza ValueError con el motivo."""
+    if "_error" in fila:
+        raise ValueError(fila["_error"])
+
+    datos = {campo: str(fila.get(campo) or "").strip() for campo in CAMPOS_OBLIGATORIOS}
+    faltantes = [campo for campo, valor in datos.items() if not valor]
+    if faltantes:
+        raise ValueError(f"Faltan campos obligatorios: {', '.join(faltantes)}")
+
+    datos["isbn"] = normalizar_isbn(datos["isbn"])
+    datos["codigo"] = datos["codigo"].upper()
+    if len(datos["titulo"]) > 200 or len(datos["autor"]) > 150:
+        raise ValueError("Título o autor demasiado largos")
+
+    try:
+        datos["cantidad"] = int(fila.get("cantidad") or 1)
+    except (TypeError, ValueError):
+        raise ValueError(f"Cantidad inválida: '{fila.get('cantidad')}'")
+    if datos["cantidad"] < 1:
+        raise ValueError("Debe ingresar al menos un ejemplar.")
+
+    categorias = fila.get("categorias") or ""
+    if isinstance(categorias, str):
+        categorias = categorias.replace("|", ";").split(";")
+    datos["categorias"] = list(dict.fromkeys(c.strip() for c in categorias if c and c.strip()))
+    desconocidas = [c for c in datos["categorias"] if c not in categorias_validas]
+    if desconocidas:
+        raise ValueError(f"Categorías inexistentes: {', '.join(desconocidas)}")
+    return datos
+
+
+# ==========================================================
+# Importación
+# ==========================================================
+class ImportadorCatalogo:
+    """
+    Importa libros, ejemplares y categorías desde un CSV / JSON Lines.
+
+    El archivo se recorre con un generador y se procesa en lotes de
+    `tamanio_lote` filas: por lote, una consulta IN (...) para ISBNs ya cargados,
+    otra para códigos de ejemplar, tres INSERT executemany y un commit. Los
+    duplicados entre lotes los detecta la consulta del lote siguiente, así que
+    la memoria no crece con el tamaño del archivo. Las filas rechazadas se
+    escriben en un CSV de errores (linea, isbn, error).
+
+    Los ISBN se importan normalizados (sin guiones). Los libros cargados antes
+    con guiones o espacios no coinciden con el IN (...) del lote: se leen una
+    vez al empezar (normalizado -> guardado) y se comparan en memoria.
+    """
+
+    def __init__(self, *, session_factory=None, tamanio_lote=500, progreso=None):
+        self.session_factory = session_factory or SessionLocal
+        self.tamanio_lote = tamanio_lote
+        self.progreso = progreso  # función(resumen) llamada después de cada lote
+        self.resumen = {"leidas": 0, "importadas": 0, "ejemplares": 0, "duplicadas": 0, "errores": 0}
+        self._con_separadores = {}
+
+    def importar(self, ruta: str, archivo_errores: str = None) -> dict:
+        archivo_errores = archivo_errores or f"{ruta}.errores.csv"
+        session = self.session_factory()
+        try:
+            categorias_validas = {c.code for c in CacheReferencias.categorias(session)}
+            self._con_separadores = self._isbns_con_separadores(session)
+            with open(archivo_errores, "w", encoding="utf-8", newline="") as salida:
+                self._errores = csv.writer(salida)
+                self._errores.writerow(["linea", "isbn", "error"])
+                for lote in _en_lotes(leer_filas(ruta), self.tamanio_lote):
+                    self._procesar_lote(session, lote, categorias_validas)
+                    if self.progreso:
+                        self.progreso(dict(self.resumen))
+        finally:
+            session.close()
+        return dict(self.resumen)
+
+    # ----------------------------------------------------------
+    @staticmethod
+    def _isbns_con_separadores(session) -> dict:
+        """ISBN normalizado -> ISBN guardado, de los libros guardados con guiones o espacios."""
+        guardados = session.execute(
+            select(Libro.isbn).where(or_(Libro.isbn.contains("-"), Libro.isbn.contains(" ")))
+        ).scalars()
+        return {_sin_separadores(isbn): isbn for isbn in guardados}
+
+    def _rechazar(self, nro, isbn, motivo, *, duplicada=False):
+        self.resumen["duplicadas" if duplicada else "errores"] += 1
+        self._errores.writerow([nro, isbn, motivo])
+
+    def _procesar_lote(self, session, lote, categorias_validas):
+        self.resumen["leidas"] += len(lote)
+
+        # 1) Validación y duplicados dentro del lote
+        validas = {}  # isbn -> (nro, datos)
+        for nro, fila in lote:
+            try:
+                datos = _validar_fila(fila, categorias_validas)
+            except ValueError as e:
+                self._rechazar(nro, fila.get("isbn", ""), str(e))
+                continue
+            if datos["isbn"] in validas:
+                self._rechazar(nro, datos["isbn"], "ISBN repetido en el archivo", duplicada=True)
+                continue
+            validas[datos["isbn"]] = (nro, datos)
+        if not validas:
+            return
+
+        # 2) Duplicados contra la base (una consulta por lote)
+        existentes = {isbn: isbn for isbn in session.execute(
+            select(Libro.isbn).where(Libro.isbn.in_(list(validas)))
+        ).scalars()}
+        existentes.update((isbn, self._con_separadores[isbn]) for isbn in validas if isbn in self._con_separadores)
+        for isbn, guardado in existentes.items():
+            nro, _ = validas.pop(isbn)
+            self._rechazar(nro, isbn, f"Ya existe un libro con ISBN '{guardado}'", duplicada=True)
+
+        # 3) Códigos de ejemplar ya usados (una consulta por lote)
+        codigos = {}
+        for isbn, (nro, datos) in list(validas.items()):
+            propios = [f"{datos['codigo']}-{n}" for n in range(1, datos["cantidad"] + 1)]
+            if any(c in codigos for c in propios):
+                validas.pop(isbn)
+                self._rechazar(nro, isbn, f"Código identificador repetido: '{datos['codigo']}'")
+                continue
+            codigos.update((c, isbn) for c in propios)
+        for sublote in _en_lotes(codigos, 1000):
+            for codigo in session.execute(select(Ejemplar.codigo).where(Ejemplar.codigo.in_(sublote))).scalars():
+                isbn = codigos[codigo]
+                if isbn in validas:
+                    nro, _ = validas.pop(isbn)
+                    self._rechazar(nro, isbn, f"El código generado ya existe: '{codigo}'")
+        if not validas:
+            return
+
+        # 4) Inserción del lote en una transacción
+        filas = list(validas.values())
+        try:
+            self._insertar(session, filas)
+            session.commit()
+            self._contar(filas)
+        except IntegrityError:
+            session.rollback()
+            # Caso raro (carrera con otra terminal): se aísla la fila culpable
+            for nro, datos in filas:
+                try:
+                    self._insertar(session, [(nro, datos)])
+                    session.commit()
+                    self._contar([(nro, datos)])
+                except IntegrityError as e:
+                    session.rollback()
+                    self._rechazar(nro, datos["isbn"], f"Error de integridad: {e.orig}")
+
+    def _insertar(self, session, filas):
+        alta = datetime.now()
+        session.execute(insert(Libro.__table__), [
+            {"titulo": d["titulo"], "autor": d["autor"], "isbn": d["isbn"]} for _, d in filas
+        ])
+        session.execute(insert(Ejemplar.__table__), [
+            {
+                "libro_isbn": d["isbn"],
+                "numero_ejemplar": n,
+                "codigo": f"{d['codigo']}-{n}",
+                "disponible": True,
+                "alta_ejemplar": alta,
+            }
+            for _, d in filas
+            for n in range(1, d["cantidad"] + 1)
+        ])
+        vinculos = [
+            {"libro_isbn": d["isbn"], "categoria_code": code}
+            for _, d in filas
+            for code in d["categorias"]
+        ]
+        if vinculos:
+            session.execute(insert(LibroCategoria.__table__), vinculos)
+
+    def _contar(self, filas):
+        self.resumen["importadas"] += len(filas)
+        self.resumen["ejemplares"] += sum(d["cantidad"] for _, d in filas)
+
+
+def importar_catalogo(ruta: str, archivo_errores: str = None, **opciones) -> dict:
+    """Atajo: importa el archivo y devuelve el resumen."""
+    return ImportadorCatalogo(**opciones).importar(ruta, archivo_errores)
@@ -1,31 +1,25 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from db.Conector import SessionLocal
-from modelo import Prestamo, Socio, Ejemplar, Administrador
+from db.eventos import registrar_evento, registrar_cambios_prestamos
+from db.referencias import CacheReferencias
+from modelo import Prestamo, Socio, Ejemplar
 
-def prestar_por_dni_y_codigo(session: Session, dni: str, codigo_ejemplar: str) -> Prestamo:
+def prestar_por_dni_y_codigo(
+    session: Session,
+    dni: str,
+    codigo_ejemplar: str,
+    administrador_id: int,
+    dias_prestamo: int = 7,
+) -> Prestamo:
     """Crea un préstamo para el ejemplar (por código) a un usuario (por DNI)."""
     dni = (dni or "").strip()
     codigo_ejemplar = (codigo_ejemplar or "").strip()
     if not dni or not codigo_ejemplar:
         raise ValueError("DNI y código de ejemplar son obligatorios")
 
-    socio = session.execute(select(Socio).where(Socio.dni == dni)).scalar_one_or_none()
-    if not socio:
-        raise ValueError(f"Socio con DNI {dni} no existe")
-
-    ejemplar = session.execute(select(Ejemplar).where(Ejemplar.codigo == codigo_ejemplar)).scalar_one_or_none()
-    if not ejemplar:
-        raise ValueError(f"Ejemplar con código {codigo_ejemplar} no existe")
-    session.execute(select(Ejemplar).where(Ejemplar.id == ejemplar.id).with_for_update())
-    prestamo_activo = session.execute(
-        select(Prestamo).where(Prestamo.ejemplar_id == ejemplar.id, Prestamo.fecha_devolucion.is_(None))
-    ).scalar_one_or_none()
-    if prestamo_activo:
-        raise ValueError("Ya existe un préstamo activo para ese ejemplar")
-
-    prestamo = Prestamo.crear(session, ejemplar, socio)
-    return prestamo
+    # Prestamo.crear valida socio, ejemplar y administrador en una sola consulta bloqueante
+    return Prestamo.crear(session, codigo_ejemplar, dni, administrador_id, dias_prestamo)
 
 
 def devolver_por_id(session: Session, id_prestamo: int) -> Prestamo:
@@ -34,4 +28,180 @@ def devolver_por_id(session: Session, id_prestamo: int) -> Prestamo:
     if not prestamo:
         raise ValueError("Préstamo no encontrado")
     prestamo.devolver(session)
-    return prestamo
\ No newline at end of file
+    return prestamo
+
+# ==========================================================
+# Operaciones en lote (ráfagas del lector de códigos)
+# ==========================================================
+def prestar_en_lote(
+    session: Session,
+    pares,
+    administrador_id,
+    dias_prestamo: int = 7,
+    *,
+    commit: bool = True,
+) -> list:
+    """
+    Presta varios ejemplares a la vez. `pares` es una lista de (dni, codigo_ejemplar).
+
+    Todo se resuelve con consultas por conjunto: socios y administrador con IN,
+    los ejemplares se bloquean en un único SELECT ... FOR UPDATE, los préstamos
+    activos se buscan con un IN y se insertan todos con un executemany. Hay un
+    solo commit. Devuelve un resultado por par, en el mismo orden:
+    {"dni", "codigo", "ok", "prestamo_id"} o {"dni", "codigo", "ok": False, "error"}.
+    """
+    from datetime import datetime, timedelta
+
+    if dias_prestamo < 1:
+        raise ValueError("Los días de préstamo deben ser mayor a 0")
+    if dias_prestamo > 30:
+        raise ValueError("No se pueden prestar libros por más de 30 días")
+
+    resultados = [
+        {"dni": (dni or "").strip(), "codigo": (codigo or "").strip(), "ok": False}
+        for dni, codigo in pares
+    ]
+    if not resultados:
+        return resultados
+
+    dnis = {r["dni"] for r in resultados if r["dni"]}
+    codigos = {r["codigo"] for r in resultados if r["codigo"]}
+
+    if CacheReferencias.administrador(administrador_id, session) is None:
+        raise ValueError(f"No existe un administrador con DNI {administrador_id}")
+
+    socios = dict(session.execute(select(Socio.dni, Socio.activo).where(Socio.dni.in_(dnis))).all()) if dnis else {}
+    # Bloqueo de todos los ejemplares involucrados en una sola sentencia
+    ejemplares = dict(
+        session.execute(
+            select(Ejemplar.codigo, Ejemplar.disponible)
+            .where(Ejemplar.codigo.in_(codigos), Ejemplar.baja_ejemplar.is_(None))
+            .with_for_update()
+        ).all()
+    ) if codigos else {}
+    ocupados = set(
+        session.execute(
+            select(Prestamo.ejemplar_id)
+            .where(Prestamo.ejemplar_id.in_(codigos), Prestamo.fecha_devolucion.is_(None))
+        ).scalars()
+    ) if codigos else set()
+
+    fecha_prestamo = datetime.now()
+    fecha_pactada = fecha_prestamo + timedelta(days=dias_prestamo)
+    nuevos = []
+    for r in resultados:
+        if not r["dni"] or not r["codigo"]:
+            r["error"] = "DNI y código de ejemplar son obligatorios"
+        elif r["dni"] not in socios:
+            r["error"] = f"Socio con DNI {r['dni']} no existe"
+        elif not socios[r["dni"]]:
+            r["error"] = f"El socio con DNI {r['dni']} no está activo"
+        elif r["codigo"] not in ejemplares:
+            r["error"] = f"Ejemplar con código {r['codigo']} no existe"
+        elif r["codigo"] in ocupados or not ejemplares[r["codigo"]]:
+            r["error"] = "Ya existe un préstamo activo para ese ejemplar"
+        else:
+            r["ok"] = True
+            ocupados.add(r["codigo"])  # el mismo código repetido en la ráfaga falla
+            nuevos.append({
+                "ejemplar_id": r["codigo"],
+                "socio_id": r["dni"],
+                "administrador_id": administrador_id,
+                "fecha_prestamo": fecha_prestamo,
+                "fecha_devolucion_pactada": fecha_pactada,
+            })
+
+    if nuevos:
+        codigos_ok = [n["ejemplar_id"] for n in nuevos]
+        try:
+            session.execute(insert(Prestamo.__table__), nuevos)
+            session.execute(
+                update(Ejemplar.__table__)
+                .where(Ejemplar.__table__.c.codigo.in_(codigos_ok))
+                .values(disponible=False)
+            )
+            ids = dict(
+                session.execute(
+                    select(Prestamo.ejemplar_id, Prestamo.id)
+                    .where(Prestamo.ejemplar_id.in_(codigos_ok), Prestamo.fecha_devolucion.is_(None))
+                ).all()
+            )
+            # Los INSERT directos no pasan por el flush: se auditan y se informan explícitamente
+            registrar_cambios_prestamos(
+                session, [(ids.get(n["ejemplar_id"]), n["fecha_devolucion_pactada"]) for n in nuevos]
+            )
+            for n in nuevos:
+                prestamo_id = ids.get(n["ejemplar_id"])
+                registrar_evento(session, "PRESTAR", prestamo_id, n["ejemplar_id"], n["socio_id"],
+                                 f"Prestamo {prestamo_id} creado")
+            if commit:
+                session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(f"Error al registrar los préstamos: {str(e)}") from e
+        for r in resultados:
+            if r["ok"]:
+                r["prestamo_id"] = ids.get(r["codigo"])
+
+    return resultados
+
+
+def devolver_en_lote(session: Session, ids_prestamo, *, commit: bool = True) -> list:
+    """
+    Devuelve varios préstamos a la vez. Un único SELECT ... FOR UPDATE bloquea
+    los préstamos y sus ejemplares, dos UPDATE cierran los préstamos y liberan
+    los ejemplares, y hay un solo commit. Devuelve un resultado por id, en orden:
+    {"prestamo_id", "ok", "codigo"} o {"prestamo_id", "ok": False, "error"}.
+    """
+    from datetime import datetime
+
+    resultados = [{"prestamo_id": id_prestamo, "ok": False} for id_prestamo in ids_prestamo]
+    if not resultados:
+        return resultados
+
+    ids = {r["prestamo_id"] for r in resultados}
+    filas = {
+        fila.id: fila
+        for fila in session.execute(
+            select(Prestamo.id, Prestamo.ejemplar_id, Prestamo.socio_id, Prestamo.fecha_devolucion)
+            .join(Ejemplar, Ejemplar.codigo == Prestamo.ejemplar_id)
+            .where(Prestamo.id.in_(ids))
+            .with_for_update()
+        )
+    }
+
+    cerrar = {}
+    for r in resultados:
+        fila = filas.get(r["prestamo_id"])
+        if fila is None:
+            r["error"] = "Préstamo no encontrado"
+        elif fila.fecha_devolucion is not None or fila.id in cerrar:
+            r["error"] = "Este préstamo ya fue devuelto"
+        else:
+            r["ok"] = True
+            r["codigo"] = fila.ejemplar_id
+            cerrar[fila.id] = fila.ejemplar_id
+
+    if cerrar:
+        try:
+            session.execute(
+                update(Prestamo.__table__)
+                .where(Prestamo.__table__.c.id.in_(list(cerrar)))
+                .values(fecha_devolucion=datetime.now())
+            )
+            session.execute(
+                update(Ejemplar.__table__)
+                .where(Ejemplar.__table__.c.codigo.in_(set(cerrar.values())))
+                .values(disponible=True)
+            )
+            registrar_cambios_prestamos(session, [(prestamo_id, None) for prestamo_id in cerrar])
+            for prestamo_id, fila in ((i, filas[i]) for i in cerrar):
+                registrar_evento(session, "DEVOLVER", prestamo_id, fila.ejemplar_id, fila.socio_id,
+                                 f"Prestamo {prestamo_id} devuelto")
+            if commit:
+                session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(f"Error al registrar las devoluciones: {str(e)}") from e
+
+    return resultados
@@ -3,6 +3,13 @@ from sqlalchemy.orm import relationship, Session
 from sqlalchemy.exc import IntegrityError
 from db.Conector import Base
 
+
+def _invalidar_cache():
+    """Las categorías se sirven desde la caché de referencias: se descarta al modificarlas."""
+    from db.referencias import CacheReferencias
+    CacheReferencias.invalidar("categorias")
+
+
 class Categoria(Base):
     __tablename__ = "categorias"
 
@@ -39,6 +46,7 @@ class Categoria(Base):
         
         categoria = cls(nombre=nombre)
         session.add(categoria)
+        _invalidar_cache()
         
         if commit:
             try:
@@ -85,13 +93,14 @@ class Categoria(Base):
             # Verificar que no exista otra categoría con el mismo nombre
             existente = session.query(self.__class__).filter(
                 self.__class__.nombre == nombre,
-                self.__class__.id != self.id
+                self.__class__.code != self.code
             ).one_or_none()
             
             if existente:
                 raise ValueError(f"Ya existe otra categoría con el nombre '{nombre}'")
             
             self.nombre = nombre
+            _invalidar_cache()
         
         if commit:
             try:
@@ -110,6 +119,7 @@ class Categoria(Base):
             raise ValueError(f"No se puede eliminar la categoría '{self.nombre}' porque tiene libros asociados")
         
         session.delete(self)
+        _invalidar_cache()
         
         if commit:
             try:
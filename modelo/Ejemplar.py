@@ -1,6 +1,7 @@
 # modelo/Ejemplar.py
+from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, func, select, insert
 from sqlalchemy.orm import relationship, Session
 from sqlalchemy.exc import IntegrityError
 from db.Conector import Base
@@ -22,6 +23,11 @@ class Ejemplar(Base):
     alta_ejemplar = Column(DateTime(timezone=True), nullable=False)
     baja_ejemplar = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Ejemplares disponibles (y no dados de baja) de un libro
+        Index("ix_ejemplares_libro_disponible", "libro_isbn", "disponible", "baja_ejemplar"),
+    )
+
     # Si en Libro la PK no es isbn, asegurate de definir el back_populates con primaryjoin en ese modelo
     libro = relationship(
         "Libro",
@@ -31,6 +37,9 @@ class Ejemplar(Base):
     )
     prestamos = relationship("Prestamo", back_populates="ejemplar")
 
+    # Máximo de códigos por consulta IN (...) al crear ejemplares en bloque
+    TAMANIO_LOTE_IN = 1000
+
     def __repr__(self) -> str:
         return f"<Ejemplar id={self.id} codigo={self.codigo} numero={self.numero_ejemplar} disponible={self.disponible}>"
 
@@ -116,51 +125,87 @@ class Ejemplar(Base):
         libro_isbn: str,
         cantidad: int,
         *,
+        codigo_base: Optional[str] = None,
         commit: bool = False,
     ) -> List["Ejemplar"]:
         """
         Crea 'cantidad' ejemplares para el libro (ISBN).
         Genera códigos con el código identificador del libro + correlativo.
+
+        Cantidad constante de consultas, sin importar cuántos ejemplares sean:
+        libro + próximo número, un IN (...) para los códigos, un INSERT
+        executemany y un SELECT final que devuelve los ejemplares creados.
         """
         if cantidad < 1:
             raise ValueError("La cantidad debe ser mayor a 0")
 
         from modelo.Libro import Libro
 
-        libro = session.query(Libro).filter_by(isbn=libro_isbn).one_or_none()
-        if not libro:
+        max_num = (
+            select(func.max(cls.numero_ejemplar))
+            .where(cls.libro_isbn == libro_isbn)
+            .scalar_subquery()
+        )
+        fila = session.execute(
+            select(Libro, max_num).where(Libro.isbn == libro_isbn)
+        ).first()
+        if not fila:
             raise ValueError(f"No existe un libro con ISBN '{libro_isbn}'")
+        libro, ultimo = fila
 
-        codigo_base = cls._obtener_codigo_base(libro)
-        sig_num = cls._siguiente_numero_para_isbn(session, libro_isbn)
+        codigo_base = codigo_base or cls._obtener_codigo_base(libro)
+        sig_num = (ultimo or 0) + 1
+        numeros = range(sig_num, sig_num + cantidad)
+        codigos = [f"{codigo_base}-{num}" for num in numeros]
 
-        creados: List[Ejemplar] = []
         try:
-            for offset in range(cantidad):
-                num = sig_num + offset
-                codigo = f"{codigo_base}-{num}"
-
-                if session.query(cls.id).filter_by(codigo=codigo).first():
-                    raise ValueError(f"El código generado ya existe: '{codigo}'")
-
-                ej = cls(
-                    libro_isbn=libro_isbn,
-                    numero_ejemplar=num,
-                    codigo=codigo,
-                    disponible=True,
-                )
-                session.add(ej)
-                creados.append(ej)
+            # Unicidad de todos los códigos en una sola consulta por lote
+            for i in range(0, len(codigos), cls.TAMANIO_LOTE_IN):
+                lote = codigos[i:i + cls.TAMANIO_LOTE_IN]
+                existente = session.execute(
+                    select(cls.codigo).where(cls.codigo.in_(lote)).limit(1)
+                ).scalar()
+                if existente:
+                    raise ValueError(f"El código generado ya existe: '{existente}'")
+
+            alta = datetime.now()
+            session.execute(
+                insert(cls.__table__),
+                [
+                    {
+                        "libro_isbn": libro_isbn,
+                        "numero_ejemplar": num,
+                        "codigo": codigo,
+                        "disponible": True,
+                        "alta_ejemplar": alta,
+                    }
+                    for num, codigo in zip(numeros, codigos)
+                ],
+            )
+            # La colección del libro no ve el INSERT directo: se recarga al usarla
+            session.expire(libro, ["ejemplares"])
 
             if commit:
                 session.commit()
-                for ej in creados:
-                    session.refresh(ej)
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(f"Error al crear los ejemplares: {str(e)}") from e
         except Exception:
             session.rollback()
             raise
 
-        return creados
+        return (
+            session.execute(
+                select(cls)
+                .where(
+                    cls.libro_isbn == libro_isbn,
+                    cls.numero_ejemplar.between(sig_num, sig_num + cantidad - 1),
+                )
+                .order_by(cls.numero_ejemplar.asc())
+            )
+            .scalars()
+            .all()
+        )
 
     # ---------------------------------------------------------------------
     # Consultas
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, func
 from sqlalchemy.orm import relationship
 from db.Conector import Base
 
@@ -13,5 +13,16 @@ class Historial(Base):
     prestamo_id  = Column(Integer, ForeignKey("prestamos.id", ondelete="SET NULL"), nullable=True)
     ejemplar_id  = Column(Integer, ForeignKey("ejemplares.id", ondelete="SET NULL"), nullable=True)
     socio_id   = Column(Integer, ForeignKey("socios.id",  ondelete="SET NULL"), nullable=True)
+    # Id del préstamo una vez archivado (prestamo_id queda en NULL al borrarlo de prestamos)
+    prestamo_archivado_id = Column(Integer, nullable=True, index=True)
 
     prestamo = relationship("Prestamo")
+    prestamo_archivado = relationship(
+        "PrestamoArchivado",
+        primaryjoin="foreign(Historial.prestamo_archivado_id) == PrestamoArchivado.id",
+        viewonly=True,
+    )
+
+    __table_args__ = (
+        Index("ix_historial_timestamp", "timestamp"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index, select
 from sqlalchemy.orm import relationship, Session
 from sqlalchemy.exc import IntegrityError
 from db.Conector import Base
@@ -36,6 +36,11 @@ class Libro(Base):
         viewonly=True
     )
 
+    __table_args__ = (
+        # Búsqueda de texto completo (en otros motores queda como índice común)
+        Index("ft_libros_titulo_autor", "titulo", "autor", mysql_prefix="FULLTEXT"),
+    )
+
     def __repr__(self):
         return f"<Libro id={self.id} titulo={self.titulo!r} autor={self.autor!r}>"
 
@@ -84,6 +89,7 @@ class Libro(Base):
             session,
             libro_isbn=isbn,
             cantidad=cantidad_ejemplares,
+            codigo_base=codigo_identificador,
             commit=False
         )
 
@@ -127,14 +133,14 @@ class Libro(Base):
             cambios.append("autor")
 
         # Agregar ejemplares
-        nuevos = []
         if nuevos_ejemplares and nuevos_ejemplares > 0:
             if not codigo_identificador:
                 raise ValueError("Debe indicar el código identificador para generar nuevos ejemplares.")
-            nuevos = Ejemplar.crear_multiples(
+            Ejemplar.crear_multiples(
                 session,
                 libro_isbn=self.isbn,
                 cantidad=nuevos_ejemplares,
+                codigo_base=codigo_identificador.strip().upper(),
                 commit=False
             )
             cambios.append(f"{nuevos_ejemplares} ejemplares nuevos")
@@ -145,8 +151,6 @@ class Libro(Base):
             try:
                 session.commit()
                 session.refresh(self)
-                for ej in nuevos:
-                    session.refresh(ej)
             except IntegrityError as e:
                 session.rollback()
                 raise ValueError(f"Error al actualizar el libro: {str(e)}") from e
@@ -165,6 +169,31 @@ class Libro(Base):
             return False
         return libro
 
+    @classmethod
+    def buscar_texto(cls, session: Session, texto: str, limite: int = 50) -> list:
+        """
+        Búsqueda de texto completo en título y autor con el índice FULLTEXT de MySQL.
+        Devuelve [(Libro, relevancia)] de mayor a menor relevancia. Todas las palabras
+        son obligatorias y la última se busca como prefijo (búsqueda mientras se escribe).
+        """
+        from sqlalchemy.dialects.mysql import match
+        from estructuras.IndiceInvertido import tokenizar
+
+        terminos = tokenizar(texto)
+        if not terminos:
+            return []
+        consulta = " ".join(f"+{t}" for t in terminos) + "*"
+        relevancia = match(cls.titulo, cls.autor, against=consulta).in_boolean_mode()
+        return [
+            (libro, float(puntaje or 0))
+            for libro, puntaje in session.execute(
+                select(cls, relevancia.label("relevancia"))
+                .where(relevancia)
+                .order_by(relevancia.desc())
+                .limit(limite)
+            ).all()
+        ]
+
     @classmethod
     def buscar_por_titulo_autor(cls, session: Session, titulo: str, autor: str) -> "Libro":
         libro = session.query(cls).filter_by(titulo=titulo.strip(), autor=autor.strip()).one_or_none()
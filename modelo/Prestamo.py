@@ -1,5 +1,5 @@
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, func, select
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index, func, select
 from sqlalchemy.orm import relationship, Session
 from db.Conector import Base
 from modelo import Ejemplar, Socio
@@ -19,16 +19,31 @@ class Prestamo(Base):
     socio = relationship("Socio", back_populates="prestamos")
     administrador = relationship("Administrador", back_populates="prestamos")
 
+    __table_args__ = (
+        # Préstamos abiertos (fecha_devolucion NULL) ordenados por vencimiento
+        Index("ix_prestamos_devolucion_pactada", "fecha_devolucion", "fecha_devolucion_pactada"),
+        # Préstamos abiertos de un socio
+        Index("ix_prestamos_socio_devolucion", "socio_id", "fecha_devolucion"),
+    )
+
     def __repr__(self):
         return f"<Prestamo id={self.id} ejemplar_id={self.ejemplar_id} socio_id={self.socio_id} admin_id={self.administrador_id}>"
 
     @classmethod
-    def crear(cls, session: Session, ejemplar_id: int, socio_id: int, administrador_id: int, dias_prestamo: int, *, commit: bool = False) -> "Prestamo":
-        """Genera un préstamo si el ejemplar está disponible. Calcula la fecha de devolución basándose en los días especificados."""
+    def crear(cls, session: Session, ejemplar_id: str, socio_id: str, administrador_id: int, dias_prestamo: int, *, commit: bool = False) -> "Prestamo":
+        """
+        Genera un préstamo si el ejemplar está disponible. Calcula la fecha de devolución basándose en los días especificados.
+        Recibe las mismas claves que guardan las columnas: código del ejemplar, DNI del socio y DNI del administrador.
+
+        Ejemplar, socio y préstamo activo se validan con una sola consulta que además
+        bloquea el ejemplar (FOR UPDATE) hasta el commit; el administrador sale de
+        la caché de referencias.
+        """
         from modelo.Ejemplar import Ejemplar
         from modelo.Socio import Socio
-        from modelo.Administrador import Administrador
+        from db.referencias import CacheReferencias
         from datetime import datetime, timedelta
+        from sqlalchemy import and_, update
 
         # Validar días de préstamo
         if dias_prestamo < 1:
@@ -36,48 +51,62 @@ class Prestamo(Base):
         if dias_prestamo > 30:
             raise ValueError("No se pueden prestar libros por más de 30 días")
 
-        # Verificar existencia y disponibilidad
-        ejemplar = session.query(Ejemplar).filter_by(id=ejemplar_id).one_or_none()
-        if not ejemplar:
-            raise ValueError(f"No existe un ejemplar con ID {ejemplar_id}")
-        if not ejemplar.disponible:
+        if CacheReferencias.administrador(administrador_id, session) is None:
+            raise ValueError(f"No existe un administrador con DNI {administrador_id}")
+
+        # Verificar existencia y disponibilidad en un único viaje a la base
+        fila = session.execute(
+            select(
+                Ejemplar.disponible,
+                Ejemplar.baja_ejemplar,
+                Socio.dni.label("socio_dni"),
+                Socio.activo.label("socio_activo"),
+                cls.id.label("prestamo_activo"),
+            )
+            .select_from(Ejemplar)
+            .outerjoin(Socio, Socio.dni == socio_id)
+            .outerjoin(cls, and_(cls.ejemplar_id == Ejemplar.codigo, cls.fecha_devolucion.is_(None)))
+            .where(Ejemplar.codigo == ejemplar_id)
+            .limit(1)
+            .with_for_update(of=Ejemplar)
+        ).first()
+
+        if fila is None:
+            raise ValueError(f"No existe un ejemplar con código {ejemplar_id}")
+        if not fila.disponible or fila.baja_ejemplar is not None or fila.prestamo_activo is not None:
             raise ValueError("El ejemplar no está disponible para préstamo")
-
-        socio = session.query(Socio).filter_by(id=socio_id).one_or_none()
-        if not socio:
-            raise ValueError(f"No existe un socio con ID {socio_id}")
-
-        administrador = session.query(Administrador).filter_by(id=administrador_id).one_or_none()
-        if not administrador:
-            raise ValueError(f"No existe un administrador con ID {administrador_id}")
+        if fila.socio_dni is None:
+            raise ValueError(f"No existe un socio con DNI {socio_id}")
+        if not fila.socio_activo:
+            raise ValueError(f"El socio con DNI {socio_id} no está activo")
 
         # Calcular fechas
         fecha_prestamo = datetime.now()
         fecha_devolucion_pactada = fecha_prestamo + timedelta(days=dias_prestamo)
 
-        # Marcar ejemplar como no disponible
-        ejemplar.marcar_como_prestado(session)
+        # Marcar ejemplar como no disponible (también en los objetos ya cargados en la sesión)
+        session.execute(
+            update(Ejemplar)
+            .where(Ejemplar.codigo == ejemplar_id)
+            .values(disponible=False)
+        )
 
-        # Crear un único préstamo correctamente vinculado
         prestamo = cls(
             ejemplar_id=ejemplar_id,
             socio_id=socio_id,
             administrador_id=administrador_id,
             fecha_prestamo=fecha_prestamo,
             fecha_devolucion_pactada=fecha_devolucion_pactada,
-            ejemplar=ejemplar,
-            socio=socio,
-            administrador=administrador
         )
         session.add(prestamo)
 
-        if commit:
-            try:
+        try:
+            session.flush()
+            if commit:
                 session.commit()
-                session.refresh(prestamo)
-            except IntegrityError as e:
-                session.rollback()
-                raise ValueError(f"Error al crear el préstamo: {str(e)}") from e
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(f"Error al crear el préstamo: {str(e)}") from e
 
         return prestamo
 
@@ -129,8 +158,14 @@ class Prestamo(Base):
         return prestamo
     
     @classmethod
-    def listar_por_socio(cls, session: Session, socio_id: int) -> list["Prestamo"]:
-        """Lista todos los préstamos de un socio."""
+    def listar_por_socio(cls, session: Session, socio_id: int, *, incluir_archivados: bool = False) -> list["Prestamo"]:
+        """Lista todos los préstamos de un socio (con incluir_archivados, también los del archivo)."""
+        if incluir_archivados:
+            from modelo.PrestamoArchivado import PrestamoArchivado
+            h = PrestamoArchivado.historial()
+            return session.execute(
+                select(h).where(h.socio_id == socio_id).order_by(h.fecha_prestamo.desc())
+            ).scalars().all()
         return session.query(cls).filter_by(socio_id=socio_id).order_by(cls.fecha_prestamo.desc()).all()
     
     @classmethod
@@ -152,6 +187,21 @@ class Prestamo(Base):
             cls.fecha_devolucion_pactada < datetime.now()
         ).order_by(cls.fecha_devolucion_pactada).all()
     
+    @classmethod
+    def cargar_calendario(cls, session: Session):
+        """Arma el calendario de vencimientos de los préstamos abiertos (usa el índice de fechas)."""
+        from estructuras.CalendarioVencimientos import CalendarioVencimientos
+
+        calendario = CalendarioVencimientos()
+        filas = session.execute(
+            select(cls.id, cls.fecha_devolucion_pactada)
+            .where(cls.fecha_devolucion.is_(None))
+            .order_by(cls.fecha_devolucion_pactada)
+        )
+        for prestamo_id, pactada in filas:
+            calendario.agregar(prestamo_id, pactada)
+        return calendario
+
     def esta_vencido(self) -> bool:
         """Verifica si el préstamo está vencido."""
         from datetime import datetime
@@ -0,0 +1,153 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, Integer, String, DateTime, func, select, insert, update, delete, union_all
+from sqlalchemy.orm import Session, aliased
+from db.Conector import Base
+
+# Antigüedad (en días desde la devolución) a partir de la cual se archiva un préstamo
+ARCHIVO_DIAS = int(os.getenv("ARCHIVO_DIAS", "365") or 365)
+
+# Columnas compartidas por prestamos y prestamos_archivo
+COLUMNAS = (
+    "id",
+    "ejemplar_id",
+    "socio_id",
+    "administrador_id",
+    "fecha_prestamo",
+    "fecha_devolucion_pactada",
+    "fecha_devolucion",
+)
+
+
+class PrestamoArchivado(Base):
+    """
+    Préstamos devueltos hace tiempo, movidos fuera de la tabla prestamos para
+    que la tabla activa y sus índices se mantengan chicos. Conserva el id
+    original; sin claves foráneas para no frenar bajas de socios o ejemplares.
+    """
+    __tablename__ = "prestamos_archivo"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    ejemplar_id = Column(String(50), nullable=False, index=True)
+    socio_id = Column(Integer, nullable=False, index=True)
+    administrador_id = Column(Integer, nullable=False)
+    fecha_prestamo = Column(DateTime(timezone=True), nullable=False)
+    fecha_devolucion_pactada = Column(DateTime(timezone=True), nullable=False)
+    fecha_devolucion = Column(DateTime(timezone=True), nullable=False, index=True)
+    fecha_archivado = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<PrestamoArchivado id={self.id} ejemplar_id={self.ejemplar_id} socio_id={self.socio_id}>"
+
+    # ==========================================================
+    # ARCHIVADO
+    # ==========================================================
+    @classmethod
+    def archivar_lote(cls, session: Session, antiguedad_dias: int = None, tamanio_lote: int = 500) -> int:
+        """
+        Mueve un lote de préstamos devueltos antes de `antiguedad_dias` al archivo
+        (INSERT ... SELECT + DELETE) y confirma. Devuelve cuántos movió.
+        La transacción abarca solo ese lote, así los bloqueos duran poco.
+        Antes de borrar, el historial de esos préstamos pasa a apuntar al archivo
+        (prestamo_archivado_id); la FK prestamo_id queda en NULL por el SET NULL.
+        """
+        from modelo.Prestamo import Prestamo
+        from modelo.Historial import Historial
+        from db.eventos import registrar_cambios_prestamos
+
+        dias = ARCHIVO_DIAS if antiguedad_dias is None else antiguedad_dias
+        if dias < 1:
+            raise ValueError("La antigüedad debe ser de al menos un día")
+        limite = datetime.now() - timedelta(days=dias)
+
+        try:
+            ids = session.execute(
+                select(Prestamo.id)
+                .where(Prestamo.fecha_devolucion.isnot(None), Prestamo.fecha_devolucion < limite)
+                .order_by(Prestamo.id)
+                .limit(tamanio_lote)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                session.rollback()
+                return 0
+
+            session.execute(
+                insert(cls.__table__).from_select(
+                    list(COLUMNAS),
+                    select(*[Prestamo.__table__.c[c] for c in COLUMNAS]).where(Prestamo.__table__.c.id.in_(ids)),
+                )
+            )
+            session.execute(
+                update(Historial.__table__)
+                .where(Historial.__table__.c.prestamo_id.in_(ids))
+                .values(prestamo_archivado_id=Historial.__table__.c.prestamo_id)
+            )
+            session.execute(delete(Prestamo.__table__).where(Prestamo.__table__.c.id.in_(ids)))
+            registrar_cambios_prestamos(session, [])  # solo préstamos devueltos: el calendario no cambia
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return len(ids)
+
+    @classmethod
+    def archivar(
+        cls,
+        session_factory=None,
+        antiguedad_dias: int = None,
+        tamanio_lote: int = 500,
+        pausa: float = 0.05,
+        max_lotes: int = None,
+        progreso=None,
+    ) -> int:
+        """
+        Archiva de a lotes hasta que no queden préstamos viejos (o hasta `max_lotes`).
+        Entre lote y lote espera `pausa` segundos para no competir con las terminales.
+        """
+        if session_factory is None:
+            from db.Conector import SessionLocal
+            session_factory = SessionLocal
+
+        total = lotes = 0
+        session = session_factory()
+        try:
+            while max_lotes is None or lotes < max_lotes:
+                movidos = cls.archivar_lote(session, antiguedad_dias, tamanio_lote)
+                if not movidos:
+                    break
+                total += movidos
+                lotes += 1
+                if progreso:
+                    progreso(total)
+                if pausa:
+                    time.sleep(pausa)
+        finally:
+            session.close()
+        return total
+
+    # ==========================================================
+    # CONSULTAS SOBRE PRÉSTAMOS ACTIVOS + ARCHIVADOS
+    # ==========================================================
+    @classmethod
+    def historial(cls):
+        """
+        Devuelve un alias de Prestamo sobre prestamos UNION ALL prestamos_archivo.
+        Se usa como Prestamo (mismas columnas y relaciones) en consultas de historial:
+            H = PrestamoArchivado.historial()
+            select(H).join(H.socio).where(H.socio_id == dni)
+
+        Costo: MySQL materializa la unión como tabla derivada en cada consulta
+        (no usa los índices de las tablas de origen para ORDER BY/LIMIT). Sirve
+        para consultas acotadas (p. ej. por socio); para listados paginados
+        conviene paginar cada tabla por separado (ver FuenteUnion).
+        """
+        from modelo.Prestamo import Prestamo
+
+        union = union_all(
+            select(*[Prestamo.__table__.c[c] for c in COLUMNAS]),
+            select(*[cls.__table__.c[c] for c in COLUMNAS]),
+        ).subquery("prestamos_historial")
+        return aliased(Prestamo, union, name="prestamos_historial")
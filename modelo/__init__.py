@@ -4,3 +4,4 @@ from .Administrador import Administrador
 from .Prestamo import Prestamo
 from .Historial import Historial
 from .Socio import Socio
+from .PrestamoArchivado import PrestamoArchivado
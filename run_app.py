@@ -1,3 +1,6 @@
+import time
+_INICIO = time.perf_counter()
+
 import os
 import sys
 
@@ -5,26 +8,20 @@ import sys
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-# Try imports to validate environment
-try:
-    import sqlalchemy
-    from db.Conector import Base
-    from modelo.Libro import Libro
-    from modelo.LibroCategoria import LibroCategoria
-    from modelo.Categoria import Categoria
-    print("Environment setup successful!")
-    print("SQLAlchemy version:", sqlalchemy.__version__)
-    print("All models imported correctly")
-except ImportError as e:
-    print("Error importing dependencies:", str(e))
+# Validate the environment without importing the heavy packages:
+# SQLAlchemy and the models are loaded in the background once the login is on screen
+from helpers.arranque import medidor, dependencias_faltantes
+
+medidor.inicio = _INICIO
+faltantes = dependencias_faltantes()
+if faltantes:
+    print("Error importing dependencies:", ", ".join(faltantes))
     print("\nPlease run these commands to set up the environment:")
     print("python -m venv venv")
     print(".\\venv\\Scripts\\Activate.ps1")
     print("python -m pip install -r requirements.txt")
     sys.exit(1)
 
-from vista.login import LoginWindow
-
 if __name__ == "__main__":
-    app = LoginWindow()
-    app.mainloop()
\ No newline at end of file
+    login = medidor.importar("vista.login")
+    login.main(auditoria=True)
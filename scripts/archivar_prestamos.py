@@ -0,0 +1,42 @@
+"""
+Script para archivar préstamos devueltos hace tiempo.
+Mueve de a lotes los préstamos de la tabla prestamos a prestamos_archivo.
+Pensado para correr de noche (cron / tarea programada).
+
+Uso:
+    python scripts/archivar_prestamos.py [--dias 365] [--lote 500] [--pausa 0.05]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modelo.PrestamoArchivado import PrestamoArchivado, ARCHIVO_DIAS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiva préstamos devueltos antiguos.")
+    parser.add_argument("--dias", type=int, default=ARCHIVO_DIAS, help=f"Antigüedad mínima en días (default {ARCHIVO_DIAS})")
+    parser.add_argument("--lote", type=int, default=500, help="Préstamos por transacción (default 500)")
+    parser.add_argument("--pausa", type=float, default=0.05, help="Segundos de espera entre lotes")
+    args = parser.parse_args()
+
+    try:
+        total = PrestamoArchivado.archivar(
+            antiguedad_dias=args.dias,
+            tamanio_lote=args.lote,
+            pausa=args.pausa,
+            progreso=lambda n: print(f"\r📦 {n} préstamos archivados", end="", flush=True),
+        )
+    except Exception as e:
+        print(f"\n❌ Error al archivar préstamos: {e}")
+        sys.exit(1)
+
+    print()
+    print(f"✅ Archivado finalizado: {total} préstamos movidos a prestamos_archivo")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,232 @@
+"""
+Gestión del esquema de la base de datos.
+
+Uso:
+    python scripts/crear_tablas.py crear       # crea tablas, índices y vistas que falten
+    python scripts/crear_tablas.py indices     # agrega a una base existente las columnas opcionales y los índices declarados
+    python scripts/crear_tablas.py explain     # EXPLAIN de las consultas frecuentes
+    python scripts/crear_tablas.py verificar   # chequeo previo a una versión (sale con 1 si hay problemas)
+
+Sin argumentos equivale a "crear".
+"""
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text, inspect
 from db.Conector import Base, engine
-from modelo import Libro, Ejemplar, Prestamo, Socio, Administrador, Categoria, LibroCategoria, Historial
+from modelo import Libro, Ejemplar, Prestamo, Socio, Administrador, Categoria, LibroCategoria, Historial, PrestamoArchivado
+from modelo.PrestamoArchivado import COLUMNAS
+
+
+# ==========================================================
+# Consultas frecuentes de la aplicación (para EXPLAIN)
+# ==========================================================
+def _consultas_frecuentes():
+    ahora = datetime.now()
+    consultas = []
+    if engine.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import match
+        consultas.append((
+            "Búsqueda de texto en libros",
+            select(Libro.id).where(match(Libro.titulo, Libro.autor, against="+guerra*").in_boolean_mode()),
+        ))
+    return consultas + [
+        ("Socio por DNI", select(Socio.id).where(Socio.dni == "00000000")),
+        ("Libro por ISBN", select(Libro.id).where(Libro.isbn == "0000000000")),
+        ("Ejemplar por código", select(Ejemplar.id).where(Ejemplar.codigo == "X-1")),
+        (
+            "Ejemplares disponibles de un libro",
+            select(Ejemplar.codigo).where(
+                Ejemplar.libro_isbn == "0000000000",
+                Ejemplar.disponible.is_(True),
+                Ejemplar.baja_ejemplar.is_(None),
+            ),
+        ),
+        (
+            "Préstamo activo de un socio",
+            select(Prestamo.id).where(Prestamo.socio_id == 0, Prestamo.fecha_devolucion.is_(None)),
+        ),
+        (
+            "Préstamo activo de un ejemplar",
+            select(Prestamo.id).where(Prestamo.ejemplar_id == "X-1", Prestamo.fecha_devolucion.is_(None)),
+        ),
+        (
+            "Calendario de vencimientos",
+            select(Prestamo.id, Prestamo.fecha_devolucion_pactada)
+            .where(Prestamo.fecha_devolucion.is_(None))
+            .order_by(Prestamo.fecha_devolucion_pactada),
+        ),
+        (
+            "Préstamos vencidos",
+            select(Prestamo.id).where(
+                Prestamo.fecha_devolucion.is_(None),
+                Prestamo.fecha_devolucion_pactada < ahora,
+            ),
+        ),
+        (
+            "Historial reciente",
+            select(Historial.id).where(Historial.timestamp >= ahora).order_by(Historial.timestamp.desc()).limit(50),
+        ),
+        (
+            "Archivo por socio",
+            select(PrestamoArchivado.id).where(PrestamoArchivado.socio_id == 0),
+        ),
+    ]
+
+
+# ==========================================================
+# Comandos
+# ==========================================================
+def crear():
+    """Crea tablas (con sus índices) y la vista de historial."""
+    Base.metadata.create_all(bind=engine)
+
+    # Vista de historial: préstamos activos + archivados, para consultas SQL directas
+    columnas = ", ".join(COLUMNAS)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE OR REPLACE VIEW prestamos_historial AS "
+            f"SELECT {columnas} FROM prestamos "
+            f"UNION ALL SELECT {columnas} FROM prestamos_archivo"
+        ))
+    print("✅ Tablas y vistas creadas / actualizadas")
+
+
+def columnas_faltantes():
+    """Devuelve las columnas declaradas en los modelos que no existen en tablas ya creadas."""
+    inspector = inspect(engine)
+    tablas = set(inspector.get_table_names())
+    faltantes = []
+    for tabla in Base.metadata.sorted_tables:
+        if tabla.name not in tablas:
+            continue
+        existentes = {c["name"] for c in inspector.get_columns(tabla.name)}
+        faltantes.extend(c for c in tabla.columns if c.name not in existentes)
+    return faltantes
+
+
+def aplicar_columnas(simular=False):
+    """
+    Agrega las columnas faltantes que admiten NULL (sin valor que calcular para
+    las filas existentes). Las obligatorias requieren una migración a mano.
+    """
+    faltantes = columnas_faltantes()
+    for columna in faltantes:
+        tipo = columna.type.compile(dialect=engine.dialect)
+        if not columna.nullable:
+            print(f"⚠️  {columna.table.name}.{columna.name} ({tipo}) es obligatoria: agregarla a mano")
+            continue
+        print(f"➕ {columna.table.name}.{columna.name} ({tipo})")
+        if simular:
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {columna.table.name} ADD COLUMN {columna.name} {tipo} NULL"))
+    return faltantes
+
+
+def indices_faltantes():
+    """Devuelve los índices declarados en los modelos que no existen en la base."""
+    inspector = inspect(engine)
+    tablas = set(inspector.get_table_names())
+    faltantes = []
+    for tabla in Base.metadata.sorted_tables:
+        if tabla.name not in tablas:
+            continue  # la crea create_all, con sus índices
+        existentes = {i["name"] for i in inspector.get_indexes(tabla.name)}
+        faltantes.extend(i for i in tabla.indexes if i.name not in existentes)
+    return faltantes
+
+
+def aplicar_indices(simular=False):
+    """Crea los índices faltantes; en MySQL sin bloquear escrituras (ALGORITHM=INPLACE, LOCK=NONE)."""
+    faltantes = indices_faltantes()
+    if not faltantes:
+        print("✅ Todos los índices declarados existen")
+        return []
+
+    for indice in faltantes:
+        columnas = ", ".join(c.name for c in indice.columns)
+        print(f"➕ {indice.table.name}.{indice.name} ({columnas})")
+        if simular:
+            continue
+        with engine.begin() as conn:
+            if engine.dialect.name == "mysql":
+                # InnoDB arma los FULLTEXT en el lugar pero solo admite lecturas mientras tanto
+                prefijo = (indice.dialect_options["mysql"].get("prefix") or "").upper()
+                bloqueo = "SHARED" if prefijo == "FULLTEXT" else "NONE"
+                conn.execute(text(
+                    f"ALTER TABLE {indice.table.name} ADD {prefijo + ' ' if prefijo else ''}INDEX "
+                    f"{indice.name} ({columnas}), ALGORITHM=INPLACE, LOCK={bloqueo}"
+                ))
+            else:
+                indice.create(bind=conn)
+    return faltantes
+
+
+def explain():
+    """
+    Corre EXPLAIN sobre las consultas frecuentes y devuelve las que recorren
+    una tabla completa (type = ALL). En tablas casi vacías el optimizador puede
+    preferir un scan aunque exista el índice: conviene correrlo con datos reales.
+    """
+    problemas = []
+    with engine.connect() as conn:
+        for nombre, stmt in _consultas_frecuentes():
+            sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+            filas = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+            scans = [f for f in filas if str(f.get("type", "")).upper() == "ALL"]
+            claves = ", ".join(str(f.get("key")) for f in filas if f.get("key")) or "-"
+            if scans:
+                tablas = ", ".join(str(f.get("table")) for f in scans)
+                print(f"⚠️  {nombre}: recorrido completo de {tablas}")
+                problemas.append(nombre)
+            else:
+                print(f"✅ {nombre}: índice {claves}")
+    return problemas
+
+
+def verificar():
+    """Chequeo previo a una versión: columnas e índices faltantes + consultas sin índice."""
+    columnas = aplicar_columnas(simular=True)
+    faltantes = aplicar_indices(simular=True)
+    problemas = explain()
+    if columnas or faltantes or problemas:
+        print(
+            f"❌ {len(columnas)} columnas faltantes, {len(faltantes)} índices faltantes, "
+            f"{len(problemas)} consultas con recorrido completo"
+        )
+        return 1
+    print("✅ Esquema verificado")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestión del esquema de la biblioteca.")
+    parser.add_argument(
+        "comando", nargs="?", default="crear",
+        choices=["crear", "indices", "explain", "verificar"],
+    )
+    parser.add_argument("--simular", action="store_true", help="Con 'indices': solo listar, no crear")
+    args = parser.parse_args()
+
+    if args.comando == "crear":
+        crear()
+        aplicar_columnas()
+        aplicar_indices()
+    elif args.comando == "indices":
+        # Primero las columnas: un índice nuevo puede ser sobre una columna nueva
+        aplicar_columnas(simular=args.simular)
+        aplicar_indices(simular=args.simular)
+    elif args.comando == "explain":
+        sys.exit(1 if explain() else 0)
+    else:
+        sys.exit(verificar())
+
 
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Script para importar el catálogo de libros desde un CSV o JSON Lines.
+
+Columnas: titulo, autor, isbn, codigo, cantidad (opcional), categorias (opcional,
+códigos separados por ";").
+
+Uso:
+    python scripts/importar_catalogo.py libros.csv [--lote 500] [--errores errores.csv]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helpers.catalogo import ImportadorCatalogo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa libros y ejemplares en bloque.")
+    parser.add_argument("ruta", help="Archivo .csv, .jsonl o .ndjson")
+    parser.add_argument("--lote", type=int, default=500, help="Filas por transacción (default 500)")
+    parser.add_argument("--errores", default=None, help="CSV de filas rechazadas (default <ruta>.errores.csv)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+
+    def progreso(resumen):
+        transcurrido = time.perf_counter() - inicio
+        print(
+            f"\r📚 {resumen['leidas']} leídas | {resumen['importadas']} importadas | "
+            f"{resumen['duplicadas']} duplicadas | {resumen['errores']} con error | "
+            f"{resumen['leidas'] / max(transcurrido, 1e-6):.0f} filas/s",
+            end="", flush=True,
+        )
+
+    importador = ImportadorCatalogo(tamanio_lote=args.lote, progreso=progreso)
+    archivo_errores = args.errores or f"{args.ruta}.errores.csv"
+    try:
+        resumen = importador.importar(args.ruta, archivo_errores)
+    except Exception as e:
+        print(f"\n❌ Error al importar el catálogo: {e}")
+        sys.exit(1)
+
+    print()
+    print(f"✅ Importación finalizada en {time.perf_counter() - inicio:.1f} s")
+    print(f"   Libros: {resumen['importadas']} | Ejemplares: {resumen['ejemplares']}")
+    if resumen["duplicadas"] or resumen["errores"]:
+        print(f"   Filas rechazadas: {resumen['duplicadas'] + resumen['errores']} (ver {archivo_errores})")
+
+
+if __name__ == "__main__":
+    main()
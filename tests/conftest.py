@@ -0,0 +1,68 @@
+import os
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Conector arma el engine de MySQL al importarse (sin conectar): alcanza con valores de relleno
+for clave, valor in {"DB_HOST": "localhost", "DB_PORT": "3306", "DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(clave, valor)
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.Conector import Base
+import modelo  # noqa: F401  (registra todos los modelos)
+from modelo.Administrador import Administrador
+from modelo.Socio import Socio
+from modelo.Libro import Libro
+from modelo.Ejemplar import Ejemplar
+from modelo.Prestamo import Prestamo
+from db.referencias import CacheReferencias
+
+
+@pytest.fixture
+def session():
+    """Sesión sobre una base SQLite en memoria con todas las tablas creadas."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    CacheReferencias.invalidar()
+    s = sessionmaker(bind=engine)()
+    try:
+        yield s
+    finally:
+        s.close()
+        CacheReferencias.invalidar()
+        engine.dispose()
+
+
+@pytest.fixture
+def datos(session):
+    """Un administrador, un socio activo, un libro y dos ejemplares disponibles."""
+    session.add(Administrador(dni=1, nombre="Admin", apellido="Prueba", password="x"))
+    session.add(Socio(dni="30111222", nombre="Ana", apellido="Paz", direccion="Calle 1",
+                      celular="1122334455", email="ana@mail.com", activo=True, fecha_alta=date.today()))
+    session.add(Libro(titulo="Rayuela", autor="Julio Cortázar", isbn="9788437604572"))
+    for n in (1, 2):
+        session.add(Ejemplar(codigo=f"RAY-{n}", numero_ejemplar=n, disponible=True,
+                             libro_isbn="9788437604572", alta_ejemplar=date.today()))
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def prestamos_devueltos(datos):
+    """Función que crea `cantidad` préstamos devueltos: los de id par hace dos años, los impares ayer."""
+    def crear(cantidad):
+        ahora = datetime.now()
+        for n in range(1, cantidad + 1):
+            devuelto = ahora - (timedelta(days=730 + n) if n % 2 == 0 else timedelta(days=1, minutes=n))
+            datos.add(Prestamo(id=n, ejemplar_id="RAY-1", socio_id="30111222", administrador_id=1,
+                               fecha_prestamo=devuelto - timedelta(days=7),
+                               fecha_devolucion_pactada=devuelto, fecha_devolucion=devuelto))
+        datos.commit()
+    return crear
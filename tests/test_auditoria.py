@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from db.Conector import Base
+from db.auditoria import EscritorAuditoria, EventoAuditoria
+from modelo.Historial import Historial
+
+
+def _evento():
+    return EventoAuditoria("PRESTAR", None, "RAY-1", "30111222", "Prestamo 1 creado")
+
+
+def test_modo_durable_escribe_antes_de_volver():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    escritor = EscritorAuditoria(modo="durable", engine=engine, intervalo=0.01)
+
+    escritor.encolar([_evento()])
+
+    with engine.connect() as conn:
+        assert conn.execute(select(Historial.accion)).scalars().all() == ["PRESTAR"]
+
+
+def test_modo_durable_relanza_el_error_de_escritura(tmp_path):
+    # La base no existe (directorio inexistente): no hay dónde escribir
+    engine = create_engine(f"sqlite:///{tmp_path / 'no' / 'existe.db'}")
+    escritor = EscritorAuditoria(modo="durable", engine=engine, intervalo=0.01)
+
+    with pytest.raises(Exception):
+        escritor.encolar([_evento()])
+
+
+def test_vaciar_relanza_el_error_de_eventos_encolados_sin_esperar(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'no' / 'existe.db'}")
+    escritor = EscritorAuditoria(modo="rapido", engine=engine, intervalo=5)
+
+    escritor.encolar([_evento()])  # no espera
+    with pytest.raises(Exception):
+        escritor.vaciar(timeout=5)
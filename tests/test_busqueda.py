@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from helpers import busqueda
+from modelo.Libro import Libro
+
+
+class ErrorMySQL(Exception):
+    def __init__(self, errno):
+        super().__init__(f"error {errno}")
+        self.errno = errno
+
+
+@pytest.fixture
+def mysql(datos, monkeypatch):
+    """La sesión de prueba se presenta como MySQL; buscar_texto falla con el error indicado."""
+    monkeypatch.setattr(busqueda, "_fulltext_disponible", True)
+    monkeypatch.setattr(busqueda, "_indice_vigente", False)
+    # Solo la consulta del dialecto (get_bind() sin argumentos); la sesión sigue usando SQLite
+    real, falso = datos.get_bind, SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+    monkeypatch.setattr(datos, "get_bind", lambda *a, **k: real(*a, **k) if a or k else falso)
+
+    def fallar(error):
+        def buscar_texto(session, texto, limite):
+            raise error
+        monkeypatch.setattr(Libro, "buscar_texto", buscar_texto)
+    return fallar
+
+
+def test_sin_indice_fulltext_usa_el_indice_local(datos, mysql):
+    mysql(ProgrammingError("MATCH", {}, ErrorMySQL(busqueda.ER_FT_MATCHING_KEY_NOT_FOUND)))
+
+    resultados = busqueda.buscar_libros(datos, "cortazar")
+
+    assert [libro.titulo for libro, _ in resultados] == ["Rayuela"]
+    assert busqueda._fulltext_disponible is False
+
+
+def test_otros_errores_no_desactivan_fulltext(datos, mysql):
+    mysql(OperationalError("MATCH", {}, ErrorMySQL(2013)))  # Lost connection during query
+
+    with pytest.raises(OperationalError):
+        busqueda.buscar_libros(datos, "cortazar")
+    assert busqueda._fulltext_disponible is True
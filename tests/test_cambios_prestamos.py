@@ -0,0 +1,60 @@
+import pytest
+
+from db import eventos
+from estructuras.CalendarioVencimientos import CalendarioVencimientos
+from helpers.prestamos import prestar_en_lote, devolver_en_lote
+from modelo.Prestamo import Prestamo
+from modelo.PrestamoArchivado import PrestamoArchivado
+
+
+@pytest.fixture
+def avisos(monkeypatch):
+    """Cambios de préstamos avisados en cada commit, en orden."""
+    recibidos = []
+    monkeypatch.setattr(eventos, "_oyentes_prestamos", [recibidos.append])
+    return recibidos
+
+
+def _aplicar(calendario, cambios):
+    for prestamo_id, fecha_pactada in cambios:
+        if fecha_pactada is None:
+            calendario.quitar(prestamo_id)
+        else:
+            calendario.agregar(prestamo_id, fecha_pactada)
+
+
+def test_prestamo_y_devolucion_orm_avisan_el_cambio(datos, avisos):
+    prestamo = Prestamo.crear(datos, "RAY-1", "30111222", 1, 7, commit=True)
+    assert avisos == [[(prestamo.id, prestamo.fecha_devolucion_pactada)]]
+
+    prestamo.devolver(datos)
+    datos.commit()
+    assert avisos[1] == [(prestamo.id, None)]
+
+
+def test_lotes_avisan_los_cambios_y_el_calendario_queda_al_dia(datos, avisos):
+    calendario = Prestamo.cargar_calendario(datos)
+    resultados = prestar_en_lote(datos, [("30111222", "RAY-1"), ("30111222", "RAY-2")], administrador_id=1)
+    _aplicar(calendario, avisos[-1])
+    assert sorted(calendario.entre()) == sorted(Prestamo.cargar_calendario(datos).entre())
+    assert len(calendario) == 2
+
+    devolver_en_lote(datos, [resultados[0]["prestamo_id"]])
+    _aplicar(calendario, avisos[-1])
+    assert [prestamo_id for prestamo_id, _, _ in calendario.entre()] == [resultados[1]["prestamo_id"]]
+
+
+def test_archivar_avisa_que_no_cambiaron_prestamos_abiertos(datos, prestamos_devueltos, avisos):
+    prestamos_devueltos(2)
+    avisos.clear()
+
+    assert PrestamoArchivado.archivar_lote(datos, antiguedad_dias=365) == 1
+    assert avisos == [[]]
+
+
+def test_rollback_descarta_los_cambios(datos, avisos):
+    Prestamo.crear(datos, "RAY-1", "30111222", 1, 7)
+    datos.flush()
+    datos.rollback()
+    datos.commit()
+    assert avisos == []
@@ -0,0 +1,35 @@
+import csv
+
+from sqlalchemy import select
+
+from helpers.catalogo import ImportadorCatalogo
+from modelo.Libro import Libro
+
+
+def _csv(ruta, filas):
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=["titulo", "autor", "isbn", "codigo"])
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def test_detecta_duplicados_guardados_con_guiones(datos, tmp_path):
+    # Cargado a mano antes de la importación, con guiones
+    datos.add(Libro(titulo="Ficciones", autor="Jorge Luis Borges", isbn="978-84-206-3311-4"))
+    datos.commit()
+    ruta = tmp_path / "catalogo.csv"
+    _csv(ruta, [
+        {"titulo": "Ficciones", "autor": "Jorge Luis Borges", "isbn": "9788420633114", "codigo": "FIC"},
+        {"titulo": "Rayuela", "autor": "Julio Cortázar", "isbn": "978-84-376-0457-2", "codigo": "RAY"},
+        {"titulo": "La ciudad y los perros", "autor": "Mario Vargas Llosa", "isbn": "978-0-307-47472-8", "codigo": "CIU"},
+    ])
+
+    resumen = ImportadorCatalogo(session_factory=lambda: datos).importar(str(ruta), str(tmp_path / "errores.csv"))
+
+    assert resumen["importadas"] == 1
+    assert resumen["duplicadas"] == 2
+    with open(tmp_path / "errores.csv", encoding="utf-8") as archivo:
+        motivos = {fila["isbn"]: fila["error"] for fila in csv.DictReader(archivo)}
+    assert motivos["9788420633114"] == "Ya existe un libro con ISBN '978-84-206-3311-4'"
+    assert "9788437604572" in motivos
+    assert datos.execute(select(Libro.isbn).where(Libro.titulo == "La ciudad y los perros")).scalar() == "9780307474728"
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import select
+
+from modelo.Prestamo import Prestamo
+from modelo.PrestamoArchivado import PrestamoArchivado
+
+# vista.componentes importa la interfaz gráfica (customtkinter, CTkMessagebox)
+fuentes = pytest.importorskip("vista.componentes.fuentes")
+FuenteConsulta, FuenteUnion = fuentes.FuenteConsulta, fuentes.FuenteUnion
+
+
+def _fuente_union(tamanio_pagina):
+    partes = [
+        FuenteConsulta(
+            lambda modelo=modelo: select(modelo.id), modelo.id, lambda fila: fila[0], descendente=True,
+            columnas={"fecha_devolucion": modelo.fecha_devolucion},
+        )
+        for modelo in (Prestamo, PrestamoArchivado)
+    ]
+    return FuenteUnion(partes, tamanio_pagina=tamanio_pagina)
+
+
+def _leer(session, fuente, paginas):
+    fuente.fijar_total(fuente.cargador_total()(session))
+    for pagina in paginas:
+        fuente.guardar_pagina(pagina, *fuente.cargador_pagina(pagina)(session))
+    return fuente.filas(0, fuente.total())
+
+
+def test_fuente_union_pagina_ambas_tablas_en_orden(datos, prestamos_devueltos):
+    prestamos_devueltos(11)
+    PrestamoArchivado.archivar_lote(datos, antiguedad_dias=365)
+
+    fuente = _fuente_union(tamanio_pagina=4)
+    assert _leer(datos, fuente, [0, 1, 2]) == list(range(11, 0, -1))
+
+    # Salto a una página sin límite conocido: recorre las intermedias
+    salto = _fuente_union(tamanio_pagina=4)
+    salto.fijar_total(salto.cargador_total()(datos))
+    salto.guardar_pagina(2, *salto.cargador_pagina(2)(datos))
+    assert salto.filas(8, 3) == [3, 2, 1]
+
+
+def test_fuente_union_ordena_por_columna_de_cada_tabla(datos, prestamos_devueltos):
+    prestamos_devueltos(6)
+    PrestamoArchivado.archivar_lote(datos, antiguedad_dias=365)
+
+    fuente = _fuente_union(tamanio_pagina=4)
+    fuente.ordenar("fecha_devolucion", descendente=False)
+    # Primero los archivados (más viejos, el 6 es el más antiguo), luego los de ayer
+    assert _leer(datos, fuente, [0, 1]) == [6, 4, 2, 5, 3, 1]
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from estructuras.ListaEnlazada import ListaEnlazada
+
+
+def _libro(titulo, autor, codigo):
+    return SimpleNamespace(titulo=titulo, autor=autor, codigo=codigo)
+
+
+def _catalogo():
+    lista = ListaEnlazada()
+    libros = [
+        _libro("Cien años de soledad", "Gabriel García Márquez", "CIE-1"),
+        _libro("El amor en los tiempos del cólera", "Gabriel García Márquez", "AMO-1"),
+        _libro("Rayuela", "Julio Cortázar", "RAY-1"),
+        _libro("Ficciones", "Jorge Luis Borges", "FIC-1"),
+        _libro("Crónica de un espía", "García", "CRO-1"),
+    ]
+    for libro in libros:
+        lista.agregar(libro)
+    return lista, libros
+
+
+def _codigos(datos):
+    return [d.codigo for d in datos]
+
+
+def test_prefijo_de_cualquier_palabra_del_autor():
+    lista, _ = _catalogo()
+
+    assert _codigos(lista.buscar_por_prefijo_de_palabra("autor", "márq")) == ["CIE-1", "AMO-1"]
+    assert _codigos(lista.buscar_por_prefijo_de_palabra("autor", "CORT")) == ["RAY-1"]
+    # "gabriel" y "garcía" empiezan con "ga": cada libro sale una sola vez
+    assert _codigos(lista.buscar_por_prefijo_de_palabra("autor", "ga")) == ["CIE-1", "AMO-1", "CRO-1"]
+
+
+def test_busquedas_exactas_comparan_el_valor_completo():
+    lista, _ = _catalogo()
+
+    assert lista.buscar_por_autor("Borges") is None
+    assert lista.buscar_por_autor("jorge luis borges").codigo == "FIC-1"
+    assert _codigos(lista.buscar_todos_por_autor("garcía")) == ["CRO-1"]
+    assert _codigos(lista.buscar_por_prefijo("autor", "ga")) == ["CIE-1", "AMO-1", "CRO-1"]
+    assert _codigos(lista.buscar_por_prefijo("autor", "márq")) == []
+
+
+def test_busqueda_por_palabra():
+    lista, _ = _catalogo()
+
+    assert _codigos(lista.buscar_por_palabra("autor", "García")) == ["CIE-1", "AMO-1", "CRO-1"]
+    assert _codigos(lista.buscar_por_palabra("autor", "luis")) == ["FIC-1"]
+
+
+def test_eliminar_y_reindexar_actualizan_las_palabras():
+    lista, libros = _catalogo()
+    rayuela = libros[2]
+    assert _codigos(lista.buscar_por_prefijo_de_palabra("autor", "jul")) == ["RAY-1"]
+
+    rayuela.autor = "J. Cortázar"
+    lista.reindexar(rayuela)
+    assert list(lista.buscar_por_palabra("autor", "julio")) == []
+    assert list(lista.buscar_por_prefijo_de_palabra("autor", "jul")) == []
+    assert list(lista.buscar_por_palabra("autor", "cortázar")) == [rayuela]
+
+    lista.eliminar(rayuela)
+    assert list(lista.buscar_por_prefijo_de_palabra("autor", "cort")) == []
+    assert list(lista.buscar_por_prefijo("autor", "j.")) == []
+
+
+def test_buckets_conservan_el_orden_de_insercion_al_eliminar():
+    lista = ListaEnlazada()
+    libros = [_libro(f"Tomo {n}", "Anónimo", f"T-{n}") for n in range(5)]
+    for libro in libros:
+        lista.agregar(libro)
+
+    lista.eliminar(libros[0])
+    lista.eliminar(libros[3])
+
+    assert lista.buscar_por_autor("anónimo") is libros[1]
+    assert list(lista.buscar_todos_por_autor("Anónimo")) == [libros[1], libros[2], libros[4]]
@@ -0,0 +1,21 @@
+from sqlalchemy import select
+
+from modelo.Historial import Historial
+from modelo.Prestamo import Prestamo
+from modelo.PrestamoArchivado import PrestamoArchivado
+
+
+def test_archivar_lote_conserva_el_vinculo_del_historial(datos, prestamos_devueltos):
+    prestamos_devueltos(2)
+    datos.add(Historial(accion="DEVOLUCION", prestamo_id=2))
+    datos.add(Historial(accion="DEVOLUCION", prestamo_id=1))
+    datos.commit()
+
+    assert PrestamoArchivado.archivar_lote(datos, antiguedad_dias=365) == 1
+
+    datos.expire_all()
+    archivado = datos.execute(select(Historial).where(Historial.prestamo_archivado_id.isnot(None))).scalar_one()
+    assert archivado.prestamo_archivado.id == 2
+    assert datos.get(Prestamo, 2) is None
+    activo = datos.execute(select(Historial).where(Historial.prestamo_id == 1)).scalar_one()
+    assert activo.prestamo_archivado_id is None
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from modelo.Prestamo import Prestamo
+from modelo.Ejemplar import Ejemplar
+from modelo.Socio import Socio
+
+
+def _ejemplar(session, codigo):
+    return session.query(Ejemplar).filter_by(codigo=codigo).one()
+
+
+def test_crear_registra_el_prestamo_y_reserva_el_ejemplar(datos):
+    prestamo = Prestamo.crear(datos, "RAY-1", "30111222", 1, 7, commit=True)
+
+    assert prestamo.id is not None
+    assert prestamo.fecha_devolucion is None
+    assert prestamo.dias_prestamo_originales() == 7
+    datos.expire_all()
+    assert _ejemplar(datos, "RAY-1").disponible is False
+    assert _ejemplar(datos, "RAY-2").disponible is True
+
+
+def test_crear_rechaza_ejemplar_no_disponible(datos):
+    _ejemplar(datos, "RAY-1").disponible = False
+    datos.commit()
+
+    with pytest.raises(ValueError, match="no está disponible"):
+        Prestamo.crear(datos, "RAY-1", "30111222", 1, 7)
+
+
+def test_crear_rechaza_ejemplar_con_prestamo_abierto(datos):
+    # Ejemplar marcado disponible por error pero con un préstamo sin devolver
+    ahora = datetime.now()
+    datos.add(Prestamo(ejemplar_id="RAY-1", socio_id="30111222", administrador_id=1,
+                       fecha_prestamo=ahora, fecha_devolucion_pactada=ahora))
+    datos.commit()
+
+    with pytest.raises(ValueError, match="no está disponible"):
+        Prestamo.crear(datos, "RAY-1", "30111222", 1, 7)
+
+
+def test_crear_rechaza_socio_inexistente(datos):
+    with pytest.raises(ValueError, match="socio"):
+        Prestamo.crear(datos, "RAY-1", "99999999", 1, 7)
+    datos.rollback()
+    assert _ejemplar(datos, "RAY-1").disponible is True
+
+
+def test_crear_rechaza_ejemplar_inexistente(datos):
+    with pytest.raises(ValueError, match="ejemplar"):
+        Prestamo.crear(datos, "NO-EXISTE", "30111222", 1, 7)
+
+
+def test_crear_rechaza_administrador_inexistente(datos):
+    with pytest.raises(ValueError, match="administrador"):
+        Prestamo.crear(datos, "RAY-1", "30111222", 999, 7)
+
+
+def test_crear_ve_administradores_dados_de_alta_despues_de_cachear(datos):
+    from modelo.Administrador import Administrador
+
+    Prestamo.crear(datos, "RAY-1", "30111222", 1, 7, commit=True)  # carga la caché
+    datos.add(Administrador(dni=2, nombre="Otro", apellido="Admin", password="x"))
+    datos.commit()  # el commit invalida la caché de administradores
+
+    prestamo = Prestamo.crear(datos, "RAY-2", "30111222", 2, 7, commit=True)
+    assert prestamo.administrador_id == 2
+
+
+def test_crear_rechaza_socio_inactivo(datos):
+    datos.query(Socio).filter_by(dni="30111222").one().activo = False
+    datos.commit()
+
+    with pytest.raises(ValueError, match="no está activo"):
+        Prestamo.crear(datos, "RAY-1", "30111222", 1, 7)
@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from helpers.prestamos import prestar_en_lote, devolver_en_lote
+from modelo.Ejemplar import Ejemplar
+from modelo.Prestamo import Prestamo
+from modelo.Socio import Socio
+
+
+@pytest.fixture
+def con_inactivo(datos):
+    datos.add(Socio(dni="40999888", nombre="Luis", apellido="Sosa", direccion="Calle 2",
+                    celular="1199887766", email="luis@mail.com", activo=False, fecha_alta=date.today()))
+    datos.commit()
+    return datos
+
+
+def _disponibles(session):
+    session.expire_all()
+    return dict(session.execute(select(Ejemplar.codigo, Ejemplar.disponible)).all())
+
+
+def test_prestar_en_lote_resultado_por_par(con_inactivo):
+    resultados = prestar_en_lote(con_inactivo, [
+        ("30111222", "RAY-1"),
+        ("30111222", "RAY-1"),   # repetido en la ráfaga
+        ("40999888", "RAY-2"),   # socio inactivo
+        ("11111111", "RAY-2"),   # socio inexistente
+        ("30111222", "NOPE-1"),  # ejemplar inexistente
+        ("", "RAY-2"),
+    ], administrador_id=1)
+
+    assert [r["ok"] for r in resultados] == [True, False, False, False, False, False]
+    assert resultados[0]["prestamo_id"] is not None
+    assert resultados[1]["error"] == "Ya existe un préstamo activo para ese ejemplar"
+    assert resultados[2]["error"] == "El socio con DNI 40999888 no está activo"
+    assert resultados[3]["error"] == "Socio con DNI 11111111 no existe"
+    assert resultados[4]["error"] == "Ejemplar con código NOPE-1 no existe"
+    assert resultados[5]["error"] == "DNI y código de ejemplar son obligatorios"
+    assert _disponibles(con_inactivo) == {"RAY-1": False, "RAY-2": True}
+
+
+def test_prestar_en_lote_rechaza_ejemplar_prestado(datos):
+    prestar_en_lote(datos, [("30111222", "RAY-1")], administrador_id=1)
+
+    resultado, = prestar_en_lote(datos, [("30111222", "RAY-1")], administrador_id=1)
+
+    assert resultado["ok"] is False
+    assert len(datos.execute(select(Prestamo.id)).all()) == 1
+
+
+def test_prestar_en_lote_valida_dias_y_administrador(datos):
+    with pytest.raises(ValueError, match="más de 30 días"):
+        prestar_en_lote(datos, [("30111222", "RAY-1")], administrador_id=1, dias_prestamo=31)
+    with pytest.raises(ValueError, match="No existe un administrador"):
+        prestar_en_lote(datos, [("30111222", "RAY-1")], administrador_id=99)
+
+
+def test_devolver_en_lote(datos):
+    prestados = prestar_en_lote(datos, [("30111222", "RAY-1"), ("30111222", "RAY-2")], administrador_id=1)
+    id_1, id_2 = (r["prestamo_id"] for r in prestados)
+    devolver_en_lote(datos, [id_2])
+
+    resultados = devolver_en_lote(datos, [id_1, id_1, id_2, 9999])
+
+    assert resultados[0] == {"prestamo_id": id_1, "ok": True, "codigo": "RAY-1"}
+    assert [r.get("error") for r in resultados[1:]] == [
+        "Este préstamo ya fue devuelto", "Este préstamo ya fue devuelto", "Préstamo no encontrado",
+    ]
+    assert _disponibles(datos) == {"RAY-1": True, "RAY-2": True}
+    datos.expire_all()
+    assert datos.get(Prestamo, id_1).fecha_devolucion is not None
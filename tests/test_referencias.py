@@ -0,0 +1,20 @@
+from db.referencias import CacheReferencias
+from modelo.Administrador import Administrador
+
+
+def test_invalidar_durante_la_carga_no_guarda_datos_viejos(datos, monkeypatch):
+    cargar = CacheReferencias._cargar_administradores
+
+    def cargar_y_confirmar_otro(session):
+        resultado = cargar(session)
+        # Otra terminal confirma un administrador nuevo mientras esta carga está en curso
+        datos.add(Administrador(dni=2, nombre="Otro", apellido="Admin", password="x"))
+        datos.commit()
+        CacheReferencias.invalidar("administradores")
+        return resultado
+
+    monkeypatch.setattr(CacheReferencias, "_cargar_administradores", staticmethod(cargar_y_confirmar_otro))
+    assert CacheReferencias.administrador(2, datos) is None  # la carga en curso no lo vio
+    monkeypatch.setattr(CacheReferencias, "_cargar_administradores", staticmethod(cargar))
+
+    assert CacheReferencias.administrador(2, datos) is not None
@@ -0,0 +1,120 @@
+from sqlalchemy import select
+
+from controlador.SistemaBiblioteca import SistemaBiblioteca, MAX_INTENTOS
+from estructuras.Operacion import Operacion, PRESTAMO
+from modelo.Ejemplar import Ejemplar
+from modelo.Prestamo import Prestamo
+from modelo.Socio import Socio
+
+
+def _sistema(session):
+    return SistemaBiblioteca.desde_db(1, session_factory=lambda: session)
+
+
+def _prestamos(session):
+    session.expire_all()
+    return session.execute(select(Prestamo).where(Prestamo.ejemplar_id == "RAY-1")).scalars().all()
+
+
+def _disponible(session, codigo="RAY-1"):
+    session.expire_all()
+    return session.execute(select(Ejemplar.disponible).where(Ejemplar.codigo == codigo)).scalar()
+
+
+def test_deshacer_prestamo_sin_sincronizar_no_llega_a_la_base(datos):
+    sistema = _sistema(datos)
+    assert sistema.prestar_libro("RAY-1", "30111222")
+
+    sistema.deshacer()
+
+    assert sistema.sincronizar() == 0
+    assert _prestamos(datos) == []
+
+
+def test_deshacer_prestamo_sincronizado_borra_la_fila(datos):
+    sistema = _sistema(datos)
+    sistema.prestar_libro("RAY-1", "30111222")
+    sistema.sincronizar()
+
+    sistema.deshacer()
+    sistema.sincronizar()
+
+    assert _prestamos(datos) == []
+    assert _disponible(datos) is True
+    assert sistema.buscar_libro_por_codigo("RAY-1").disponible is True
+
+
+def test_deshacer_devolucion_sincronizada_reabre_el_prestamo(datos):
+    sistema = _sistema(datos)
+    sistema.prestar_libro("RAY-1", "30111222")
+    sistema.sincronizar()
+    sistema.devolver_libro("RAY-1")
+    sistema.sincronizar()
+
+    sistema.deshacer()
+    sistema.sincronizar()
+
+    prestamos = _prestamos(datos)
+    assert len(prestamos) == 1 and prestamos[0].fecha_devolucion is None
+    assert _disponible(datos) is False
+
+
+def test_rechaza_socio_inactivo(datos):
+    datos.execute(Socio.__table__.update().values(activo=False))
+    datos.commit()
+    sistema = _sistema(datos)
+
+    assert sistema.prestar_libro("RAY-1", "30111222") is False
+    assert sistema.buscar_libro_por_codigo("RAY-1").disponible is True
+    assert sistema.sincronizar() == 0
+
+
+def test_dos_terminales_no_prestan_el_mismo_ejemplar(datos):
+    terminal_a, terminal_b = _sistema(datos), _sistema(datos)
+    assert terminal_a.prestar_libro("RAY-1", "30111222")
+    assert terminal_b.prestar_libro("RAY-1", "30111222")
+
+    assert terminal_a.sincronizar() == 1
+    assert terminal_b.sincronizar() == 0
+
+    assert len(_prestamos(datos)) == 1
+    assert [op.codigo_libro for op in terminal_b.conflictos] == ["RAY-1"]
+    # Deshacer el préstamo rechazado no toca el préstamo de la otra terminal
+    terminal_b.deshacer()
+    assert terminal_b.sincronizar() == 0
+    assert len(_prestamos(datos)) == 1
+
+
+def test_una_operacion_que_falla_no_frena_a_las_demas(datos):
+    sistema = _sistema(datos)
+    sistema.prestar_libro("RAY-1", "30111222")
+    # Operación inválida (socio_id es obligatorio): falla siempre
+    mala = Operacion(PRESTAMO, "RAY-2", None)
+    sistema._encolar(mala)
+
+    assert sistema.sincronizar() == 1
+    assert mala.intentos == 1 and sistema._pendientes == [mala]
+    sistema.prestar_libro("RAY-2", "30111222")  # detrás de la fallida, mismo ejemplar
+    for _ in range(MAX_INTENTOS - 1):
+        sistema.sincronizar()
+
+    assert sistema.fallidas == [mala] and mala.error
+    assert sistema.sincronizar() == 1  # el préstamo de RAY-2 ya no espera
+    assert sistema._pendientes == []
+
+
+def test_las_operaciones_del_mostrador_quedan_en_el_historial(datos, monkeypatch):
+    import db.eventos
+    acciones = []
+    monkeypatch.setattr(db.eventos, "registrar_evento",
+                        lambda session, accion, prestamo_id, codigo, dni, detalle=None: acciones.append((accion, codigo)))
+    sistema = _sistema(datos)
+
+    sistema.prestar_libro("RAY-1", "30111222")
+    sistema.sincronizar()
+    sistema.devolver_libro("RAY-1")
+    sistema.sincronizar()
+    sistema.deshacer()
+    sistema.sincronizar()
+
+    assert acciones == [("PRESTAR", "RAY-1"), ("DEVOLVER", "RAY-1"), ("ANULAR_DEVOLUCION", "RAY-1")]
@@ -3,83 +3,139 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import customtkinter as ctk
-from db.session_manager import SessionManager
+from sqlalchemy import select
 
-from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
+from vista.componentes.base_app import BaseApp, iniciar
 from vista.componentes.table import Table
-from vista.componentes.callbacks import get_default_callbacks
+from vista.componentes.consultas import ejecutar_consulta
+from vista.componentes.fuentes import FuenteConsulta
 
 from modelo.Libro import Libro
 from modelo.Ejemplar import Ejemplar
 
 
 class BookList(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Biblioteca Pública - Libros")
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Biblioteca Pública - Libros", session=session, admin=admin)
 
-        callbacks = get_default_callbacks(self)
-
-        # Layout base
-        self.layout = AppLayout(self, banner_image="vista/images/banner_bandera.jpg", callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
-
-        self.layout.main_frame.grid_rowconfigure(1, weight=1)
-        self.layout.main_frame.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
 
         # Contenedor principal
-        self.content_frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.grid(row=1, column=0, sticky="n", pady=10)
 
+        header = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        header.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        header.grid_columnconfigure(1, weight=1)
+
         ctk.CTkLabel(
-            self.content_frame,
+            header,
             text="Listado de Libros",
             font=ctk.CTkFont(size=18, weight="bold")
-        ).grid(row=0, column=0, sticky="w", pady=(0, 10))
+        ).grid(row=0, column=0, sticky="w")
+
+        # Búsqueda por título o autor (texto completo, mientras se escribe)
+        self.entry_buscar = ctk.CTkEntry(header, width=320, placeholder_text="Buscar por título o autor...")
+        self.entry_buscar.grid(row=0, column=2, sticky="e")
+        self.entry_buscar.bind("<KeyRelease>", lambda e: self._programar_busqueda())
+        self._busqueda_pendiente = None
+        self._busqueda_nro = 0
 
         # Definir columnas
+        # "sql": columna por la que se ordena en el servidor al hacer clic en el encabezado
         columns = [
-            {"key": "titulo", "text": "Título", "width": 220},
-            {"key": "autor", "text": "Autor", "width": 200},
-            {"key": "isbn", "text": "ISBN", "width": 140},
-            {"key": "ejemplar", "text": "Ejemplar", "width": 100},
-            {"key": "estado", "text": "Estado", "width": 120},
+            {"key": "titulo", "text": "Título", "width": 220, "sql": Libro.titulo},
+            {"key": "autor", "text": "Autor", "width": 200, "sql": Libro.autor},
+            {"key": "isbn", "text": "ISBN", "width": 140, "sql": Libro.isbn},
+            {"key": "ejemplar", "text": "Ejemplar", "width": 100, "sql": Ejemplar.numero_ejemplar},
+            {"key": "estado", "text": "Estado", "width": 120, "sql": Ejemplar.disponible},
         ]
 
-        self.table = Table(self.content_frame, columns, width=900, height=420)
+        self.table = Table(self.content_frame, columns, width=900, height=420, virtual=True)
         self.table.grid(row=1, column=0, sticky="n")
 
         self.load_data()
 
     # =======================================================
-    def load_data(self):
-        """Carga libros y ejemplares desde la sesión compartida."""
-        if not self.session:
-            raise ValueError("No se recibió una sesión de base de datos válida.")
+    def _programar_busqueda(self):
+        """Espera una pausa en el tipeo antes de consultar."""
+        if self._busqueda_pendiente is not None:
+            self.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.after(250, self._buscar)
+
+    def _buscar(self):
+        self._busqueda_pendiente = None
+        texto = self.entry_buscar.get().strip()
+        if not texto:
+            self.load_data()
+            return
+
+        # Solo se pinta la respuesta de la última búsqueda
+        self._busqueda_nro += 1
+        nro = self._busqueda_nro
+
+        def pintar(filas):
+            if nro == self._busqueda_nro:
+                self.table.set_data(filas)
+
+        ejecutar_consulta(self, lambda session: self._consultar_busqueda(session, texto), pintar)
+
+    @staticmethod
+    def _consultar_busqueda(session, texto):
+        """Se ejecuta en un hilo de fondo: libros encontrados (por relevancia) con sus ejemplares."""
+        from helpers.busqueda import buscar_libros
+
+        encontrados = buscar_libros(session, texto, limite=200)
+        if not encontrados:
+            return []
+        ejemplares = {}
+        for e in session.query(Ejemplar).filter(
+            Ejemplar.libro_isbn.in_([libro.isbn for libro, _ in encontrados])
+        ).order_by(Ejemplar.numero_ejemplar):
+            ejemplares.setdefault(e.libro_isbn, []).append(e)
 
-        libros = self.session.query(Libro).all()
-        ejemplares = self.session.query(Ejemplar).all()
-
-        # Crear mapa ISBN → Libro
-        libros_by_isbn = {l.isbn: l for l in libros}
         rows = []
+        for lib, _ in encontrados:
+            for e in ejemplares.get(lib.isbn, ()):
+                rows.append({
+                    "titulo": lib.titulo,
+                    "autor": lib.autor,
+                    "isbn": lib.isbn,
+                    "ejemplar": e.numero_ejemplar,
+                    "estado": "Disponible" if e.disponible else "No disponible"
+                })
+        return rows
 
-        for e in ejemplares:
-            lib = libros_by_isbn.get(e.libro_isbn)
-            if not lib:
-                continue
-            rows.append({
-                "titulo": lib.titulo,
-                "autor": lib.autor,
-                "isbn": lib.isbn,
-                "ejemplar": e.numero_ejemplar,
-                "estado": "Disponible" if e.disponible else "No disponible"
-            })
-
-        self.table.set_data(rows)
+    # =======================================================
+    def load_data(self):
+        """
+        Asocia la tabla al catálogo paginado por keyset (de a una página por vez,
+        en segundo plano). Los resultados de una búsqueda, acotados, se muestran
+        en memoria (ver `_buscar`).
+        """
+        self._busqueda_nro += 1  # descarta respuestas de búsquedas anteriores
+        self.table.set_fuente(FuenteConsulta(self._consulta, Ejemplar.id, self._mapear_fila))
+
+    @staticmethod
+    def _consulta():
+        # Un ejemplar por fila, con los datos de su libro
+        return (
+            select(Libro.titulo, Libro.autor, Libro.isbn, Ejemplar.numero_ejemplar, Ejemplar.disponible)
+            .select_from(Ejemplar)
+            .join(Libro, Libro.isbn == Ejemplar.libro_isbn)
+        )
+
+    @staticmethod
+    def _mapear_fila(fila):
+        """Se ejecuta en un hilo de fondo: convierte una fila de la consulta en un dict de la tabla."""
+        return {
+            "titulo": fila.titulo,
+            "autor": fila.autor,
+            "isbn": fila.isbn,
+            "ejemplar": fila.numero_ejemplar,
+            "estado": "Disponible" if fila.disponible else "No disponible"
+        }
 
 if __name__ == "__main__":
-    app = BookList()
-    app.mainloop()
\ No newline at end of file
+    iniciar(BookList)
\ No newline at end of file
@@ -1,6 +1,6 @@
 # vistas/componentes/__init__.py
 from tkinter import ttk
-from .base_app import BaseApp
+from .base_app import BaseApp, VentanaPrincipal, iniciar
 from .layout import AppLayout
 from .table import Table
 from .callbacks import get_default_callbacks
@@ -17,6 +17,8 @@ from .navigation import (
 
 __all__ = [
     "BaseApp",
+    "VentanaPrincipal",
+    "iniciar",
     "AppLayout",
     "Table",
     "DashboardCards",
@@ -0,0 +1,119 @@
+# vista/componentes/assets.py
+import os
+import threading
+import tkinter as tk
+
+import customtkinter as ctk
+from PIL import Image
+
+ICONOS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "icons"))
+# Carpeta opcional con copias ya escaladas (PNG chicos que se leen sin redimensionar)
+CACHE_DIR = os.getenv("ASSETS_CACHE_DIR", "")
+
+
+class RegistroAssets:
+    """
+    Registro de imágenes del proceso.
+
+    Cada ícono se decodifica una vez por tamaño y todas las vistas reciben el
+    mismo CTkImage. Los CTkImage guardan PhotoImage atados a la ventana raíz,
+    así que si la raíz cambia se rearman desde las imágenes ya decodificadas
+    (sin volver a leer disco).
+    """
+
+    _pil = {}        # (archivo, ancho, alto) -> PIL.Image, o None si no se pudo cargar
+    _ctk = {}        # (archivo, ancho, alto) -> CTkImage de la raíz actual
+    _raiz = None
+    _lock = threading.Lock()
+
+    # ==========================================================
+    # Decodificación (apta para hilos de fondo)
+    # ==========================================================
+    @staticmethod
+    def _ruta_cache(archivo, size, mtime):
+        nombre, _ = os.path.splitext(archivo)
+        return os.path.join(CACHE_DIR, f"{nombre}_{size[0]}x{size[1]}_{int(mtime)}.png")
+
+    @classmethod
+    def _decodificar(cls, archivo, size):
+        ruta = os.path.join(ICONOS_DIR, archivo)
+        if not os.path.exists(ruta):
+            print(f"[WARN] Ícono no encontrado: {ruta}")
+            return None
+        try:
+            mtime = os.path.getmtime(ruta)
+            if CACHE_DIR:
+                ruta_cache = cls._ruta_cache(archivo, size, mtime)
+                if os.path.exists(ruta_cache):
+                    with Image.open(ruta_cache) as img:
+                        return img.convert("RGBA")
+            with Image.open(ruta) as img:
+                img = img.convert("RGBA").resize(size, Image.LANCZOS)
+            if CACHE_DIR:
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    img.save(cls._ruta_cache(archivo, size, mtime))
+                except OSError as e:
+                    print(f"[WARN] No se pudo escribir la caché de íconos: {e}")
+            return img
+        except Exception as e:
+            print(f"[WARN] No se pudo cargar ícono '{archivo}': {e}")
+            return None
+
+    @classmethod
+    def imagen(cls, archivo, size=(22, 22)):
+        """Imagen PIL del ícono al tamaño pedido (None si no existe)."""
+        clave = (archivo, *size)
+        with cls._lock:
+            if clave in cls._pil:
+                return cls._pil[clave]
+        img = cls._decodificar(archivo, tuple(size))
+        with cls._lock:
+            return cls._pil.setdefault(clave, img)
+
+    @classmethod
+    def precargar(cls, pedidos):
+        """Decodifica de antemano [(archivo, size)]; puede correr en un hilo de fondo."""
+        for archivo, size in pedidos:
+            cls.imagen(archivo, size)
+
+    # ==========================================================
+    # CTkImage compartidos (solo desde el hilo de la UI)
+    # ==========================================================
+    @classmethod
+    def icono(cls, archivo, size=(22, 22)):
+        """CTkImage compartido del ícono, o None si no se pudo cargar."""
+        raiz = tk._default_root
+        if raiz is not cls._raiz:
+            cls._ctk.clear()
+            cls._raiz = raiz
+        clave = (archivo, *size)
+        img = cls._ctk.get(clave)
+        if img is None:
+            pil = cls.imagen(archivo, size)
+            if pil is None:
+                return None
+            img = cls._ctk[clave] = ctk.CTkImage(light_image=pil, size=tuple(size))
+        return img
+
+    @classmethod
+    def limpiar(cls):
+        with cls._lock:
+            cls._pil.clear()
+        cls._ctk.clear()
+
+
+# Íconos que usa el layout común (menú lateral y cards del escritorio)
+ICONOS_LAYOUT = [
+    ("home.png", (22, 22)),
+    ("user.png", (22, 22)),
+    ("book.png", (22, 22)),
+    ("librarian.png", (22, 22)),
+    ("logout.png", (22, 22)),
+    ("calendar.png", (22, 22)),
+    ("main_user.png", (70, 70)),
+    ("people.png", (40, 40)),
+    ("book.png", (40, 40)),
+    ("librarian.png", (40, 40)),
+    ("calendar.png", (40, 40)),
+]
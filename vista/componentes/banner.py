@@ -1,7 +1,53 @@
 import customtkinter as ctk
 from PIL import Image, ImageOps
+from collections import OrderedDict
+import threading
 import os
 
+# Ancho máximo de la copia de trabajo: más que esto no se ve en pantalla
+ANCHO_TRABAJO = 1920
+# Los anchos se redondean hacia arriba a múltiplos de esto (menos variantes en caché)
+PASO_ANCHO = 64
+MAX_VARIANTES = 12
+DEBOUNCE_MS = 120
+
+# Cachés compartidas por todos los banners del proceso
+_copias_trabajo = {}                 # ruta -> imagen reducida (RGB)
+_variantes = OrderedDict()           # (ruta, ancho, alto) -> imagen ajustada (LRU)
+_lock = threading.Lock()
+
+
+def _copia_trabajo(image_path):
+    """Decodifica la imagen una sola vez por proceso, ya reducida al ancho de trabajo."""
+    with _lock:
+        img = _copias_trabajo.get(image_path)
+    if img is not None:
+        return img
+    img = Image.open(image_path)
+    img.draft("RGB", (ANCHO_TRABAJO, ANCHO_TRABAJO))  # JPEG: decodifica directo a menor escala
+    img = img.convert("RGB")
+    if img.width > ANCHO_TRABAJO:
+        img.thumbnail((ANCHO_TRABAJO, ANCHO_TRABAJO), Image.LANCZOS)
+    with _lock:
+        return _copias_trabajo.setdefault(image_path, img)
+
+
+def _variante(image_path, width, height):
+    """Imagen ajustada a (ancho redondeado, alto), desde la caché LRU si ya existe."""
+    clave = (image_path, width, height)
+    with _lock:
+        img = _variantes.get(clave)
+        if img is not None:
+            _variantes.move_to_end(clave)
+            return img
+    img = ImageOps.fit(_copia_trabajo(image_path), (width, height))
+    with _lock:
+        _variantes[clave] = img
+        while len(_variantes) > MAX_VARIANTES:
+            _variantes.popitem(last=False)
+    return img
+
+
 class Banner(ctk.CTkFrame):
     """Banner superior redimensionable."""
     def __init__(self, master, image_path=None, fixed_height=250, **kwargs):
@@ -11,15 +57,16 @@ class Banner(ctk.CTkFrame):
         self.label = ctk.CTkLabel(self, text="", fg_color="white")
         self.label.pack(fill="both", expand=True)
 
-        self._banner_img_original = None
+        self._image_path = None
         self._last_width = 0
+        self._redibujo_pendiente = None
         if image_path and os.path.exists(image_path):
-            self._banner_img_original = Image.open(image_path).convert("RGB")
+            self._image_path = os.path.abspath(image_path)
 
         self.after(100, self._initial_draw)
 
     def _initial_draw(self):
-        if not self._banner_img_original:
+        if not self._image_path:
             self.configure(fg_color="#2C3E50")
             return
 
@@ -32,17 +79,29 @@ class Banner(ctk.CTkFrame):
             self.master.bind("<Configure>", self._on_resize, add="+")
 
     def _on_resize(self, event=None):
-        new_width = self.winfo_width()
-        if abs(new_width - self._last_width) > 10:
+        # Arrastrar la ventana genera decenas de eventos: se redibuja al terminar
+        if self._redibujo_pendiente is not None:
+            self.after_cancel(self._redibujo_pendiente)
+        self._redibujo_pendiente = self.after(DEBOUNCE_MS, self._redraw_si_cambio)
+
+    def _redraw_si_cambio(self):
+        self._redibujo_pendiente = None
+        if not self.winfo_exists():
+            return
+        if self._ancho_redondeado() != self._last_width:
             self._redraw_banner()
 
+    def _ancho_redondeado(self):
+        width = max(50, self.winfo_width())
+        return -(-width // PASO_ANCHO) * PASO_ANCHO
+
     def _redraw_banner(self):
-        if not self._banner_img_original:
+        if not self._image_path:
             return
-        width = max(50, self.winfo_width())
+        width = self._ancho_redondeado()
         height = self.fixed_height
-        img = ImageOps.fit(self._banner_img_original, (width, height))
+        img = _variante(self._image_path, width, height)
         tkimg = ctk.CTkImage(light_image=img, size=(width, height))
         self.label.configure(image=tkimg)
         self.label.image = tkimg
-        self._last_width = width
\ No newline at end of file
+        self._last_width = width
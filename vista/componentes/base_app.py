@@ -1,16 +1,105 @@
+import os
+from collections import OrderedDict
+
 import customtkinter as ctk
-from db.Conector import Conector
+from db.session_manager import SessionManager
+
+BANNER = os.path.join("vista", "images", "banner_bandera.jpg")
+# Vistas que se mantienen armadas (las menos usadas recientemente se destruyen)
+MAX_VISTAS = int(os.getenv("MAX_VISTAS", "6") or 6)
+
 
-class BaseApp(ctk.CTk):
-    """Ventana base para todas las vistas: pantalla completa por defecto."""
-    def __init__(self, title="Biblioteca Pública"):
+class VentanaPrincipal(ctk.CTk):
+    """
+    Ventana única de la aplicación, en pantalla completa.
+    El layout (menú lateral, banner, íconos) se arma una sola vez; las vistas
+    son frames que se intercambian debajo del banner y quedan en una caché LRU,
+    así que volver a una pantalla solo refresca sus datos.
+    """
+    def __init__(self, session=None, admin=None, title="Biblioteca Pública"):
         super().__init__()
         self.title(title)
-        self.session = Conector.get_session()
+        # Sesión del hilo de la UI (compartida por todas las vistas)
+        self.session = session or SessionManager.get_session()
+        self.admin = admin
+        self.vista_actual = None
+        self._vistas = OrderedDict()  # (clase, parámetros) -> vista
+
+        from .layout import AppLayout
+        from .callbacks import get_default_callbacks
+        self.layout = AppLayout(self, banner_image=BANNER, callbacks=get_default_callbacks(self), admin=admin)
+        self.layout.pack(fill="both", expand=True)
+
+        self.bind("<Destroy>", self._on_destroy, add="+")
         self.after(100, lambda: self._set_fullscreen())
 
     def _set_fullscreen(self):
         try:
             self.state("zoomed")  # Windows
         except Exception:
-            self.attributes("-fullscreen", True)  # Linux/Mac
\ No newline at end of file
+            self.attributes("-fullscreen", True)  # Linux/Mac
+
+    # ==========================================================
+    # Vistas
+    # ==========================================================
+    def mostrar(self, clase, **params):
+        """Muestra la vista clase(**params), reutilizándola si ya estaba armada."""
+        clave = (clase, tuple(sorted(params.items())))
+        vista = self._vistas.pop(clave, None)
+        if self.vista_actual is not None and self.vista_actual is not vista:
+            self.vista_actual.grid_remove()
+
+        # Cambiar de pantalla termina su unidad de trabajo (como antes al cerrar la ventana)
+        self._cerrar_sesion()
+
+        if vista is None:
+            vista = clase(self.layout.main_frame, session=self.session, admin=self.admin, **params)
+        else:
+            vista.al_mostrar()
+        self._vistas[clave] = vista
+        vista.grid(row=1, column=0, sticky="nsew")
+        self.vista_actual = vista
+        self.title(vista.titulo)
+
+        while len(self._vistas) > MAX_VISTAS:
+            _, vieja = self._vistas.popitem(last=False)
+            vieja.destroy()
+        return vista
+
+    def _cerrar_sesion(self):
+        try:
+            if self.session is not None:
+                self.session.close()
+        except Exception:
+            pass
+
+    def _on_destroy(self, event):
+        """Al cerrar la ventana devuelve la conexión al pool."""
+        if event.widget is not self:
+            return
+        self._cerrar_sesion()
+
+
+class BaseApp(ctk.CTkFrame):
+    """Base de las vistas: un frame que VentanaPrincipal muestra debajo del banner."""
+    def __init__(self, master, title="Biblioteca Pública", session=None, admin=None):
+        super().__init__(master, fg_color="transparent", corner_radius=0)
+        self.titulo = title
+        self.app = self.winfo_toplevel()
+        self.session = session or SessionManager.get_session()
+        self.admin = admin
+
+    def al_mostrar(self):
+        """Se llama al volver a la vista desde la caché: refresca solo los datos."""
+        if hasattr(self, "load_data"):
+            self.load_data()
+
+    def navegar(self, clase, **params):
+        return self.app.mostrar(clase, **params)
+
+
+def iniciar(clase, session=None, admin=None, **params):
+    """Crea la ventana principal con la vista indicada y corre el mainloop."""
+    app = VentanaPrincipal(session=session, admin=admin)
+    app.mostrar(clase, **params)
+    app.mainloop()
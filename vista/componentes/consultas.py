@@ -0,0 +1,55 @@
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+from db.session_manager import SessionManager
+
+# Pocos hilos: alcanza para que la UI no espere y no satura el pool de conexiones
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="consulta")
+
+INTERVALO_MS = 25
+
+
+def ejecutar_consulta(widget, consulta, on_ok, on_error=None):
+    """
+    Ejecuta consulta(session) en un hilo de fondo, con su propia sesión.
+    Cuando termina, on_ok(resultado) u on_error(excepcion) se llaman en el hilo
+    de Tk (el widget sondea el resultado con after()), nunca desde el hilo de fondo.
+
+    La consulta debe devolver datos planos (dicts, tuplas): la sesión se cierra
+    antes de volver a la UI.
+    """
+    def tarea():
+        with SessionManager.unidad_de_trabajo(commit=False) as session:
+            return consulta(session)
+
+    futuro = _executor.submit(tarea)
+    widget.after(INTERVALO_MS, _esperar, widget, futuro, on_ok, on_error)
+    return futuro
+
+
+def _esperar(widget, futuro, on_ok, on_error):
+    try:
+        if not widget.winfo_exists():
+            return  # la ventana se cerró mientras se consultaba
+        if not futuro.done():
+            widget.after(INTERVALO_MS, _esperar, widget, futuro, on_ok, on_error)
+            return
+    except tk.TclError:
+        return
+
+    try:
+        resultado = futuro.result()
+    except Exception as e:
+        if on_error:
+            on_error(e)
+        else:
+            _error_por_defecto(widget, e)
+        return
+    on_ok(resultado)
+
+
+def _error_por_defecto(widget, error):
+    from vista.componentes.utils import safe_messagebox
+    print(f"[ERROR] Consulta en segundo plano: {error}")
+    safe_messagebox(title="Error", message=f"No se pudo consultar la base de datos:\n{error}",
+                    level="error", buttons="ok", parent=widget.winfo_toplevel())
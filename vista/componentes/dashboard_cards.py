@@ -1,6 +1,5 @@
 import customtkinter as ctk
-import os
-from PIL import Image
+from vista.componentes.assets import RegistroAssets
 
 
 class DashboardCards(ctk.CTkFrame):
@@ -54,10 +53,8 @@ class DashboardCards(ctk.CTkFrame):
         header = ctk.CTkFrame(card, fg_color="transparent")
         header.pack(pady=(25, 10))
 
-        icon_path = os.path.join("vista", "icons", icon_name)
-        if os.path.exists(icon_path):
-            img = Image.open(icon_path).resize((40, 40))
-            icon_img = ctk.CTkImage(light_image=img, size=(40, 40))
+        icon_img = RegistroAssets.icono(icon_name, (40, 40)) if icon_name else None
+        if icon_img is not None:
             lbl_icon = ctk.CTkLabel(header, image=icon_img, text="")
             lbl_icon.image = icon_img
             lbl_icon.pack(side="left", padx=(0, 10))
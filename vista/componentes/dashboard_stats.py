@@ -1,11 +1,33 @@
 # dashboard_stats.py
 
+import os
+import threading
+import time
 from datetime import datetime
 from db.session_manager import SessionManager
+from db.eventos import al_confirmar_cambios, al_cambiar_prestamos
+
+# Segundos que se reutilizan las métricas antes de volver a consultarlas
+TTL_METRICAS = float(os.getenv("DASHBOARD_TTL", "30") or 30)
+
+# Ventana (en días, desde hoy) de la card "PRÉSTAMOS A VENCER"
+DIAS_A_VENCER = int(os.getenv("DASHBOARD_DIAS_A_VENCER", "3") or 3)
+
+# Tablas cuyos cambios invalidan las métricas
+_TABLAS_METRICAS = frozenset({"socios", "libros", "prestamos", "prestamos_archivo"})
+
 
 class DashboardStats:
     """Clase para obtener estadísticas del sistema de biblioteca."""
 
+    _cache = None          # dict con las métricas
+    _cache_hasta = 0.0     # time.monotonic() en el que vence
+    _cache_lock = threading.Lock()
+    _generacion = 0        # invalidar() la incrementa
+    _calendario = None     # CalendarioVencimientos de los préstamos abiertos
+    _calendario_hasta = 0.0
+    _generacion_calendario = 0  # cambia con cada commit que toca préstamos
+
     @staticmethod
     def _get_session(external_session=None):
         """Devuelve la sesión activa o crea una nueva si no se pasó ninguna."""
@@ -13,6 +35,133 @@ class DashboardStats:
             return external_session, False
         return SessionManager.get_session(), False  # 🔹 nunca se cierra desde aquí
 
+    # ==========================================================
+    # Snapshot de métricas (una sola consulta, con caché)
+    # ==========================================================
+    @classmethod
+    def snapshot(cls, session=None, ttl=None) -> dict:
+        """
+        Devuelve todas las métricas del dashboard:
+        {"socios", "libros", "prestamos", "prestamos_activos",
+         "prestamos_a_vencer", "prestamos_vencidos"}.
+        Los conteos se calculan en una sola consulta y se reutilizan durante `ttl`
+        segundos o hasta que un commit modifique socios, libros o préstamos.
+        Los vencimientos salen del calendario en memoria (ver `calendario`), que
+        los commits mantienen al día: tras un préstamo el snapshot hace una sola consulta.
+        """
+        ttl = TTL_METRICAS if ttl is None else ttl
+        with cls._cache_lock:
+            metricas = cls._cache if time.monotonic() < cls._cache_hasta else None
+            generacion = cls._generacion
+
+        if metricas is None:
+            s, _ = cls._get_session(session)
+            metricas = cls._consultar_metricas(s)
+            with cls._cache_lock:
+                # Un commit invalidó durante la consulta: el resultado puede ser
+                # anterior a ese commit, se devuelve pero no se guarda
+                if cls._generacion == generacion:
+                    cls._cache = metricas
+                    cls._cache_hasta = time.monotonic() + ttl
+
+        calendario = cls.calendario(session, ttl)
+        resultado = dict(metricas)
+        resultado["prestamos_a_vencer"] = calendario.contar_vencen_en(DIAS_A_VENCER)
+        resultado["prestamos_vencidos"] = calendario.contar_vencidos()
+        return resultado
+
+    @classmethod
+    def calendario(cls, session=None, ttl=None):
+        """
+        Calendario de vencimientos de los préstamos abiertos, compartido por las vistas.
+        Los commits de esta aplicación lo actualizan en memoria (ver `aplicar_cambios`);
+        se recarga (una consulta por el índice de fechas) solo cuando vence el TTL,
+        para recoger lo que hayan hecho otras terminales.
+        """
+        ttl = TTL_METRICAS if ttl is None else ttl
+        with cls._cache_lock:
+            if cls._calendario is not None and time.monotonic() < cls._calendario_hasta:
+                return cls._calendario
+            generacion = cls._generacion_calendario
+
+        from modelo.Prestamo import Prestamo
+        s, _ = cls._get_session(session)
+        calendario = Prestamo.cargar_calendario(s)
+
+        with cls._cache_lock:
+            # Si un commit tocó préstamos durante la carga, esta lectura puede no verlo:
+            # se usa, pero no se guarda
+            if cls._generacion_calendario == generacion:
+                cls._calendario = calendario
+                cls._calendario_hasta = time.monotonic() + ttl
+        return calendario
+
+    @classmethod
+    def aplicar_cambios(cls, cambios):
+        """
+        Actualiza el calendario en caché con los préstamos que cambió un commit:
+        [(prestamo_id, fecha_pactada)], con fecha None si se cerró o se borró.
+        Con `cambios` None (no se sabe qué cambió) el calendario se descarta.
+        """
+        with cls._cache_lock:
+            cls._generacion_calendario += 1
+            calendario = cls._calendario
+            if calendario is None:
+                return
+            if cambios is None or any(prestamo_id is None for prestamo_id, _ in cambios):
+                cls._calendario = None
+                cls._calendario_hasta = 0.0
+                return
+            for prestamo_id, fecha_pactada in cambios:
+                if fecha_pactada is None:
+                    calendario.quitar(prestamo_id)
+                else:
+                    calendario.agregar(prestamo_id, fecha_pactada)
+
+    @staticmethod
+    def _consultar_metricas(s) -> dict:
+        from modelo.Socio import Socio
+        from modelo.Libro import Libro
+        from modelo.Prestamo import Prestamo
+        from modelo.PrestamoArchivado import PrestamoArchivado
+        from sqlalchemy import select, func
+
+        # Subconsultas escalares: un único SELECT con los cuatro conteos.
+        # Los préstamos emitidos incluyen los archivados.
+        stmt = select(
+            select(func.count(Socio.id)).scalar_subquery().label("socios"),
+            select(func.count(Libro.id)).scalar_subquery().label("libros"),
+            (
+                select(func.count(Prestamo.id)).scalar_subquery()
+                + select(func.count(PrestamoArchivado.id)).scalar_subquery()
+            ).label("prestamos"),
+            select(func.count(Prestamo.id))
+            .where(Prestamo.fecha_devolucion.is_(None))
+            .scalar_subquery().label("prestamos_activos"),
+        )
+        fila = s.execute(stmt).one()
+        return {clave: valor or 0 for clave, valor in fila._mapping.items()}
+
+    @classmethod
+    def invalidar(cls, tablas=None):
+        """
+        Descarta las métricas en caché (si `tablas` se pasa, solo si las afecta).
+        El calendario se mantiene con `aplicar_cambios`; sin `tablas` se descarta también.
+        """
+        if tablas is not None and not (_TABLAS_METRICAS & set(tablas)):
+            return
+        with cls._cache_lock:
+            cls._generacion += 1
+            cls._cache = None
+            cls._cache_hasta = 0.0
+            if tablas is None:
+                cls._generacion_calendario += 1
+                cls._calendario = None
+                cls._calendario_hasta = 0.0
+
+    # ==========================================================
+    # Métricas individuales
+    # ==========================================================
     @staticmethod
     def obtener_total_socios(session=None) -> int:
         from modelo.Socio import Socio
@@ -30,9 +179,11 @@ class DashboardStats:
     @staticmethod
     def obtener_prestamos_emitidos(session=None) -> int:
         from modelo.Prestamo import Prestamo
+        from modelo.PrestamoArchivado import PrestamoArchivado
         from sqlalchemy import func
         s, _ = DashboardStats._get_session(session)
-        return s.query(func.count(Prestamo.id)).scalar() or 0
+        activos = s.query(func.count(Prestamo.id)).scalar() or 0
+        return activos + (s.query(func.count(PrestamoArchivado.id)).scalar() or 0)
 
     @staticmethod
     def obtener_prestamos_activos(session=None) -> int:
@@ -41,7 +192,18 @@ class DashboardStats:
         s, _ = DashboardStats._get_session(session)
         return s.query(func.count(Prestamo.id)).filter(Prestamo.fecha_devolucion == None).scalar() or 0
 
+    @classmethod
+    def obtener_prestamos_a_vencer(cls, session=None, dias: int = None) -> int:
+        """Préstamos abiertos que vencen desde hoy hasta dentro de `dias` días."""
+        return cls.calendario(session).contar_vencen_en(DIAS_A_VENCER if dias is None else dias)
+
     @staticmethod
     def obtener_fecha_actual() -> str:
         """Devuelve la fecha actual formateada."""
-        return datetime.now().strftime('%d/%m/%Y %H:%M')
\ No newline at end of file
+        return datetime.now().strftime('%d/%m/%Y %H:%M')
+
+
+# Cualquier commit que toque socios, libros o préstamos invalida las métricas;
+# los que tocan préstamos además actualizan el calendario
+al_confirmar_cambios(DashboardStats.invalidar)
+al_cambiar_prestamos(DashboardStats.aplicar_cambios)
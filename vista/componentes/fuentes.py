@@ -0,0 +1,282 @@
+import heapq
+import re
+from collections import OrderedDict
+from datetime import date, datetime
+from itertools import islice
+
+_FECHA = re.compile(r"^\d{2}/\d{2}/\d{4}$")
+
+
+def clave_orden(valor):
+    """
+    Clave de orden tipada: números, luego fechas, luego texto y al final vacíos.
+    Los valores ya tipados (int, date...) se usan tal cual; los textos con forma
+    dd/mm/yyyy o numérica se convierten una sola vez.
+    """
+    if isinstance(valor, bool):
+        return (0, int(valor))
+    if isinstance(valor, (int, float)):
+        return (0, valor)
+    if isinstance(valor, datetime):
+        return (1, valor.date())
+    if isinstance(valor, date):
+        return (1, valor)
+    s = "" if valor is None else str(valor).strip()
+    if not s:
+        return (3, "")
+    if _FECHA.match(s):
+        try:
+            return (1, datetime.strptime(s, "%d/%m/%Y").date())
+        except ValueError:
+            pass
+    try:
+        return (0, float(s.replace(",", ".")))
+    except ValueError:
+        return (2, s.lower())
+
+
+class FuenteLista:
+    """
+    Fuente de filas en memoria (lista de dicts) para la tabla virtual.
+    Una fila puede traer "_orden": {key: valor_tipado} para ordenar por ese valor
+    en lugar del texto mostrado.
+    """
+
+    def __init__(self, filas):
+        self._originales = list(filas)
+        self._filas = self._originales
+        self._claves = {}  # key de columna -> claves de orden (alineadas con _originales)
+
+    def total(self):
+        return len(self._filas)
+
+    def filas(self, desde, cantidad):
+        return self._filas[desde:desde + cantidad]
+
+    def paginas_faltantes(self, desde, cantidad):
+        return []
+
+    def ordenar(self, key, descendente=False):
+        """Ordena por una columna; las claves tipadas se calculan una vez por columna."""
+        claves = self._claves.get(key)
+        if claves is None:
+            claves = self._claves[key] = [
+                clave_orden(f.get("_orden", {}).get(key, f.get(key))) for f in self._originales
+            ]
+        indices = sorted(range(len(claves)), key=claves.__getitem__, reverse=descendente)
+        self._filas = [self._originales[i] for i in indices]
+
+
+class FuenteConsulta:
+    """
+    Fuente de filas paginada por keyset sobre una consulta SQL.
+
+    - consulta: función (sin argumentos) que devuelve un select() SIN order_by.
+    - clave: columna única e indexada por la que se pagina (p. ej. Prestamo.id).
+    - mapear: función fila -> dict con las keys de las columnas de la tabla.
+    - columnas: opcional, {nombre: columna SQL} para ordenar por nombre (ver FuenteUnion).
+
+    Cada página se pide con "WHERE clave > última_clave_de_la_página_anterior LIMIT n",
+    así el costo no depende de cuán lejos esté la página. Solo si se salta a una
+    página cuyo límite todavía no se conoce se usa OFFSET. Las páginas se guardan
+    en una caché LRU acotada.
+
+    Las consultas corren en hilos de fondo: la tabla pide en el hilo de Tk un
+    "cargador" (función que recibe la sesión) y guarda el resultado al volver.
+    """
+
+    def __init__(self, consulta, clave, mapear, *, descendente=False, tamanio_pagina=200, max_paginas=20,
+                 columnas=None):
+        self.consulta = consulta
+        self.clave = clave
+        self.mapear = mapear
+        self.columnas = columnas or {}
+        self.descendente = descendente
+        self.tamanio_pagina = tamanio_pagina
+        self.max_paginas = max_paginas
+        self.orden = None          # columna SQL elegida desde el encabezado
+        self.orden_desc = False
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta la caché (por ejemplo, después de modificar datos)."""
+        self._total = None
+        self._vaciar_paginas()
+
+    def _vaciar_paginas(self):
+        self._paginas = OrderedDict()  # nro de página -> lista de dicts
+        self._limites = {0: None}      # nro de página -> última clave de la página anterior
+
+    def ordenar(self, columna, descendente=False):
+        """
+        Ordena en el servidor (ORDER BY columna, clave). La clave desempata y
+        mantiene la paginación por keyset. El total no cambia, así que se conserva.
+        """
+        self.orden = self.columnas.get(columna, columna) if isinstance(columna, str) else columna
+        self.orden_desc = descendente
+        self._vaciar_paginas()
+
+    def _claves(self):
+        if self.orden is not None:
+            return [self.orden, self.clave], self.orden_desc
+        return [self.clave], self.descendente
+
+    # ------------------------------------------------------------------
+    # Lectura desde la tabla (hilo de Tk)
+    # ------------------------------------------------------------------
+    def total(self):
+        return self._total
+
+    def filas(self, desde, cantidad):
+        """Devuelve las filas pedidas; None en las posiciones aún no cargadas."""
+        resultado = []
+        fin = min(desde + cantidad, self._total or 0)
+        for i in range(desde, fin):
+            pagina, pos = divmod(i, self.tamanio_pagina)
+            filas = self._paginas.get(pagina)
+            if filas is None:
+                resultado.append(None)
+                continue
+            self._paginas.move_to_end(pagina)
+            resultado.append(filas[pos] if pos < len(filas) else None)
+        return resultado
+
+    def paginas_faltantes(self, desde, cantidad):
+        if self._total is None:
+            return []
+        fin = min(desde + cantidad, self._total)
+        if fin <= desde:
+            return []
+        primera = desde // self.tamanio_pagina
+        ultima = (fin - 1) // self.tamanio_pagina
+        return [p for p in range(primera, ultima + 1) if p not in self._paginas]
+
+    # ------------------------------------------------------------------
+    # Cargadores (se ejecutan en un hilo de fondo con su propia sesión)
+    # ------------------------------------------------------------------
+    def cargador_total(self):
+        from sqlalchemy import select, func
+        stmt = select(func.count()).select_from(self.consulta().subquery())
+        return lambda session: session.execute(stmt).scalar() or 0
+
+    def fijar_total(self, total):
+        self._total = total
+
+    def consulta_pagina(self, limite=None, offset=None, cantidad=None):
+        """
+        select() de una página: las filas que siguen a `limite` (la última clave de
+        la página anterior) o, sin límite, desde `offset`. Devuelve (stmt, etiquetas
+        de las columnas de clave agregadas al final de cada fila).
+        """
+        from sqlalchemy import and_, or_
+
+        claves, desc = self._claves()
+        etiquetas = [f"_clave_pagina_{i}" for i in range(len(claves))]
+        stmt = self.consulta().add_columns(*[c.label(e) for c, e in zip(claves, etiquetas)])
+        stmt = stmt.order_by(*[c.desc() if desc else c.asc() for c in claves])
+
+        if limite is not None:
+            # (a, b) > (x, y)  ==>  a > x OR (a = x AND b > y), apto para usar índices
+            def despues(col, valor):
+                return col < valor if desc else col > valor
+            condicion = despues(claves[-1], limite[-1])
+            for col, valor in zip(reversed(claves[:-1]), reversed(limite[:-1])):
+                condicion = or_(despues(col, valor), and_(col == valor, condicion))
+            stmt = stmt.where(condicion)
+        elif offset:
+            stmt = stmt.offset(offset)
+        return stmt.limit(cantidad or self.tamanio_pagina), etiquetas
+
+    def cargador_pagina(self, pagina):
+        """Arma en el hilo de Tk la consulta de la página; devuelve función(session) -> (filas, última clave)."""
+        if pagina in self._limites:
+            stmt, etiquetas = self.consulta_pagina(limite=self._limites[pagina])
+        else:
+            stmt, etiquetas = self.consulta_pagina(offset=pagina * self.tamanio_pagina)
+        mapear = self.mapear
+
+        def cargar(session):
+            filas = session.execute(stmt).all()
+            ultima = tuple(filas[-1]._mapping[e] for e in etiquetas) if filas else None
+            return [mapear(f) for f in filas], ultima
+
+        return cargar
+
+    def guardar_pagina(self, pagina, filas, ultima_clave):
+        self._paginas[pagina] = filas
+        self._paginas.move_to_end(pagina)
+        if ultima_clave is not None:
+            self._limites[pagina + 1] = ultima_clave
+        while len(self._paginas) > self.max_paginas:
+            self._paginas.popitem(last=False)
+
+
+class FuenteUnion(FuenteConsulta):
+    """
+    Varias FuenteConsulta con las mismas columnas (p. ej. préstamos activos y
+    archivados) leídas como una sola, sin UNION en SQL: cada parte se pagina por
+    keyset sobre su propio índice y las páginas se combinan en memoria.
+
+    El límite de cada página es la tupla de últimas claves de cada parte. Saltar
+    a una página cuyo límite no se conoce recorre las intermedias desde la última
+    conocida (lecturas por índice, sin materializar la unión).
+    Para ordenar, las partes resuelven el nombre de columna con su `columnas`.
+    """
+
+    def __init__(self, partes, *, tamanio_pagina=200, max_paginas=20):
+        self.partes = list(partes)
+        self.tamanio_pagina = tamanio_pagina
+        self.max_paginas = max_paginas
+        self.orden_desc = self.partes[0].descendente
+        self.reiniciar()
+
+    def ordenar(self, columna, descendente=False):
+        for parte in self.partes:
+            parte.ordenar(columna, descendente)
+        self.orden_desc = descendente
+        self._vaciar_paginas()
+
+    def cargador_total(self):
+        cargadores = [parte.cargador_total() for parte in self.partes]
+        return lambda session: sum(cargar(session) for cargar in cargadores)
+
+    def cargador_pagina(self, pagina):
+        # Última página con límite conocido a partir de la cual avanzar
+        desde = max(p for p in self._limites if p <= pagina)
+        limites = self._limites[desde] or (None,) * len(self.partes)
+        partes = self.partes
+        n = self.tamanio_pagina
+        desc = partes[0]._claves()[1]
+
+        def cargar(session):
+            nuevos_limites = {}
+            filas = []
+            actuales = list(limites)
+            for nro in range(desde, pagina + 1):
+                listas = []
+                for i, parte in enumerate(partes):
+                    stmt, etiquetas = parte.consulta_pagina(limite=actuales[i], cantidad=n)
+                    listas.append([
+                        (tuple(clave_orden(v) for v in clave), i, clave, fila)
+                        for fila in session.execute(stmt)
+                        for clave in [tuple(fila._mapping[e] for e in etiquetas)]
+                    ])
+                # merge respeta el orden SQL de cada lista aunque la intercalación difiera de la collation
+                tomados = list(islice(heapq.merge(*listas, key=lambda c: c[0], reverse=desc), n))
+                for _, i, clave, _ in tomados:
+                    actuales[i] = clave  # cada parte avanza solo por un prefijo de su propio orden
+                nuevos_limites[nro + 1] = tuple(actuales)
+                if nro == pagina:
+                    filas = [partes[i].mapear(fila) for _, i, _, fila in tomados]
+                if len(tomados) < n:
+                    break
+            return filas, nuevos_limites
+
+        return cargar
+
+    def guardar_pagina(self, pagina, filas, ultima_clave):
+        self._paginas[pagina] = filas
+        self._paginas.move_to_end(pagina)
+        self._limites.update(ultima_clave or {})
+        while len(self._paginas) > self.max_paginas:
+            self._paginas.popitem(last=False)
@@ -1,23 +1,29 @@
+def _abrir(current_window, clase, **params):
+    """Cambia de vista dentro de la ventana principal (o la crea si no hay ninguna)."""
+    from .base_app import VentanaPrincipal, iniciar
+    ventana = current_window.winfo_toplevel() if current_window else None
+    if isinstance(ventana, VentanaPrincipal):
+        return ventana.mostrar(clase, **params)
+    if ventana is not None:
+        ventana.destroy()
+    iniciar(clase, **params)
+
 def go_to_dashboard(current_window=None):
     from vista.main_dashboard import MainDashboard
-    if current_window: current_window.destroy()
-    MainDashboard().mainloop()
+    return _abrir(current_window, MainDashboard)
 
 def go_to_users(current_window=None):
     from vista.users_list import UserList
-    if current_window: current_window.destroy()
-    UserList().mainloop()
+    return _abrir(current_window, UserList)
 
 def go_to_books(current_window=None):
     from vista.books_list import BookList
-    if current_window: current_window.destroy()
-    BookList().mainloop()
+    return _abrir(current_window, BookList)
 
 def go_to_loans(current_window=None):
     from vista.loan_history_list import LoanHistoryList
-    if current_window: current_window.destroy()
-    LoanHistoryList().mainloop()
+    return _abrir(current_window, LoanHistoryList)
 
 def go_to_exit(current_window=None):
     if current_window:
-        current_window.destroy()
\ No newline at end of file
+        current_window.winfo_toplevel().destroy()
@@ -1,6 +1,5 @@
 import customtkinter as ctk
-from PIL import Image
-import os
+from vista.componentes.assets import RegistroAssets
 from vista.componentes.dashboard_stats import DashboardStats
 
 class Sidebar(ctk.CTkFrame):
@@ -17,10 +16,8 @@ class Sidebar(ctk.CTkFrame):
         header.pack(pady=(20, 10))
 
         # Imagen usuario
-        icon_path = os.path.join(os.path.dirname(__file__), "../icons/main_user.png")
-        if os.path.exists(icon_path):
-            img = Image.open(icon_path).resize((70, 70))
-            user_img = ctk.CTkImage(light_image=img, size=(70, 70))
+        user_img = self.icons.get("main_user") or RegistroAssets.icono("main_user.png", (70, 70))
+        if user_img is not None:
             lbl_icon = ctk.CTkLabel(self, image=user_img, text="")
             lbl_icon.image = user_img
             lbl_icon.pack(pady=(0, 10))
@@ -1,16 +1,39 @@
-import tkinter as tk
 from tkinter import ttk
 import customtkinter as ctk
-import datetime
+
+from .fuentes import FuenteLista, clave_orden
+from .consultas import ejecutar_consulta
+
+ALTO_FILA = 32
+
 
 class Table(ctk.CTkFrame):
+    """
+    Tabla basada en ttk.Treeview.
+
+    Con virtual=True el Treeview solo contiene las filas visibles: los datos salen
+    de una fuente (FuenteLista o FuenteConsulta) y al desplazarse se reescriben
+    los valores de esas mismas filas, sin insertar ni borrar ítems.
+    """
 
-    def __init__(self, master, columns, width=1000, height=400, **kwargs):
+    def __init__(self, master, columns, width=1000, height=400, virtual=False, **kwargs):
         super().__init__(master, fg_color="white", **kwargs)
         self.columns = columns
         self.width = width
         self.height = height
+        self.virtual = virtual
         self._sorting_state = {}
+        self._datos = None            # FuenteLista de lo cargado con set_data (modo no virtual)
+        self._filas_por_iid = {}      # id del ítem del Treeview -> dict de la fila (modo no virtual)
+
+        # Estado del modo virtual
+        self._fuente = None
+        self._offset = 0
+        self._filas_visibles = max(1, int(height / 30))
+        self._slots = []              # ids de los ítems reutilizados del Treeview
+        self._paginas_pedidas = set()
+        self._generacion = 0          # descarta respuestas de una fuente anterior
+        self._pedido_programado = None
 
         # --- Estilos base ---
         style = ttk.Style()
@@ -19,7 +42,7 @@ class Table(ctk.CTkFrame):
             "Treeview",
             background="white",
             foreground="#2c3e50",
-            rowheight=32,
+            rowheight=ALTO_FILA,
             fieldbackground="white",
             font=("Segoe UI", 11),
         )
@@ -49,9 +72,16 @@ class Table(ctk.CTkFrame):
         self.tree.pack(side="left", fill="both", expand=True)
 
         # Scrollbar vertical
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        if self.virtual:
+            self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+            self.tree.bind("<MouseWheel>", self._on_mousewheel)
+            self.tree.bind("<Button-4>", lambda e: self._desplazar(-3))
+            self.tree.bind("<Button-5>", lambda e: self._desplazar(3))
+            self.tree.bind("<Configure>", self._on_tree_configure, add="+")
+        else:
+            self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
 
         # Encabezados y anchos
         for col in self.columns:
@@ -61,12 +91,22 @@ class Table(ctk.CTkFrame):
         # Tags de colores (verde y rojo)
         self.tree.tag_configure("due_green", foreground="#27ae60")
         self.tree.tag_configure("due_red", foreground="#e74c3c")
+        self.tree.tag_configure("placeholder", foreground="#95a5a6")
 
     # =====================================================
     def clear(self):
-        """Elimina todas las filas."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Elimina todas las filas (en una sola llamada a Tk)."""
+        self.tree.delete(*self.tree.get_children())
+        self._slots = []
+        self._datos = None
+        self._filas_por_iid = {}
+
+    # =====================================================
+    def mostrar_cargando(self, texto="Cargando..."):
+        """Reemplaza el contenido por una fila indicativa mientras llegan los datos."""
+        self.clear()
+        values = [texto] + [""] * (len(self.columns) - 1)
+        self.tree.insert("", "end", values=values, tags=("placeholder",))
 
     # =====================================================
     def set_data(self, data):
@@ -74,11 +114,163 @@ class Table(ctk.CTkFrame):
         Carga datos en la tabla.
         Cada fila es un dict con keys que coincidan con self.columns.
         """
+        if self.virtual:
+            self.set_fuente(FuenteLista(data))
+            return
+        datos = FuenteLista(data)
+        self._insertar_filas(data)
+        self._datos = datos  # se conserva para ordenar sin releer el Treeview
+
+    def _insertar_filas(self, data):
         self.clear()
         for row in data:
             tags = row.get("_tags", ())
             values = [row.get(col["key"], "") for col in self.columns]
-            self.tree.insert("", "end", values=values, tags=tags)
+            self._filas_por_iid[self.tree.insert("", "end", values=values, tags=tags)] = row
+
+    # =====================================================
+    # Modo virtual
+    # =====================================================
+    def set_fuente(self, fuente):
+        """Asocia una fuente de filas y muestra su primera ventana."""
+        self._fuente = fuente
+        self._offset = 0
+        self._generacion += 1
+        self._paginas_pedidas.clear()
+
+        if fuente.total() is None:
+            self.mostrar_cargando()
+            generacion = self._generacion
+
+            def on_total(total):
+                if generacion == self._generacion:
+                    fuente.fijar_total(total)
+                    self._render()
+
+            ejecutar_consulta(self, fuente.cargador_total(), on_total)
+        else:
+            self._render()
+
+    def refrescar(self):
+        """Vuelve a consultar la fuente actual desde el principio."""
+        if self._fuente is None:
+            return
+        if hasattr(self._fuente, "reiniciar"):
+            self._fuente.reiniciar()
+        self.set_fuente(self._fuente)
+
+    def fila_de(self, row_id):
+        """Devuelve el dict de la fila mostrada en row_id."""
+        if self.virtual and self._fuente is not None:
+            if row_id not in self._slots:
+                return None
+            filas = self._fuente.filas(self._offset + self._slots.index(row_id), 1)
+            return filas[0] if filas else None
+        if row_id in self._filas_por_iid:
+            return self._filas_por_iid[row_id]  # incluye las claves "_..." que no se muestran
+        values = self.tree.item(row_id)["values"]
+        return {col["key"]: v for col, v in zip(self.columns, values)}
+
+    def quitar_fila(self, row_id):
+        """Quita una fila cargada con set_data (también de los datos que se reordenan)."""
+        fila = self._filas_por_iid.pop(row_id, None)
+        self.tree.delete(row_id)
+        if fila is not None and self._datos is not None:
+            restantes = [f for f in self._datos.filas(0, self._datos.total()) if f is not fila]
+            self._datos = FuenteLista(restantes)
+
+    def _ajustar_slots(self, cantidad):
+        while len(self._slots) < cantidad:
+            self._slots.append(self.tree.insert("", "end", values=()))
+        if len(self._slots) > cantidad:
+            self.tree.delete(*self._slots[cantidad:])
+            del self._slots[cantidad:]
+
+    def _render(self):
+        if self._fuente is None:
+            return
+        total = self._fuente.total() or 0
+        self._offset = max(0, min(self._offset, total - self._filas_visibles))
+        cantidad = min(self._filas_visibles, total)
+
+        if not self._slots:
+            self.tree.delete(*self.tree.get_children())  # quitar el "Cargando..." inicial
+        self._ajustar_slots(cantidad)
+
+        vacios = [""] * (len(self.columns) - 1)
+        filas = self._fuente.filas(self._offset, cantidad)
+        for iid, fila in zip(self._slots, filas):
+            if fila is None:
+                self.tree.item(iid, values=["Cargando..."] + vacios, tags=("placeholder",))
+            else:
+                values = [fila.get(col["key"], "") for col in self.columns]
+                self.tree.item(iid, values=values, tags=fila.get("_tags", ()))
+
+        if total:
+            self.scrollbar.set(self._offset / total, (self._offset + cantidad) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        self._programar_pedidos()
+
+    def _programar_pedidos(self):
+        """Pide las páginas faltantes cuando el scroll se detiene un instante."""
+        if self._pedido_programado is not None:
+            self.after_cancel(self._pedido_programado)
+        self._pedido_programado = self.after(60, self._pedir_faltantes)
+
+    def _pedir_faltantes(self):
+        self._pedido_programado = None
+        fuente = self._fuente
+        if fuente is None:
+            return
+        generacion = self._generacion
+        for pagina in fuente.paginas_faltantes(self._offset, self._filas_visibles):
+            if pagina in self._paginas_pedidas:
+                continue
+            self._paginas_pedidas.add(pagina)
+
+            def on_pagina(resultado, pagina=pagina):
+                if generacion != self._generacion:
+                    return
+                self._paginas_pedidas.discard(pagina)
+                filas, ultima_clave = resultado
+                fuente.guardar_pagina(pagina, filas, ultima_clave)
+                self._render()
+
+            def on_error(error, pagina=pagina):
+                self._paginas_pedidas.discard(pagina)
+                print(f"[ERROR] No se pudo cargar la página {pagina}: {error}")
+
+            ejecutar_consulta(self, fuente.cargador_pagina(pagina), on_pagina, on_error)
+
+    def _desplazar(self, filas):
+        if self._fuente is None:
+            return "break"
+        nuevo = self._offset + filas
+        if nuevo != self._offset:
+            self._offset = nuevo
+            self._render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self._desplazar(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, accion, cantidad, unidad=None):
+        if self._fuente is None:
+            return
+        total = self._fuente.total() or 0
+        if accion == "moveto":
+            self._offset = int(float(cantidad) * total)
+            self._render()
+        elif accion == "scroll":
+            paso = self._filas_visibles if unidad == "pages" else 1
+            self._desplazar(int(cantidad) * paso)
+
+    def _on_tree_configure(self, event):
+        visibles = max(1, (event.height - ALTO_FILA) // ALTO_FILA)
+        if visibles != self._filas_visibles:
+            self._filas_visibles = visibles
+            self._render()
 
     # =====================================================
     def bind_cell_click(self, handler):
@@ -104,83 +296,53 @@ class Table(ctk.CTkFrame):
     
         # =====================================================
     def _sort_by_column(self, col_key):
-        """Ordena la tabla por una columna (ASC/DESC alternado, soporta fechas dd/mm/yyyy)."""
-
-        import re
-        from datetime import datetime
-
-        try:
-            col_index = next(i for i, c in enumerate(self.columns) if c["key"] == col_key)
-        except StopIteration:
-            return
-
-        rows = list(self.tree.get_children())
-
-        if not rows:
-            return
-
-        sample = None
-        for row_id in rows:
-            vals = self.tree.item(row_id)["values"]
-            if col_index < len(vals):
-                v = vals[col_index]
-                s = str(v).strip()
-                if s:
-                    sample = s
-                    break
-
-        if sample is None:
+        """
+        Ordena la tabla por una columna (ASC/DESC alternado).
+        - Tabla virtual sobre una consulta: ORDER BY en el servidor sobre col["sql"].
+        - Datos en memoria: se ordenan los dicts con claves tipadas y solo se redibuja.
+        """
+        col = next((c for c in self.columns if c["key"] == col_key), None)
+        if col is None:
             return
-
-        is_date_col = bool(re.match(r"^\d{2}/\d{2}/\d{4}$", sample))
-        is_numeric_col = False
-        if not is_date_col:
-            try:
-                float(sample.replace(",", "."))
-                is_numeric_col = True
-            except ValueError:
-                is_numeric_col = False
-
         reverse = self._sorting_state.get(col_key, False)
-        self._sorting_state[col_key] = not reverse
-
-        def parse_value(v):
-            s = str(v).strip()
-            if s == "":
-                return (1, None)
-
-            if is_date_col:
-                try:
-                    dt = datetime.strptime(s, "%d/%m/%Y")
-                    return (0, dt)
-                except ValueError:
-                    return (0, s.lower())
 
-            if is_numeric_col:
-                try:
-                    num = float(s.replace(",", "."))
-                    return (0, num)
-                except ValueError:
-                    return (0, s.lower())
-
-            return (0, s.lower())
-
-        data = []
-        for row_id in rows:
-            vals = self.tree.item(row_id)["values"]
-            value = vals[col_index] if col_index < len(vals) else ""
-            data.append((parse_value(value), row_id))
-
-        # Ordenar
-        data.sort(key=lambda x: x[0], reverse=reverse)
+        if self.virtual:
+            if self._fuente is None:
+                return
+            if isinstance(self._fuente, FuenteLista):
+                self._fuente.ordenar(col_key, reverse)
+            elif col.get("sql") is not None:
+                self._fuente.ordenar(col["sql"], reverse)
+            else:
+                return  # columna sin equivalente SQL: no se puede ordenar en el servidor
+            self._generacion += 1
+            self._paginas_pedidas.clear()
+            self._offset = 0
+            self._render()
+        elif self._datos is not None:
+            self._datos.ordenar(col_key, reverse)
+            datos = self._datos
+            self._insertar_filas(datos.filas(0, datos.total()))
+            self._datos = datos
+        else:
+            # Filas insertadas a mano en el Treeview: se ordenan leyéndolas de vuelta
+            col_index = self.columns.index(col)
+            rows = self.tree.get_children()
+            if not rows:
+                return
+            data = []
+            for row_id in rows:
+                vals = self.tree.item(row_id)["values"]
+                data.append((clave_orden(vals[col_index] if col_index < len(vals) else ""), row_id))
+            data.sort(key=lambda x: x[0], reverse=reverse)
+            for index, (_, row_id) in enumerate(data):
+                self.tree.move(row_id, "", index)
 
-        for index, (_, row_id) in enumerate(data):
-            self.tree.move(row_id, "", index)
+        self._sorting_state[col_key] = not reverse
 
-        for col in self.columns:
-            self.tree.heading(col["key"], text=col["text"])
+        for c in self.columns:
+            self.tree.heading(c["key"], text=c["text"])
 
         # Agregar flecha a la columna ordenada
         arrow = " ▲" if not reverse else " ▼"
-        header_text = next(c["text"] for c in self.columns if c["key"] == col_key)
-        self.tree.heading(col_key, text=header_text + arrow)
+        self.tree.heading(col_key, text=col["text"] + arrow)
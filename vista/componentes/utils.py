@@ -3,24 +3,12 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
-from PIL import Image
+from .assets import RegistroAssets
 
 def load_icons():
-    """Carga los íconos desde la carpeta vistas/icons con rutas absolutas."""
-    # 🔥 ruta absoluta (independiente del directorio actual)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "icons"))
-
+    """Íconos del menú lateral; salen del registro de assets (se decodifican una vez por proceso)."""
     def icon(filename, size=(22, 22)):
-        path = os.path.join(base_dir, filename)
-        if os.path.exists(path):
-            try:
-                return ctk.CTkImage(light_image=Image.open(path), size=size)
-            except Exception as e:
-                print(f"[WARN] No se pudo cargar ícono '{filename}': {e}")
-                return None
-        else:
-            print(f"[WARN] Ícono no encontrado: {path}")
-            return None
+        return RegistroAssets.icono(filename, size)
 
     return {
         "home": icon("home.png"),
@@ -63,6 +51,8 @@ def safe_messagebox(title="Mensaje", message="", level="info", buttons="ok", par
     """
     temp_root = None
     root = parent or tk._default_root
+    if root is not None and not isinstance(root, tk.Tk):
+        root = root.winfo_toplevel()  # las vistas son frames dentro de la ventana principal
     if root is None or not isinstance(root, tk.Tk):
         temp_root = tk.Tk()
         temp_root.withdraw()
@@ -1,38 +1,32 @@
 import re
 import customtkinter as ctk
-from db.session_manager import SessionManager
 
 from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
-from vista.componentes.callbacks import get_default_callbacks
 from vista.componentes.utils import safe_messagebox   # ✅ Nuevo helper seguro
 
 from modelo.Libro import Libro
 from modelo.Ejemplar import Ejemplar
 from modelo.Categoria import Categoria
+from db.referencias import CacheReferencias
 
 
 class EditBook(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Gestión de Libros - Biblioteca Pública")
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
-
-        callbacks = get_default_callbacks(self)
-        self.layout = AppLayout(
-            self,
-            banner_image="vista/images/banner_bandera.jpg",
-            callbacks=callbacks
-        )
-        self.layout.pack(fill="both", expand=True)
-
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Gestión de Libros - Biblioteca Pública", session=session, admin=admin)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
         self._build_form()
-        self.mainloop()
+
+    def al_mostrar(self):
+        """Al volver a la pantalla el formulario arranca vacío (las categorías pueden haber cambiado)."""
+        categorias = [c.nombre for c in CacheReferencias.categorias(self.session)]
+        self.categoria_cb.configure(values=categorias or ["Sin categorías"])
+        self._limpiar_form()
 
     # ======================================================
     def _build_form(self):
         """Construye el formulario de alta/edición de libro."""
-        frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        frame = ctk.CTkFrame(self, fg_color="transparent")
         frame.grid(row=1, column=0, sticky="nsew", padx=40, pady=30)
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_columnconfigure(1, weight=2)
@@ -66,7 +60,7 @@ class EditBook(BaseApp):
         ctk.CTkLabel(frame, text="Categoría:", font=ctk.CTkFont(size=14)).grid(
             row=5, column=0, sticky="e", pady=6, padx=5
         )
-        categorias = [c.nombre for c in self.session.query(Categoria).order_by(Categoria.nombre).all()]
+        categorias = [c.nombre for c in CacheReferencias.categorias(self.session)]
         self.categoria_cb = ctk.CTkComboBox(frame, values=categorias or ["Sin categorías"], width=250)
         self.categoria_cb.grid(row=5, column=1, sticky="w", pady=6, padx=5)
 
@@ -176,9 +170,8 @@ class EditBook(BaseApp):
             safe_messagebox(title="Error", message="Debe tener un libro cargado para editar ejemplares.", level="error", buttons="ok", parent=self)
             return
 
-        self.destroy()
         from vista.edit_copy import EditCopy
-        EditCopy(session=self.session, isbn=isbn, admin=self.admin)
+        self.navegar(EditCopy, isbn=isbn)
 
     # ======================================================
     def _guardar_libro(self):
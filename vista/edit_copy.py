@@ -2,32 +2,27 @@ import customtkinter as ctk
 from datetime import datetime
 
 from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
-from vista.componentes.callbacks import get_default_callbacks
 from vista.componentes.utils import safe_messagebox
 
 from modelo.Ejemplar import Ejemplar
-from db.session_manager import SessionManager
 
 
 class EditCopy(BaseApp):
-    def __init__(self, session=None, isbn=None, admin=None):
-        super().__init__(title="Editar Ejemplar - Biblioteca Pública")
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
+    def __init__(self, master, session=None, isbn=None, admin=None):
+        super().__init__(master, title="Editar Ejemplar - Biblioteca Pública", session=session, admin=admin)
         self.isbn = (isbn or "").upper()  # 🔹 Forzar a mayúsculas
-
-        callbacks = get_default_callbacks(self)
-        self.layout = AppLayout(self, banner_image="vista/images/banner_bandera.jpg", callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
 
         self._build_form()
         self._load_ejemplares()
-        self.mainloop()
+
+    def al_mostrar(self):
+        self._load_ejemplares()
 
     # ======================================================
     def _build_form(self):
-        frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        frame = ctk.CTkFrame(self, fg_color="transparent")
         frame.grid(row=1, column=0, sticky="nsew", padx=40, pady=30)
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_columnconfigure(1, weight=2)
@@ -228,6 +223,5 @@ class EditCopy(BaseApp):
     # ======================================================
     def _volver(self):
         """Vuelve a la vista anterior."""
-        self.destroy()
         from vista.edit_book import EditBook
-        EditBook(session=self.session, admin=self.admin)
+        self.navegar(EditBook)
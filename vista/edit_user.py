@@ -1,34 +1,28 @@
 import re
 from datetime import datetime
 import customtkinter as ctk
-from db.session_manager import SessionManager
 
 from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
-from vista.componentes.callbacks import get_default_callbacks
 from vista.componentes.utils import safe_messagebox
 
 from modelo.Socio import Socio
 
 
 class EditUser(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Gestión de Socios - Biblioteca Pública")
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
-
-        callbacks = get_default_callbacks(self)
-
-        self.layout = AppLayout(self, banner_image="vista/images/banner_bandera.jpg", callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
-
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Gestión de Socios - Biblioteca Pública", session=session, admin=admin)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
         self._build_form()
-        self.mainloop()
+
+    def al_mostrar(self):
+        """Al volver a la pantalla el formulario arranca vacío."""
+        self._limpiar_form()
 
     # ======================================================
     def _build_form(self):
         """Construye el formulario de alta/edición de socio."""
-        form_frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        form_frame = ctk.CTkFrame(self, fg_color="transparent")
         form_frame.grid(row=1, column=0, sticky="nsew", padx=40, pady=30)
         form_frame.grid_columnconfigure(0, weight=1)
         form_frame.grid_columnconfigure(1, weight=2)
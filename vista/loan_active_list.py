@@ -1,35 +1,24 @@
-import os
 import customtkinter as ctk
 from datetime import date, datetime
 from sqlalchemy.orm import joinedload
 
-from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
-from vista.componentes.callbacks import get_default_callbacks
+from vista.componentes.base_app import BaseApp, iniciar
 from vista.componentes.table import Table  # tu Table modular
 from vista.componentes.utils import safe_messagebox
+from vista.componentes.consultas import ejecutar_consulta
 
-from db.session_manager import SessionManager
 from modelo.Prestamo import Prestamo
 from modelo.Ejemplar import Ejemplar
 
 
 class LoanActiveList(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Biblioteca Pública - Préstamos Activos")
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Biblioteca Pública - Préstamos Activos", session=session, admin=admin)
 
-        callbacks = get_default_callbacks(self)
-        banner_path = os.path.join("vista", "images", "banner_bandera.jpg")
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
 
-        self.layout = AppLayout(self, banner_image=banner_path, callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
-
-        self.layout.main_frame.grid_rowconfigure(1, weight=1)
-        self.layout.main_frame.grid_columnconfigure(0, weight=1)
-
-        self.content_frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=10)
 
         title = ctk.CTkLabel(self.content_frame, text="📋 Préstamos Activos",
@@ -59,15 +48,18 @@ class LoanActiveList(BaseApp):
         # Bind click en celdas (para la columna 'accion')
         self.table.bind_cell_click(self._on_cell_click)
 
-        self._rows_index = {}  # row_id -> prestamo_id
         self.load_data()
 
     # ------------------------------------------------------
     # Data
     def load_data(self):
-        session = self.session
+        """Consulta los préstamos activos en segundo plano y luego los pinta."""
+        self.table.mostrar_cargando()
+        ejecutar_consulta(self, self._consultar_filas, self._pintar_filas)
+
+    def _consultar_filas(self, session):
+        """Se ejecuta en un hilo de fondo: devuelve un dict por fila (con su "_prestamo_id")."""
         today = date.today()
-        self._rows_index.clear()
 
         activos = (
             session.query(Prestamo)
@@ -80,10 +72,7 @@ class LoanActiveList(BaseApp):
             .all()
         )
 
-        # Limpia la tabla
-        for item in self.table.tree.get_children():
-            self.table.tree.delete(item)
-
+        filas = []
         for p in activos:
             socio = p.socio
             ej = p.ejemplar
@@ -95,7 +84,7 @@ class LoanActiveList(BaseApp):
             if pactada_d is None or pactada_d <= today:
                 tag = "due_red"
 
-            values = {
+            filas.append({
                 "dni": getattr(socio, "dni", ""),
                 "nombre": getattr(socio, "nombre", ""),
                 "apellido": getattr(socio, "apellido", ""),
@@ -105,12 +94,15 @@ class LoanActiveList(BaseApp):
                 "fecha_prestamo": self._fmt_fecha(p.fecha_prestamo),
                 "fecha_pactada": self._fmt_fecha(p.fecha_devolucion_pactada),
                 "accion": "Cerrar",
-            }
+                "_prestamo_id": p.id,  # la fila conserva a qué préstamo corresponde (también al ordenar)
+                "_orden": {"fecha_prestamo": p.fecha_prestamo, "fecha_pactada": pactada_d},
+                "_tags": (tag,),
+            })
+
+        return filas
 
-            row_id = self.table.tree.insert("", "end",
-                                            values=[values[c["key"]] for c in self.columns],
-                                            tags=(tag,))
-            self._rows_index[row_id] = p.id  # mapear fila -> id de préstamo
+    def _pintar_filas(self, filas):
+        self.table.set_data(filas)
 
         # Para que la columna 'accion' no se estire
         self.table.tree.column(self.columns[-1]["key"], stretch=False, anchor="center")
@@ -120,7 +112,8 @@ class LoanActiveList(BaseApp):
     def _on_cell_click(self, row_id, col_key):
         if not row_id or col_key != "accion":
             return
-        prestamo_id = self._rows_index.get(row_id)
+        fila = self.table.fila_de(row_id)
+        prestamo_id = fila.get("_prestamo_id") if fila else None
         if not prestamo_id:
             return
 
@@ -156,7 +149,7 @@ class LoanActiveList(BaseApp):
             return
 
         # Quitar fila de la vista (ya no está activo)
-        self.table.tree.delete(row_id)
+        self.table.quitar_fila(row_id)
 
     # ------------------------------------------------------
     @staticmethod
@@ -168,5 +161,4 @@ class LoanActiveList(BaseApp):
 
 
 if __name__ == "__main__":
-    app = LoanActiveList()
-    app.mainloop()
+    iniciar(LoanActiveList)
@@ -0,0 +1,116 @@
+import customtkinter as ctk
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from vista.componentes.base_app import BaseApp, iniciar
+from vista.componentes.table import Table
+from vista.componentes.consultas import ejecutar_consulta
+from vista.componentes.dashboard_stats import DashboardStats, DIAS_A_VENCER
+
+from modelo.Prestamo import Prestamo
+from modelo.Ejemplar import Ejemplar
+
+
+class LoanDueList(BaseApp):
+    """Detalle de la card "PRÉSTAMOS A VENCER": vencidos, que vencen hoy o en los próximos días."""
+
+    FILTROS = ("Vencidos", "Vencen hoy", f"Próximos {DIAS_A_VENCER} días")
+
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Biblioteca Pública - Vencimientos", session=session, admin=admin)
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.content_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=10)
+
+        title = ctk.CTkLabel(self.content_frame, text="⏰ Vencimientos de préstamos",
+                             font=ctk.CTkFont(size=22, weight="bold"))
+        title.grid(row=0, column=0, sticky="w", pady=(0, 8))
+
+        self.filtro = ctk.CTkSegmentedButton(self.content_frame, values=list(self.FILTROS),
+                                             command=lambda value: self.load_data())
+        self.filtro.set(self.FILTROS[2])
+        self.filtro.grid(row=1, column=0, sticky="w", pady=(0, 8))
+
+        self.columns = [
+            {"key": "dni",            "text": "DNI",             "width": 110},
+            {"key": "nombre",         "text": "Nombre",          "width": 140},
+            {"key": "apellido",       "text": "Apellido",        "width": 140},
+            {"key": "titulo",         "text": "Título",          "width": 230},
+            {"key": "codigo",         "text": "Código ejemplar", "width": 140},
+            {"key": "fecha_prestamo", "text": "Fecha préstamo",  "width": 135},
+            {"key": "fecha_pactada",  "text": "Vence",           "width": 120},
+            {"key": "dias",           "text": "Días",            "width": 80},
+        ]
+
+        self.table = Table(self.content_frame, self.columns, width=1100, height=420)
+        self.table.grid(row=2, column=0, sticky="nsew")
+
+        self.load_data()
+
+    # ------------------------------------------------------
+    def load_data(self):
+        """Toma los ids del calendario de vencimientos y trae solo esas filas."""
+        filtro = self.filtro.get()
+        self.table.mostrar_cargando()
+        ejecutar_consulta(self, lambda session: self._consultar_filas(session, filtro), self.table.set_data)
+
+    def _consultar_filas(self, session, filtro):
+        """Se ejecuta en un hilo de fondo."""
+        hoy = date.today()
+        calendario = DashboardStats.calendario(session)
+        if filtro == self.FILTROS[0]:
+            entradas = calendario.vencidos(hoy)
+        elif filtro == self.FILTROS[1]:
+            entradas = calendario.vencen_hoy(hoy)
+        else:
+            entradas = calendario.vencen_en(DIAS_A_VENCER, hoy)
+        ids = [prestamo_id for prestamo_id, _, _ in entradas]
+        if not ids:
+            return []
+
+        prestamos = session.execute(
+            select(Prestamo)
+            .options(
+                joinedload(Prestamo.socio),
+                joinedload(Prestamo.ejemplar).joinedload(Ejemplar.libro),
+            )
+            .where(Prestamo.id.in_(ids), Prestamo.fecha_devolucion.is_(None))
+            .order_by(Prestamo.fecha_devolucion_pactada)
+        ).scalars().all()
+
+        filas = []
+        for p in prestamos:
+            socio = p.socio
+            ej = p.ejemplar
+            libro = ej.libro if ej else None
+            pactada = p.fecha_devolucion_pactada.date() if p.fecha_devolucion_pactada else hoy
+            dias = (pactada - hoy).days
+            filas.append({
+                "dni": getattr(socio, "dni", ""),
+                "nombre": getattr(socio, "nombre", ""),
+                "apellido": getattr(socio, "apellido", ""),
+                "titulo": getattr(libro, "titulo", "") if libro else "",
+                "codigo": getattr(ej, "codigo", ""),
+                "fecha_prestamo": self._fmt_fecha(p.fecha_prestamo),
+                "fecha_pactada": self._fmt_fecha(pactada),
+                "dias": dias,
+                "_orden": {"fecha_prestamo": p.fecha_prestamo, "fecha_pactada": pactada},
+                "_tags": ("due_red",) if dias <= 0 else ("due_green",),
+            })
+        return filas
+
+    # ------------------------------------------------------
+    @staticmethod
+    def _fmt_fecha(dttm):
+        if not dttm:
+            return ""
+        d = dttm.date() if hasattr(dttm, "date") else dttm
+        return f"{d.day:02d}/{d.month:02d}/{d.year:04d}"
+
+
+if __name__ == "__main__":
+    iniciar(LoanDueList)
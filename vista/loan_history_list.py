@@ -5,38 +5,28 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import customtkinter as ctk
 from datetime import date
 
-from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
+from vista.componentes.base_app import BaseApp, iniciar
 from vista.componentes.table import Table
-from vista.componentes.callbacks import get_default_callbacks
+from vista.componentes.fuentes import FuenteConsulta, FuenteUnion
 
 from modelo.Prestamo import Prestamo
 from modelo.Ejemplar import Ejemplar
 from modelo.Libro import Libro
 from modelo.Socio import Socio
+from modelo.PrestamoArchivado import PrestamoArchivado
 
-from sqlalchemy.orm import joinedload
-from db.session_manager import SessionManager
+from sqlalchemy import select
 
 
 class LoanHistoryList(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Biblioteca Pública - Historial de Préstamos")
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Biblioteca Pública - Historial de Préstamos", session=session, admin=admin)
 
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
-
-        callbacks = get_default_callbacks(self)
-
-        # Estructura base
-        self.layout = AppLayout(self, banner_image="vista/images/banner_bandera.jpg", callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
-
-        self.layout.main_frame.grid_rowconfigure(1, weight=1)
-        self.layout.main_frame.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
 
         # Contenedor principal
-        self.content_frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.grid(row=1, column=0, sticky="n", pady=10)
 
         ctk.CTkLabel(
@@ -46,68 +36,79 @@ class LoanHistoryList(BaseApp):
         ).grid(row=0, column=0, sticky="w", pady=(0, 10))
 
         # Definición de columnas
+        # "sql": columna por la que se ordena en el servidor al hacer clic en el encabezado
         columns = [
-            {"key": "dni", "text": "DNI", "width": 120},
-            {"key": "nombre", "text": "Nombre", "width": 150},
-            {"key": "apellido", "text": "Apellido", "width": 150},
-            {"key": "titulo", "text": "Título", "width": 220},
-            {"key": "isbn", "text": "ISBN", "width": 130},
-            {"key": "ejemplar", "text": "Ejemplar", "width": 100},
-            {"key": "fecha_solicitado", "text": "Fecha solicitado", "width": 140},
-            {"key": "fecha_devolucion", "text": "Fecha devolución", "width": 140},
+            {"key": "dni", "text": "DNI", "width": 120, "sql": Socio.dni},
+            {"key": "nombre", "text": "Nombre", "width": 150, "sql": Socio.nombre},
+            {"key": "apellido", "text": "Apellido", "width": 150, "sql": Socio.apellido},
+            {"key": "titulo", "text": "Título", "width": 220, "sql": Libro.titulo},
+            {"key": "isbn", "text": "ISBN", "width": 130, "sql": Libro.isbn},
+            {"key": "ejemplar", "text": "Ejemplar", "width": 100, "sql": Ejemplar.numero_ejemplar},
+            # Columnas propias de cada tabla: se resuelven por nombre en cada parte de la fuente
+            {"key": "fecha_solicitado", "text": "Fecha solicitado", "width": 140, "sql": "fecha_prestamo"},
+            {"key": "fecha_devolucion", "text": "Fecha devolución", "width": 140, "sql": "fecha_devolucion"},
             {"key": "estado", "text": "Estado", "width": 120},
         ]
 
-        self.table = Table(self.content_frame, columns, width=900, height=420)
+        # Tabla virtual: solo se dibujan las filas visibles, el resto se pide al desplazarse
+        self.table = Table(self.content_frame, columns, width=900, height=420, virtual=True)
         self.table.grid(row=1, column=0, sticky="n")
 
         self.load_data()
 
     # ===========================================================
     def load_data(self):
-        """Carga el historial de préstamos usando la sesión compartida."""
-        if not self.session:
-            raise ValueError("No se recibió una sesión de base de datos válida.")
-
-        # Traer préstamos devueltos junto con socio, ejemplar y libro
-        devueltos = (
-            self.session.query(Prestamo)
-            .options(
-                joinedload(Prestamo.socio),
-                joinedload(Prestamo.ejemplar).joinedload(Ejemplar.libro)
+        """
+        Asocia la tabla al historial paginado (de a una página por vez, en segundo plano).
+        Préstamos activos y archivados se paginan cada uno sobre su propio índice y
+        se combinan en memoria, sin materializar un UNION ALL por página.
+        """
+        partes = [
+            FuenteConsulta(
+                lambda modelo=modelo: self._consulta(modelo), modelo.id, self._mapear_fila, descendente=True,
+                columnas={"fecha_prestamo": modelo.fecha_prestamo, "fecha_devolucion": modelo.fecha_devolucion},
             )
-            .filter(Prestamo.fecha_devolucion.isnot(None))
-            .all()
+            for modelo in (Prestamo, PrestamoArchivado)
+        ]
+        self.table.set_fuente(FuenteUnion(partes))
+
+    @staticmethod
+    def _consulta(modelo):
+        # Préstamos devueltos de `modelo` (Prestamo o PrestamoArchivado) junto con socio, ejemplar y libro.
+        # Joins explícitos para poder ordenar por columnas de las tablas relacionadas
+        # (el archivo no tiene relaciones: se une por las mismas columnas).
+        return (
+            select(modelo, Socio, Ejemplar, Libro)
+            .join(Socio, Socio.dni == modelo.socio_id)
+            .join(Ejemplar, Ejemplar.codigo == modelo.ejemplar_id)
+            .join(Libro, Libro.isbn == Ejemplar.libro_isbn)
+            .where(modelo.fecha_devolucion.isnot(None))
         )
 
-        rows = []
-        for p in devueltos:
-            socio = p.socio
-            ej = p.ejemplar
-            libro = ej.libro if ej else None
-
-            pactada = getattr(p, "fecha_devolucion_pactada", None)
-            dev = getattr(p, "fecha_devolucion", None)
-            pactada = pactada.date() if hasattr(pactada, "date") else pactada
-            dev = dev.date() if hasattr(dev, "date") else dev
-
-            on_time = (dev and pactada and dev <= pactada)
-            estado_bg = "#27ae60" if on_time else "#e74c3c"
-
-            rows.append({
-                "dni": getattr(socio, "dni", ""),
-                "nombre": getattr(socio, "nombre", ""),
-                "apellido": getattr(socio, "apellido", ""),
-                "titulo": getattr(libro, "titulo", ""),
-                "isbn": getattr(libro, "isbn", ""),
-                "ejemplar": getattr(ej, "numero_ejemplar", ""),
-                "fecha_solicitado": self.formato_fecha(p.fecha_prestamo),
-                "fecha_devolucion": self.formato_fecha(p.fecha_devolucion),
-                "estado": "Devuelto",
-                "estado_bg": estado_bg,
-            })
-
-        self.table.set_data(rows)
+    def _mapear_fila(self, fila):
+        """Se ejecuta en un hilo de fondo: convierte una fila de la consulta en un dict de la tabla."""
+        p, socio, ej, libro = fila[:4]
+
+        pactada = getattr(p, "fecha_devolucion_pactada", None)
+        dev = getattr(p, "fecha_devolucion", None)
+        pactada = pactada.date() if hasattr(pactada, "date") else pactada
+        dev = dev.date() if hasattr(dev, "date") else dev
+
+        on_time = (dev and pactada and dev <= pactada)
+        estado_bg = "#27ae60" if on_time else "#e74c3c"
+
+        return {
+            "dni": getattr(socio, "dni", ""),
+            "nombre": getattr(socio, "nombre", ""),
+            "apellido": getattr(socio, "apellido", ""),
+            "titulo": getattr(libro, "titulo", ""),
+            "isbn": getattr(libro, "isbn", ""),
+            "ejemplar": getattr(ej, "numero_ejemplar", ""),
+            "fecha_solicitado": self.formato_fecha(p.fecha_prestamo),
+            "fecha_devolucion": self.formato_fecha(p.fecha_devolucion),
+            "estado": "Devuelto",
+            "estado_bg": estado_bg,
+        }
 
     # ===========================================================
     def formato_fecha(self, dttm):
@@ -118,7 +119,4 @@ class LoanHistoryList(BaseApp):
 
 
 if __name__ == "__main__":
-    # Solo para pruebas: crea sesión temporal si no se pasa ninguna
-    from db.Conector import SessionLocal
-    app = LoanHistoryList(session=SessionLocal())
-    app.mainloop()
+    iniciar(LoanHistoryList)
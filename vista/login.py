@@ -137,15 +137,21 @@ class LoginWindow(ctk.CTk):
         self.update()
 
         try:
-            from db.Conector import SessionLocal
+            # Normalmente ya terminó mientras se escribían las credenciales
+            from helpers.arranque import esperar_capa_datos
+            esperar_capa_datos()
+
+            from db.session_manager import SessionManager
             from modelo.Administrador import Administrador
 
-            session = SessionLocal()
+            session = SessionManager.get_session()
 
             admin = session.query(Administrador).filter_by(dni=dni).first()
             print(f"Administrador encontrado: {admin}")
 
             if admin and admin.verificar_password(password):
+                # Se desvincula para que siga legible cuando las ventanas cierren su sesión
+                session.expunge(admin)
                 self.admin_autenticado = admin
                 self.session_activa = session
                 messagebox.showinfo("Éxito", f"¡Bienvenido, {admin.nombre} {admin.apellido}!")
@@ -171,17 +177,34 @@ class LoginWindow(ctk.CTk):
 
     # =====================================================
     def abrir_dashboard(self):
-        """Cierra el login y abre el dashboard principal."""
+        """Cierra el login; main() abre la ventana principal cuando termina este mainloop."""
         self.destroy()
-        from vista.main_dashboard import MainDashboard
-        app = MainDashboard(session=self.session_activa, admin=self.admin_autenticado)
-        app.mainloop()
 
 
 # =====================================================
-def main():
+def main(auditoria=False):
+    """
+    Pinta el login primero; la capa de datos (modelos, mappers, engine y, con
+    auditoria=True, la auditoría de préstamos) se carga en segundo plano.
+    """
+    from helpers.arranque import medidor, cargar_capa_datos
+
     app = LoginWindow()
+    medidor.marcar("ventana de login creada")
+
+    def primer_pintado():
+        medidor.marcar("primer pintado")
+        cargar_capa_datos(auditoria=auditoria)
+
+    # Tk dibuja los widgets en tareas "idle": esta corre después de ellas
+    app.after_idle(primer_pintado)
     app.mainloop()
 
+    # Sin mainloops anidados: el login ya terminó cuando se crea la ventana principal
+    if app.admin_autenticado is not None:
+        from vista.componentes.base_app import iniciar
+        from vista.main_dashboard import MainDashboard
+        iniciar(MainDashboard, session=app.session_activa, admin=app.admin_autenticado)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,7 @@
-import os
 import customtkinter as ctk
-from db.session_manager import SessionManager
 
 # Import modular de componentes
-from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
-from vista.componentes.callbacks import get_default_callbacks
+from vista.componentes.base_app import BaseApp, iniciar
 from vista.componentes.dashboard_cards import DashboardCards
 from vista.componentes.dashboard_stats import DashboardStats
 
@@ -13,30 +9,23 @@ from vista.componentes.dashboard_stats import DashboardStats
 class MainDashboard(BaseApp):
     """Vista principal del panel de control del sistema de biblioteca."""
 
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Biblioteca Pública - Dashboard")
-
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
-
-        callbacks = get_default_callbacks(self)
-        banner_path = os.path.join("vista", "images", "banner_bandera.jpg")
-
-        # Layout base
-        self.layout = AppLayout(self, banner_image=banner_path, callbacks=callbacks, admin=self.admin)
-        self.layout.pack(fill="both", expand=True)
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Biblioteca Pública - Dashboard", session=session, admin=admin)
 
         # Proporciones
-        self.layout.main_frame.grid_rowconfigure(0, weight=0)
-        self.layout.main_frame.grid_rowconfigure(1, weight=3)
-        self.layout.main_frame.grid_rowconfigure(2, weight=2)
-        self.layout.main_frame.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=3)
+        self.grid_rowconfigure(2, weight=2)
+        self.grid_columnconfigure(0, weight=1)
 
         # Crear componente de cards
         self._build_cards_component()
         # Crear sección inferior (gráficos)
         self._build_graph_section()
 
+    def al_mostrar(self):
+        """Al volver al escritorio solo se actualizan los valores de las cards."""
+        self._rellenar_cards()
+
     # ======================================================
     def _build_cards_component(self):
         """Crea el componente de cards y luego las rellena."""
@@ -47,20 +36,22 @@ class MainDashboard(BaseApp):
             {"titulo": "PRÉSTAMOS A VENCER", "pie": "Cerrar préstamo", "color": "#E67E22", "icon": "calendar.png"},
         ]
 
-        self.cards_component = DashboardCards(self.layout.main_frame, cards_info=cards_info)
+        self.cards_component = DashboardCards(self, cards_info=cards_info)
         self.cards_component.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 10))
 
         self._rellenar_cards()
+        self._asignar_eventos()
 
     # ======================================================
     def _rellenar_cards(self):
-        """Rellena las métricas de las cards y asigna eventos."""
+        """Rellena las métricas de las cards (snapshot con caché, ver DashboardStats)."""
+        snapshot = DashboardStats.snapshot(self.session)
         metricas = {
-    "SOCIOS REGISTRADOS": DashboardStats.obtener_total_socios(self.session),
-    "LIBROS CARGADOS": DashboardStats.obtener_total_libros(self.session),
-    "PRÉSTAMOS REALIZADOS": DashboardStats.obtener_prestamos_emitidos(self.session),
-    "PRÉSTAMOS A VENCER": DashboardStats.obtener_prestamos_activos(self.session),
-    }
+            "SOCIOS REGISTRADOS": snapshot["socios"],
+            "LIBROS CARGADOS": snapshot["libros"],
+            "PRÉSTAMOS REALIZADOS": snapshot["prestamos"],
+            "PRÉSTAMOS A VENCER": snapshot["prestamos_a_vencer"],
+        }
 
 
         for titulo, valor in metricas.items():
@@ -68,6 +59,8 @@ class MainDashboard(BaseApp):
             if card and hasattr(card, "value_label"):
                 card.value_label.configure(text=str(valor))
 
+    def _asignar_eventos(self):
+        """Asigna los clicks de las cards (una sola vez, al armar la vista)."""
         # Asignar eventos de click a pies
         for card in self.cards_component.winfo_children():
             pie_text = card.footer_label.cget("text").lower()
@@ -80,10 +73,16 @@ class MainDashboard(BaseApp):
             else:
                 card.footer_label.bind("<Button-1>", lambda e: self._close_loan())
 
+        # El valor de "PRÉSTAMOS A VENCER" abre el detalle de vencimientos
+        card = self.cards_component.get_card_by_title("PRÉSTAMOS A VENCER")
+        if card and hasattr(card, "value_label"):
+            card.value_label.configure(cursor="hand2")
+            card.value_label.bind("<Button-1>", lambda e: self._open_due_list())
+
     # ======================================================
     def _build_graph_section(self):
         """Frame inferior para futuros gráficos."""
-        graph_frame = ctk.CTkFrame(self.layout.main_frame, fg_color="#ECF0F1", corner_radius=15)
+        graph_frame = ctk.CTkFrame(self, fg_color="#ECF0F1", corner_radius=15)
         graph_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=(0, 20))
 
         lbl = ctk.CTkLabel(graph_frame, text="(Sección de gráficos próximamente)",
@@ -94,29 +93,24 @@ class MainDashboard(BaseApp):
     # ======================================================
     # Eventos de navegación
     def _open_edit_user(self):
-        self.after(100, lambda: self._launch_window("edit_user", "EditUser"))
-        self.destroy()
         from vista.edit_user import EditUser
-        EditUser(session=self.session, admin=self.admin)
+        self.navegar(EditUser)
 
     def _open_edit_book(self):
-        self.after(100, lambda: self._launch_window("edit_book", "EditBook"))
-        self.destroy()
         from vista.edit_book import EditBook
-        EditBook(session=self.session, admin=self.admin)
-        
+        self.navegar(EditBook)
+
     def _open_create_loan(self):
-        self.after(100, lambda: self._launch_window("new_loan", "NewLoan"))
-        self.destroy()
         from vista.new_loan import NewLoan
-        NewLoan(session=self.session, admin=self.admin)
-    
+        self.navegar(NewLoan)
+
     def _close_loan(self):
-        self.after(100, lambda: self._launch_window("loan_active_list", "LoanActiveList"))
-        self.destroy()
         from vista.loan_active_list import LoanActiveList
-        LoanActiveList(session=self.session, admin=self.admin)
+        self.navegar(LoanActiveList)
+
+    def _open_due_list(self):
+        from vista.loan_due_list import LoanDueList
+        self.navegar(LoanDueList)
 
 if __name__ == "__main__":
-    app = MainDashboard()
-    app.mainloop()
\ No newline at end of file
+    iniciar(MainDashboard)
@@ -1,35 +1,34 @@
 import customtkinter as ctk
 from datetime import datetime, timedelta
-from db.session_manager import SessionManager
 
 from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
-from vista.componentes.callbacks import get_default_callbacks
 from vista.componentes.utils import safe_messagebox
+from vista.componentes.consultas import ejecutar_consulta
 
 from modelo.Socio import Socio
 from modelo.Libro import Libro
 from modelo.Ejemplar import Ejemplar
 from modelo.Prestamo import Prestamo
+from modelo.LibroCategoria import LibroCategoria
+from db.referencias import CacheReferencias
+from sqlalchemy import select
 
 
 class NewLoan(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Registrar Préstamo - Biblioteca Pública")
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
-
-        callbacks = get_default_callbacks(self)
-        self.layout = AppLayout(self, banner_image="vista/images/banner_bandera.jpg", callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
-
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Registrar Préstamo - Biblioteca Pública", session=session, admin=admin)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
         self._build_form()
-        self.mainloop()
+
+    def al_mostrar(self):
+        """Al volver a la pantalla el formulario arranca vacío."""
+        self._limpiar_form()
 
     # ======================================================
     def _build_form(self):
         """Construye el formulario de registro de préstamo."""
-        frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        frame = ctk.CTkFrame(self, fg_color="transparent")
         frame.grid(row=1, column=0, sticky="nsew", padx=40, pady=30)
         frame.grid_columnconfigure(0, weight=1)
         frame.grid_columnconfigure(1, weight=2)
@@ -111,20 +110,28 @@ class NewLoan(BaseApp):
         if not dni:
             return
 
-        socio = Socio.obtener_por_dni(self.session, dni)
-        if not socio:
+        def consulta(session):
+            socio = Socio.obtener_por_dni(session, dni)
+            if not socio:
+                return None, False
+
+            # Verificar si tiene préstamo activo
+            prestamo_activo = session.query(Prestamo.id).filter(
+                Prestamo.socio_id == socio.dni,
+                Prestamo.fecha_devolucion.is_(None)
+            ).first()
+            print(f"[DEBUG] Préstamo activo para socio {socio.dni}: {prestamo_activo}")
+            return socio.dni, prestamo_activo is not None
+
+        ejecutar_consulta(self, consulta, self._on_socio_encontrado)
+
+    def _on_socio_encontrado(self, resultado):
+        socio_dni, tiene_prestamo_activo = resultado
+        if not socio_dni:
             safe_messagebox(title="Error", message="No se encontró ningún socio con ese DNI.", level="error", buttons="ok", parent=self)
             return
 
-        # Verificar si tiene préstamo activo
-        prestamo_activo = self.session.query(Prestamo).filter(
-            Prestamo.socio_id == socio.dni,
-            Prestamo.fecha_devolucion.is_(None)
-        ).first()
-        
-        print(f"[DEBUG] Préstamo activo para socio {socio.dni}: {prestamo_activo}")
-
-        if prestamo_activo:
+        if tiene_prestamo_activo:
             safe_messagebox(title="Aviso", message="Este socio ya posee un préstamo activo.", level="warning", buttons="ok", parent=self)
             return
 
@@ -137,18 +144,43 @@ class NewLoan(BaseApp):
         if not isbn:
             return
 
-        libro = self.session.query(Libro).filter_by(isbn=isbn).first()
+        def consulta(session):
+            # Libro y código de su primera categoría en una consulta; el nombre sale de la caché
+            primera_categoria = (
+                select(LibroCategoria.categoria_code)
+                .where(LibroCategoria.libro_isbn == Libro.isbn)
+                .limit(1)
+                .scalar_subquery()
+            )
+            fila = session.execute(
+                select(Libro.titulo, Libro.autor, primera_categoria).where(Libro.isbn == isbn).limit(1)
+            ).first()
+            if not fila:
+                return None
+            titulo, autor, categoria_code = fila
+            categoria = CacheReferencias.categoria(categoria_code, session) if categoria_code else None
+
+            # Buscar ejemplares disponibles
+            codigos = [
+                codigo for (codigo,) in session.query(Ejemplar.codigo)
+                .filter_by(libro_isbn=isbn, disponible=True, baja_ejemplar=None)
+                .all()
+            ]
+            return {
+                "titulo": titulo,
+                "autor": autor,
+                "categoria": categoria.nombre if categoria else "Sin categoría",
+                "codigos": codigos,
+            }
+
+        ejecutar_consulta(self, consulta, lambda datos: self._on_libro_encontrado(isbn, datos))
+
+    def _on_libro_encontrado(self, isbn, libro):
         if not libro:
             safe_messagebox(title="Error", message="No se encontró un libro con ese ISBN.", level="error", buttons="ok", parent=self)
             return
 
-        # Buscar ejemplares disponibles
-        ejemplares_disp = (
-            self.session.query(Ejemplar)
-            .filter_by(libro_isbn=isbn, disponible=True, baja_ejemplar=None)
-            .all()
-        )
-
+        ejemplares_disp = libro["codigos"]
         if not ejemplares_disp:
             safe_messagebox(title="Aviso", message="No hay ejemplares disponibles de este libro.", level="warning", buttons="ok", parent=self)
             return
@@ -158,15 +190,15 @@ class NewLoan(BaseApp):
         self.entries["ISBN:"].insert(0, isbn)
         self.entries["Título:"].configure(state="normal")
         self.entries["Título:"].delete(0, "end")
-        self.entries["Título:"].insert(0, libro.titulo)
+        self.entries["Título:"].insert(0, libro["titulo"])
         self.entries["Título:"].configure(state="disabled")
 
         self.entries["Autor:"].configure(state="normal")
         self.entries["Autor:"].delete(0, "end")
-        self.entries["Autor:"].insert(0, libro.autor)
+        self.entries["Autor:"].insert(0, libro["autor"])
         self.entries["Autor:"].configure(state="disabled")
 
-        categoria = libro.categorias[0].nombre if libro.categorias else "Sin categoría"
+        categoria = libro["categoria"]
         self.entries["Categoría:"].configure(state="normal")
         self.entries["Categoría:"].delete(0, "end")
         self.entries["Categoría:"].insert(0, categoria)
@@ -174,8 +206,8 @@ class NewLoan(BaseApp):
 
         # Cargar dropdown de ejemplares
         self.cb_ejemplar.configure(state="normal")
-        self.cb_ejemplar.configure(values=[e.codigo for e in ejemplares_disp])
-        self.cb_ejemplar.set(ejemplares_disp[0].codigo)
+        self.cb_ejemplar.configure(values=ejemplares_disp)
+        self.cb_ejemplar.set(ejemplares_disp[0])
 
         # Activar préstamo
         self.cb_dias.configure(state="normal")
@@ -200,38 +232,42 @@ class NewLoan(BaseApp):
         self.entry_fecha_dev.configure(state="disabled")
 
 
+    # ======================================================
+    def _limpiar_form(self):
+        """Deja el formulario como recién abierto: solo el DNI habilitado."""
+        for entry in self.entries.values():
+            entry.configure(state="normal")
+            entry.delete(0, "end")
+        self.cb_ejemplar.configure(values=[])
+        self.cb_ejemplar.set("")
+        self.cb_dias.configure(state="normal")
+        self.cb_dias.set("3")
+        self.entry_fecha_dev.configure(state="normal")
+        self.entry_fecha_dev.delete(0, "end")
+        self._set_state({label: "normal" if label == "DNI socio:" else "disabled" for label in self.entries})
+        self.entries["DNI socio:"].focus()
+
     # ======================================================
     def _guardar_prestamo(self):
-        administrador_id=self.admin.dni if self.admin else None,
         dni = self.entries["DNI socio:"].get().strip()
         isbn = self.entries["ISBN:"].get().strip().upper()
         codigo_ejemplar = self.cb_ejemplar.get().strip()
         dias = int(self.cb_dias.get())
-        fecha_dev = datetime.today().date() + timedelta(days=dias)
 
         if not (dni and isbn and codigo_ejemplar):
             safe_messagebox(title="Error", message="Complete todos los campos requeridos.", level="error", buttons="ok", parent=self)
             return
 
-        socio = Socio.obtener_por_dni(self.session, dni)
-        ejemplar = self.session.query(Ejemplar).filter_by(codigo=codigo_ejemplar).first()
-
-        if not socio or not ejemplar:
-            safe_messagebox(title="Error", message="Datos inválidos para socio o ejemplar.", level="error", buttons="ok", parent=self)
-            return
-
         try:
-            nuevo_prestamo = Prestamo(
-                ejemplar_id=ejemplar.codigo,
-                socio_id=socio.dni,
-                administrador_id=self.admin.dni if self.admin else None,
-                fecha_prestamo=datetime.today().date(),
-                fecha_devolucion_pactada=fecha_dev
+            # Valida socio, ejemplar y administrador y registra el préstamo en una sola transacción
+            Prestamo.crear(
+                self.session,
+                codigo_ejemplar,
+                dni,
+                self.admin.dni if self.admin else None,
+                dias,
+                commit=True
             )
-            ejemplar.disponible = False
-
-            self.session.add(nuevo_prestamo)
-            self.session.commit()
 
             safe_messagebox(title="Éxito", message="Préstamo registrado correctamente.",  level="info", buttons="ok", parent=self)
             self._volver()
@@ -242,6 +278,5 @@ class NewLoan(BaseApp):
     # ======================================================
     def _volver(self):
         """Vuelve al dashboard."""
-        self.destroy()
         from vista.main_dashboard import MainDashboard
-        MainDashboard(session=self.session, admin=self.admin)
+        self.navegar(MainDashboard)
@@ -4,35 +4,24 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import customtkinter as ctk
 from datetime import date
-from db.session_manager import SessionManager
 
-from vista.componentes.base_app import BaseApp
-from vista.componentes.layout import AppLayout
+from vista.componentes.base_app import BaseApp, iniciar
 from vista.componentes.table import Table
-from vista.componentes.callbacks import get_default_callbacks
+from vista.componentes.consultas import ejecutar_consulta
 
 from modelo.Socio import Socio
 from modelo.Prestamo import Prestamo
 
 
 class UserList(BaseApp):
-    def __init__(self, session=None, admin=None):
-        super().__init__(title="Biblioteca Pública - Socios")
+    def __init__(self, master, session=None, admin=None):
+        super().__init__(master, title="Biblioteca Pública - Socios", session=session, admin=admin)
 
-        self.session = session or SessionManager.get_session()
-        self.admin = admin
-
-        callbacks = get_default_callbacks(self)
-
-        # Layout base
-        self.layout = AppLayout(self, banner_image="vista/images/banner_bandera.jpg", callbacks=callbacks)
-        self.layout.pack(fill="both", expand=True)
-
-        self.layout.main_frame.grid_rowconfigure(1, weight=1)
-        self.layout.main_frame.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
 
         # Contenedor del contenido
-        self.content_frame = ctk.CTkFrame(self.layout.main_frame, fg_color="transparent")
+        self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.grid(row=1, column=0, sticky="n", pady=10)
 
         ctk.CTkLabel(
@@ -50,20 +39,23 @@ class UserList(BaseApp):
             {"key": "estado", "text": "Estado Préstamo", "width": 150},
         ]
 
-        self.table = Table(self.content_frame, columns, width=900, height=420)
+        self.table = Table(self.content_frame, columns, width=900, height=420, virtual=True)
         self.table.grid(row=1, column=0, sticky="n")
 
         self.load_data()
 
     # =======================================================
     def load_data(self):
-        """Carga la lista de socios y su estado de préstamo actual usando la sesión compartida."""
-        if not self.session:
-            raise ValueError("No se recibió una sesión de base de datos válida.")
-
-        socios = self.session.query(Socio).all()
+        """Carga la lista de socios y su estado de préstamo actual en segundo plano."""
+        self.table.mostrar_cargando()
+        ejecutar_consulta(self, self._consultar_filas, self.table.set_data)
+
+    @staticmethod
+    def _consultar_filas(session):
+        """Se ejecuta en un hilo de fondo con su propia sesión."""
+        socios = session.query(Socio).all()
         prestamos_activos = (
-            self.session.query(Prestamo)
+            session.query(Prestamo)
             .filter(Prestamo.fecha_devolucion.is_(None))
             .all()
         )
@@ -88,11 +80,8 @@ class UserList(BaseApp):
                 "estado": activos_map.get(s.dni, "Inactivo"),
             })
 
-        self.table.set_data(rows)
+        return rows
 
 
 if __name__ == "__main__":
-    # Solo para pruebas: crea una sesión temporal si no se pasa ninguna
-    from db.Conector import SessionLocal
-    app = UserList(session=SessionLocal())
-    app.mainloop()
\ No newline at end of file
+    iniciar(UserList)
\ No newline at end of file